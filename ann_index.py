@@ -0,0 +1,164 @@
+import numpy as np
+
+from vector_search import SCORE_THRESHOLD, VectorIndex, l2_normalize
+
+# CONFIGURATION
+ANN_MIN_ROWS = 20_000   # Below this, exact search is already fast enough
+NPROBE = 16             # Lists scanned per query: higher = better recall, slower
+TRAIN_ITERATIONS = 10
+TRAIN_POINTS_PER_LIST = 64
+ASSIGN_CHUNK = 65_536   # Rows scored against the centroids at a time
+
+def default_n_lists(n_rows):
+    """Roughly sqrt(n) lists keeps both the coarse and the fine scan small."""
+    return int(max(1, min(n_rows, round(np.sqrt(n_rows)))))
+
+def _assign(vectors, centroids):
+    """Nearest centroid (by inner product) for every row, in chunks."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_CHUNK):
+        block = np.asarray(vectors[start:start + ASSIGN_CHUNK], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+def train_centroids(vectors, n_lists, iterations=TRAIN_ITERATIONS, seed=0):
+    """Spherical k-means on a random sample of the (unit-length) rows."""
+    rng = np.random.default_rng(seed)
+    n_sample = min(len(vectors), n_lists * TRAIN_POINTS_PER_LIST)
+    sample = np.sort(rng.choice(len(vectors), n_sample, replace=False))
+    points = np.asarray(vectors[sample], dtype=np.float32)
+
+    centroids = points[rng.choice(len(points), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(points, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, points)
+        counts = np.bincount(labels, minlength=n_lists)
+        # Re-seed empty lists from random points so none stay dead
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = points[rng.choice(len(points), int(empty.sum()), replace=False)]
+        centroids = l2_normalize(sums)
+    return centroids
+
+class IVFIndex:
+    """
+    Inverted-file index for approximate cosine search.
+
+    Rows are bucketed by their nearest k-means centroid. A query scores the
+    centroids, scans only the `nprobe` closest buckets exactly, and returns
+    results in the same (indices, scores) shape as vector_search.VectorIndex,
+    so the two are interchangeable in the search path. Vectors must be
+    unit length (the embedding store writes them that way), or int8 codes
+    with per-dimension `scales` (see vector_search.quantize_int8).
+    """
+
+    def __init__(self, vectors, centroids, order, offsets, nprobe=NPROBE, scales=None):
+        self.vectors = vectors
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float32)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.order = order        # row indices grouped by list
+        self.offsets = offsets    # list i owns order[offsets[i]:offsets[i + 1]]
+        self.nprobe = nprobe
+        # When rows are already stored list by list, buckets are plain slices
+        self.contiguous = bool(len(order) == 0 or (order[0] == 0 and np.all(np.diff(order) == 1)))
+        self._exact = None
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, centroids=None, nprobe=NPROBE, seed=0):
+        """Trains centroids (unless given) and buckets every row."""
+        if centroids is None:
+            centroids = train_centroids(vectors, n_lists or default_n_lists(len(vectors)), seed=seed)
+        labels = _assign(vectors, centroids)
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=len(centroids)), out=offsets[1:])
+        return cls(vectors, centroids, order, offsets, nprobe)
+
+    def packed(self):
+        """
+        Returns (permutation, index) where the index's matrix is
+        vectors[permutation], stored bucket by bucket. Scanning a bucket then
+        reads one contiguous block instead of gathering scattered rows.
+        """
+        perm = self.order
+        vectors = np.asarray(self.vectors, dtype=np.float32)[perm]
+        return perm, IVFIndex(vectors, self.centroids, np.arange(len(perm), dtype=np.int64), self.offsets, self.nprobe)
+
+    def to_arrays(self):
+        """Arrays persisted next to the vectors in the embedding store."""
+        return {"ivf_centroids": self.centroids, "ivf_order": self.order, "ivf_offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, vectors, arrays, nprobe=NPROBE):
+        return cls(vectors, arrays["ivf_centroids"], arrays["ivf_order"], arrays["ivf_offsets"], nprobe,
+                   scales=arrays.get("scales"))
+
+    def exact(self):
+        """Exact index over the same rows, built on first use (selective filters)."""
+        if self._exact is None:
+            self._exact = VectorIndex(self.vectors, normalized=True, scales=self.scales)
+        return self._exact
+
+    def probe(self, query, nprobe=None):
+        """Ids of the `nprobe` lists whose centroids are closest to one query."""
+        probe = min(nprobe or self.nprobe, self.n_lists)
+        coarse = self.centroids @ query
+        return np.argpartition(coarse, -probe)[-probe:] if probe < self.n_lists else np.arange(self.n_lists)
+
+    def _scan(self, query, lists):
+        """Exact scores for every row in `lists`: (row indices, scores)."""
+        if self.contiguous:
+            spans = [(self.offsets[i], self.offsets[i + 1]) for i in lists if self.offsets[i + 1] > self.offsets[i]]
+            if not spans:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            cand = np.concatenate([np.arange(a, b) for a, b in spans])
+            scores = np.concatenate([np.asarray(self.vectors[a:b], dtype=np.float32) @ query for a, b in spans])
+            return cand, scores
+        cand = np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        # Sorted indices keep reads from a memory-mapped matrix sequential
+        cand.sort()
+        return cand, np.asarray(self.vectors[cand], dtype=np.float32) @ query
+
+    def search(self, queries, top_k=5, threshold=SCORE_THRESHOLD, rows=None):
+        """
+        `rows` (sorted positions) restricts the search to those rows. The
+        probe is widened by the inverse of the filter's selectivity, so about
+        as many allowed rows are scanned as without a filter; when that
+        would scan more rows than the filter allows, the allowed rows are
+        scored exactly instead (cheaper, and no recall loss).
+        """
+        queries = l2_normalize(np.atleast_2d(queries))
+        nprobe, allowed = self.nprobe, None
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            nprobe = int(min(self.n_lists, np.ceil(self.nprobe * len(self) / max(1, len(rows)))))
+            if len(rows) <= len(self) / self.n_lists * nprobe:
+                return self.exact().search(queries, top_k, threshold, rows=rows)
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[rows] = True
+
+        results = []
+        for query in queries:
+            # int8 rows: fold the dequantisation scales into the query
+            scan_query = query if self.scales is None else query * self.scales
+            cand, scores = self._scan(scan_query, self.probe(query, nprobe))
+            if allowed is not None:
+                keep = allowed[cand]
+                cand, scores = cand[keep], scores[keep]
+            if len(cand) == 0:
+                results.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)))
+                continue
+            k = min(top_k, len(cand))
+            top = np.argpartition(scores, -k)[-k:] if k < len(cand) else np.arange(len(cand))
+            top = top[np.argsort(-scores[top], kind="stable")]
+            top = top[scores[top] > threshold]
+            results.append((cand[top], scores[top]))
+        return results
@@ -3,9 +3,15 @@ import sqlite3
 import pandas as pd
 import pickle
 import os
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+
+from embedding_store import EmbeddingStoreError
+from encoder_backend import cache_name, load_store_encoder
+from hybrid_search import HybridSearcher
+from metrics import SEARCH_SECONDS
+from query_cache import QueryCache
+from search_filters import FacetIndex
+from semantic_search import load_search_index
+from vector_search import VectorIndex, hydrate
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(
@@ -18,8 +24,12 @@ st.set_page_config(
 # We use relative paths so it works on your laptop AND the cloud
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "faculty.db")
-EMBEDDINGS_PATH = os.path.join(BASE_DIR, "faculty_embeddings.pkl")
+STORE_DIR = os.path.join(BASE_DIR, "embedding_store")
+LEGACY_EMBEDDINGS_PATH = os.path.join(BASE_DIR, "faculty_embeddings.pkl")
+ONNX_DIR = os.path.join(BASE_DIR, "onnx_model")
 CSV_PATH = os.path.join(BASE_DIR, "daiict_faculty_final.csv")
+# Query vectors survive restarts; main.py reads and writes the same file
+QUERY_CACHE_PATH = os.path.join(BASE_DIR, "query_cache.npz")
 
 # --- CUSTOM CSS ---
 st.markdown("""
@@ -45,54 +55,82 @@ st.markdown("""
 @st.cache_resource
 def load_resources():
     """Loads the AI model and pre-computed embeddings."""
-    if not os.path.exists(EMBEDDINGS_PATH) or not os.path.exists(CSV_PATH):
-        return None, None, None
-    
-    # 1. Load Model
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    if os.path.exists(os.path.join(STORE_DIR, "manifest.json")):
+        try:
+            manifest, index, df = load_search_index(DB_PATH, STORE_DIR)
+        except (EmbeddingStoreError, sqlite3.Error) as e:
+            return None, None, None, None, str(e)
+    elif os.path.exists(LEGACY_EMBEDDINGS_PATH) and os.path.exists(CSV_PATH):
+        # Legacy pickle: a bare matrix aligned to the CSV row order
+        with open(LEGACY_EMBEDDINGS_PATH, 'rb') as f:
+            index = VectorIndex(pickle.load(f))
+        df = pd.read_csv(CSV_PATH)
+        manifest = {"model": 'all-MiniLM-L6-v2'}
+    else:
+        return None, None, None, None, None
     
-    # 2. Load Embeddings
-    with open(EMBEDDINGS_PATH, 'rb') as f:
-        vectors = pickle.load(f)
-        
-    # 3. Load Data Mapping
-    df = pd.read_csv(CSV_PATH)
+    # Load Model (the backend that built the vectors, see encoder_backend.py),
+    # behind an LRU cache of query vectors shared by all sessions
+    model = load_store_encoder(manifest, onnx_dir=ONNX_DIR)
+    query_cache = QueryCache(model.encode, cache_name(manifest["model"], model), persist_path=QUERY_CACHE_PATH)
     
-    return model, vectors, df
+    return model, query_cache, index, df, None
+
+model, query_cache, faculty_index, df_data, load_error = load_resources()
+
+@st.cache_resource
+def load_hybrid():
+    """Keyword + vector fusion; needs the embedding store (the legacy pickle has no faculty ids)."""
+    if model is None or 'id' not in df_data:
+        return None
+    return HybridSearcher(faculty_index, df_data)
 
-model, faculty_vectors, df_data = load_resources()
+hybrid_searcher = load_hybrid()
+
+@st.cache_resource
+def load_facets():
+    """Designation / e-mail domain / institution lists for pre-filtered search."""
+    return None if df_data is None else FacetIndex(df_data)
+
+facet_index = load_facets()
 
 # --- 🔍 SEARCH LOGIC ---
-def search_faculty(query, top_k=5):
+def search_faculty(query, top_k=5, hybrid=False, filters=None):
     if not query or model is None:
         return []
+    return search_faculty_batch([query], top_k, hybrid, filters)[0]
+
+def search_faculty_batch(queries, top_k=5, hybrid=False, filters=None):
+    """
+    Runs several queries with one encode call and one matmul. `filters`
+    (designation, domain, institution, has_email; see search_filters.py)
+    narrows the rows that are scored, so top_k is filled with matches.
+    """
+    if model is None:
+        return [[] for _ in queries]
+    rows = facet_index.rows(**filters) if filters else None
+    
+    mode = "hybrid" if hybrid and hybrid_searcher is not None else "vector"
     
-    # 1. Vectorize Query
-    query_vector = model.encode([query])
+    # 1. Vectorize Queries (repeated queries come from the cache)
+    with SEARCH_SECONDS.time(mode=mode, stage="encode"):
+        query_vectors = query_cache.encode(list(queries))
     
-    # 2. Calculate Similarity
-    similarities = cosine_similarity(query_vector, faculty_vectors).flatten()
+    if mode == "hybrid":
+        # 2b. Fuse with the FTS5 keyword ranking (hybrid_search.py)
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            return hybrid_searcher.search(conn, queries, query_vectors, top_k=top_k, rows=rows)
+        finally:
+            conn.close()
     
-    # 3. Get Top Results
-    top_indices = similarities.argsort()[-top_k:][::-1]
+    # 2. Score the allowed rows, pick top-k and apply the 0.2 threshold (vector_search.py)
+    with SEARCH_SECONDS.time(mode=mode, stage="score"):
+        matches = faculty_index.search(query_vectors, top_k=top_k, rows=rows)
     
-    results = []
-    for idx in top_indices:
-        score = similarities[idx]
-        if score > 0.2: # Threshold to filter bad matches
-            row = df_data.iloc[idx]
-            results.append({
-                "name": row['Name'],
-                "designation": row['Designation'],
-                "email": row.get('Email', 'N/A'),
-                "phone": row.get('Phone', 'N/A'),
-                "education": row.get('Education', ''),
-                "interests": row.get('Area_of_Interest', ''),
-                "image": row.get('Image_URL', ''),
-                "link": row.get('Profile_Link', '#'),
-                "score": round(score * 100, 1) # Convert to percentage
-            })
-    return results
+    # 3. Build result cards
+    with SEARCH_SECONDS.time(mode=mode, stage="hydrate"):
+        return [hydrate(df_data, indices, scores) for indices, scores in matches]
 
 # --- 🎨 UI LAYOUT ---
 
@@ -103,21 +141,44 @@ st.caption("🚀 Powered by AI Semantic Search")
 with st.sidebar:
     st.header("⚙️ Search Settings")
     top_k = st.slider("Number of Results", 1, 20, 5)
+    hybrid = hybrid_searcher is not None and st.toggle(
+        "Hybrid ranking", value=True, help="Also match exact keywords (e.g. 'VLSI', '5G') and fuse both rankings."
+    )
+    filters = {}
+    if facet_index is not None:
+        st.subheader("🔎 Filters")
+        facets = facet_index.facets()
+        filters["designation"] = st.multiselect("Designation", [f["value"] for f in facets["designation"]])
+        filters["institution"] = st.multiselect("Education institution", [f["value"] for f in facets["institution"]])
+        filters["domain"] = st.multiselect("E-mail domain", [f["value"] for f in facets["domain"]])
+        filters["has_email"] = True if st.checkbox("Only faculty with an e-mail") else None
     st.markdown("---")
     st.info("This tool uses **Vector Embeddings** to find professors based on research meaning, not just keywords.")
+    if query_cache is not None:
+        stats = query_cache.stats()
+        st.caption(f"Query cache: {stats['entries']} entries, {stats['hit_rate']:.0%} hit rate, "
+                   f"{stats['avg_lookup_ms']:.1f} ms avg lookup")
+    timings = SEARCH_SECONDS.snapshot()
+    if timings:
+        # Mean per stage since the app started (all sessions)
+        st.caption("Search time: " + ", ".join(
+            f"{stage} ({mode}) {1000 * total / count:.1f} ms" for (mode, stage), (count, total, _) in sorted(timings.items())
+        ))
 
 # Main Search Bar
 query = st.text_input("🔍 What are you looking for?", placeholder="e.g., 'Who works on sustainable energy and green computing?'")
 
 if query:
-    if model is None:
+    if load_error:
+        st.error(f"⚠️ Embeddings could not be loaded: {load_error}")
+    elif model is None:
         st.error("⚠️ AI Models not found! Please run `generate_embeddings.py` first.")
     else:
         with st.spinner("🤖 Analyzing faculty profiles..."):
-            results = search_faculty(query, top_k=top_k)
+            results = search_faculty(query, top_k=top_k, hybrid=hybrid, filters=filters)
         
         if not results:
-            st.warning("No relevant faculty found. Try broader terms.")
+            st.warning("No relevant faculty found. Try broader terms or fewer filters.")
         else:
             st.success(f"Found {len(results)} relevant professors!")
             
@@ -0,0 +1,63 @@
+"""
+Recall@k and latency of the IVF index (ann_index.py) against exact search.
+
+    python -m benchmarks.bench_ann [--rows 200000] [--nprobe 1 4 8 16 32 64]
+
+Vectors and topic queries come from the synthetic corpus
+(benchmarks/synthetic.py), which has the cluster structure real profile
+embeddings have; uniform random vectors would make any partitioning index
+look worse than it is.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+from benchmarks.synthetic import faculty_vectors, query_vectors
+from vector_search import VectorIndex
+
+def recall_at_k(exact, approx, k):
+    hits = [len(set(e[:k]) & set(a[:k])) / max(1, min(k, len(e))) for e, a in zip(exact, approx)]
+    return float(np.mean(hits))
+
+def run(rows=200_000, dim=384, top_k=10, n_queries=200, nprobes=(1, 4, 8, 16, 32, 64), n_lists=None):
+    vectors, queries = faculty_vectors(rows, dim), query_vectors(n_queries, dim)
+
+    start = time.perf_counter()
+    perm, ivf = IVFIndex.build(vectors, n_lists=n_lists).packed()
+    print(f"Built IVF over {rows:,} x {dim} ({ivf.n_lists} lists) in {time.perf_counter() - start:.1f}s")
+
+    exact_index = VectorIndex(vectors, normalized=True)
+    start = time.perf_counter()
+    exact = [idx for idx, _ in (exact_index.search(q, top_k, threshold=-1.0)[0] for q in queries)]
+    exact_ms = (time.perf_counter() - start) / n_queries * 1000
+
+    print(f"\n{'nprobe':>6} | recall@{top_k:<3} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | vs exact {exact_ms:.2f} ms")
+    print("-" * 60)
+    results = []
+    for nprobe in nprobes:
+        ivf.nprobe = nprobe
+        approx, samples = [], []
+        for q in queries:
+            t = time.perf_counter()
+            idx, _ = ivf.search(q, top_k, threshold=-1.0)[0]
+            samples.append((time.perf_counter() - t) * 1000)
+            approx.append(idx)
+        # Packed rows are a permutation of the originals: map back before comparing
+        recall = recall_at_k(exact, [perm[idx] for idx in approx], top_k)
+        p50, p99 = statistics.median(samples), float(np.percentile(samples, 99))
+        print(f"{nprobe:>6} | {recall:>10.3f} | {p50:>8.3f} | {p99:>8.3f} | {exact_ms / p50:.1f}x faster")
+        results.append({"nprobe": nprobe, "recall": recall, "p50_ms": p50, "p99_ms": p99, "exact_ms": exact_ms})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+    run(args.rows, args.dim, args.top_k, nprobes=args.nprobe, n_lists=args.lists)
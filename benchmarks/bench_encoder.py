@@ -0,0 +1,93 @@
+"""
+Encoder backends: cold start, per-query latency, batch throughput and
+agreement with the torch model.
+
+    python encoder_backend.py export                                # float weights
+    python encoder_backend.py export --quantize --dir onnx_model_int8
+    python -m benchmarks.bench_encoder [--onnx-dirs onnx_model onnx_model_int8]
+
+Cold start is measured in a fresh interpreter per run (imports, model load
+and the first encode), which is what a new Streamlit/uvicorn worker pays.
+Query latency uses the labelled benchmark queries one at a time, and
+throughput encodes every faculty profile. Agreement is the lowest cosine
+between a backend's profile vectors and torch's.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from encoder_backend import compare, encoder_label, load_encoder
+from generate_embeddings import MODEL_NAME, load_rows
+from store_data import CSV_FILE, load_csv
+
+LABELS = os.path.join(os.path.dirname(__file__), "fixtures", "labeled_queries.json")
+COLD_START = (
+    "import time; start = time.perf_counter()\n"
+    "from encoder_backend import load_encoder\n"
+    "load_encoder({model!r}, {backend!r}, {onnx_dir!r}).encode(['warm up'])\n"
+    "print(time.perf_counter() - start)"
+)
+
+def cold_start(backend, onnx_dir, runs):
+    code = COLD_START.format(model=MODEL_NAME, backend=backend, onnx_dir=onnx_dir)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times = [float(subprocess.run([sys.executable, "-c", code], cwd=root, check=True, capture_output=True,
+                                  text=True).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return statistics.median(times)
+
+def profile_texts():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "faculty.db")
+        load_csv(CSV_FILE, db_file)
+        conn = sqlite3.connect(db_file)
+        texts = load_rows(conn)["search_text"].tolist()
+        conn.close()
+    return texts
+
+def run(onnx_dirs=("onnx_model",), repeat=20, cold_runs=3, batch_size=64):
+    with open(LABELS, "r", encoding="utf-8") as f:
+        queries = [item["query"] for item in json.load(f)]
+    texts = profile_texts()
+
+    backends = [("torch", "onnx_model")] + [("onnx", onnx_dir) for onnx_dir in onnx_dirs]
+    print(f"{len(queries)} queries x {repeat}, {len(texts)} profiles, batch size {batch_size}\n")
+    print(f"{'backend':>10} | {'cold (s)':>8} | {'p50 (ms)':>8} | {'p99 (ms)':>8} | {'texts/s':>8} | min cosine")
+    print("-" * 70)
+    reference, results = None, []
+    for backend, onnx_dir in backends:
+        cold = cold_start(backend, onnx_dir, cold_runs)
+        encoder = load_encoder(MODEL_NAME, backend, onnx_dir)
+        samples = []
+        for _ in range(repeat):
+            for query in queries:
+                start = time.perf_counter()
+                encoder.encode([query])
+                samples.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        vectors = encoder.encode(texts, batch_size=batch_size)
+        throughput = len(texts) / (time.perf_counter() - start)
+        reference = vectors if reference is None else reference
+        min_cosine, _ = compare(reference, vectors)
+        p50, p99 = statistics.median(samples), float(np.percentile(samples, 99))
+        label = encoder_label(encoder)
+        print(f"{label:>10} | {cold:>8.2f} | {p50:>8.2f} | {p99:>8.2f} | {throughput:>8.0f} | {min_cosine:.5f}")
+        results.append({"backend": label, "cold_s": cold, "p50_ms": p50, "p99_ms": p99,
+                        "texts_per_s": throughput, "min_cosine": min_cosine})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--onnx-dirs", nargs="*", default=["onnx_model"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    run(args.onnx_dirs, args.repeat, args.cold_runs, args.batch_size)
@@ -0,0 +1,78 @@
+"""
+Filtered vector search: post-filtering the top-k vs pre-filtering with
+search_filters.FacetIndex.
+
+    python -m benchmarks.bench_filter [--rows 200000] [--top-k 10]
+
+Rows and vectors come from the synthetic corpus (benchmarks/synthetic.py),
+with designations whose share of the table ranges from 50% down to 0.1%. Post-filter is what app.py used to be limited to: search,
+then drop rows with the wrong designation, which leaves short or empty
+lists. Pre-filter scores only the allowed rows. Both are reported for the
+exact and the IVF index: fill is the share of the k slots that hold a
+match (1.0 = a full list), latency includes building the row set.
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+from benchmarks.synthetic import faculty_frame, faculty_vectors, query_vectors
+from search_filters import FacetIndex
+from vector_search import VectorIndex
+
+SHARES = {"Faculty": 0.5, "Adjunct Faculty": 0.3, "Visiting Faculty": 0.1, "Professor of Practice": 0.09,
+          "Adjunct Faculty International": 0.009, "Distinguished Professor": 0.001}
+
+def timed(fn, queries):
+    results, samples = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        samples.append((time.perf_counter() - start) * 1000)
+    return results, statistics.median(samples)
+
+def run(rows=200_000, dim=384, top_k=10, n_queries=50):
+    vectors, queries = faculty_vectors(rows, dim), query_vectors(n_queries, dim)
+    # Packed IVF rows are a permutation: the frame follows the same order
+    perm, ivf = IVFIndex.build(vectors).packed()
+    df = faculty_frame(rows, designations=SHARES).iloc[perm].reset_index(drop=True)
+    facets = FacetIndex(df)
+    designation = df["Designation"].to_numpy()
+    indexes = {"exact": VectorIndex(ivf.vectors, normalized=True), "ivf": ivf}
+
+    print(f"{rows:,} rows x {dim}, top {top_k}, {n_queries} queries (median ms)\n")
+    print(f"{'designation':<30} {'share':>6} | {'index':>5} | {'post ms':>8} {'fill':>5} | {'pre ms':>7} {'fill':>5}")
+    print("-" * 80)
+    results = []
+    for value in SHARES:
+        share = float(np.mean(designation == value))
+        for name, index in indexes.items():
+            def post(query):
+                indices, _ = index.search(query, top_k, threshold=-1.0)[0]
+                return indices[designation[indices] == value]
+
+            def pre(query):
+                indices, _ = index.search(query, top_k, threshold=-1.0, rows=facets.rows(designation=value))[0]
+                return indices
+
+            post_hits, post_ms = timed(post, queries)
+            pre_hits, pre_ms = timed(pre, queries)
+            # A filter can allow fewer than k rows: those slots cannot be filled
+            slots = min(top_k, int(share * rows))
+            post_fill = np.mean([len(hits) / slots for hits in post_hits])
+            pre_fill = np.mean([len(hits) / slots for hits in pre_hits])
+            print(f"{value:<30} {share:>6.1%} | {name:>5} | {post_ms:>8.2f} {post_fill:>5.2f} | {pre_ms:>7.2f} {pre_fill:>5.2f}")
+            results.append({"designation": value, "share": share, "index": name, "post_ms": post_ms,
+                            "post_fill": post_fill, "pre_ms": pre_ms, "pre_fill": pre_fill})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    run(args.rows, args.dim, args.top_k, args.queries)
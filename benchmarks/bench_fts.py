@@ -0,0 +1,64 @@
+"""
+Keyword search benchmark: FTS5 (keyword_search) versus LIKE '%q%'.
+
+    python -m benchmarks.bench_fts [--rows 1000000] [--repeat 50]
+
+Loads N rows of the synthetic corpus (through store_data, so the sync
+triggers are exercised) and times a mix of selective and broad queries.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_store import synthetic_frame
+from keyword_search import keyword_search
+from store_data import init_db, store_data
+
+def queries(df):
+    """(query, what it exercises); name queries use a name that exists."""
+    name = df["Name"].iloc[len(df) // 2]
+    return [
+        (name, "exact name"),
+        (name[:5], "name prefix"),
+        ("vlsi", "one topic"),
+        ("quantum crypto", "two-topic AND"),
+        ("processing", "broad term")
+    ]
+
+def time_query(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        n = len(fn())
+        times.append(time.perf_counter() - start)
+    return n, np.percentile(times, 50) * 1000
+
+def run(rows=1_000_000, repeat=50):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        init_db(db_file)
+        start = time.perf_counter()
+        df = synthetic_frame(rows)
+        store_data(df, db_file=db_file)
+        print(f"Loaded {rows:,} rows (with FTS triggers) in {time.perf_counter() - start:.1f}s\n")
+
+        conn = sqlite3.connect(db_file)
+        like_sql = ("SELECT * FROM faculty WHERE name LIKE ? OR bio_interest LIKE ? LIMIT 20")
+        print(f"   {'query':<18} {'kind':<15} {'fts p50':>10} {'like p50':>10}  hits")
+        for text, kind in queries(df):
+            hits, fts_ms = time_query(lambda: keyword_search(conn, text, 20), repeat)
+            _, like_ms = time_query(lambda: conn.execute(like_sql, (f"%{text}%",) * 2).fetchall(),
+                                    max(1, repeat // 10))
+            print(f"   {text:<18} {kind:<15} {fts_ms:>8.3f}ms {like_ms:>8.2f}ms  {hits}")
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -0,0 +1,134 @@
+"""
+Ranking quality and latency: keyword (FTS5), vector and hybrid (RRF).
+
+    python -m benchmarks.bench_hybrid [--k 10] [--repeat 20] [--passages 1 4]
+    python -m benchmarks.bench_hybrid --check
+
+Loads the real faculty CSV into a temporary database, encodes it with the
+production model, and scores the hand-labelled queries in
+benchmarks/fixtures/labeled_queries.json (grade 2 = core topic, 1 =
+related) with nDCG@k. Keyword search matches any query term. Latency
+covers ranking only: query encoding (same for the vector and hybrid paths)
+is reported separately, and building result cards is left out. Each
+--passages budget builds its own store (1 = one vector per profile), so
+single- and multi-vector (max-sim) ranking can be compared. --check runs
+only the deep-match regression check (no model needed).
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import faculty_frame
+from embedding_store import db_fingerprint, save_store
+from generate_embeddings import MODEL_NAME, load_rows
+from hybrid_search import HybridSearcher
+from keyword_search import keyword_search
+from passages import load_bios
+from semantic_search import load_search_index
+from store_data import CSV_FILE, load_csv, load_frame
+from vector_search import VectorIndex
+
+LABELS = os.path.join(os.path.dirname(__file__), "fixtures", "labeled_queries.json")
+
+def ndcg(ranked_names, relevant, k):
+    """nDCG@k with graded gains (2^grade - 1)."""
+    dcg = sum((2 ** relevant.get(name, 0) - 1) / np.log2(i + 2) for i, name in enumerate(ranked_names[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / np.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+def build(tmp, model, passages=1):
+    """Embedding store for the temporary database, with up to `passages` vectors per profile."""
+    db_file = os.path.join(tmp, "faculty.db")
+    store_dir = os.path.join(tmp, f"store_p{passages}")
+    conn = sqlite3.connect(db_file)
+    rows = load_rows(conn, max_passages=passages, bios=load_bios())
+    vectors = model.encode(rows["search_text"].tolist())
+    save_store(rows["id"], vectors / np.linalg.norm(vectors, axis=1, keepdims=True), MODEL_NAME,
+               db_fingerprint(conn), normalized=True, store_dir=store_dir, extra={"passages": passages})
+    conn.close()
+    _, index, df = load_search_index(db_file, store_dir)
+    return index, df, len(rows)
+
+def check_deep_match(rows=3000, query="machine learning"):
+    """
+    Every row matches `query`, and the best keyword match is the row with
+    the highest id. It must still lead the lexical ranking. Keyword search
+    used to rank only the first 2000 matches by rowid, which dropped it.
+    Raises AssertionError otherwise.
+    """
+    df = faculty_frame(rows).drop(columns="_areas")
+    df["Area_of_Interest"] = "Machine Learning, " + df["Area_of_Interest"]
+    df.loc[rows - 1, "Name"] = "Machine Learning"   # Name hits weigh most in bm25
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "faculty.db")
+        load_frame(df, db_file)
+        conn = sqlite3.connect(db_file)
+        stored = pd.read_sql_query("SELECT id, name FROM faculty ORDER BY id", conn)
+        # The vector side plays no part here: random unit vectors
+        vectors = np.random.default_rng(0).standard_normal((len(stored), 8)).astype(np.float32)
+        hybrid = HybridSearcher(VectorIndex(vectors), stored)
+        lexical, _ = hybrid.rankings(conn, query, vectors[:1])
+        conn.close()
+    best = stored["name"].iloc[lexical[0]]
+    assert best == "Machine Learning", f"best keyword match lost: ranked first was '{best}'"
+    print(f"Deep-match check OK: the best of {rows} matches (highest id) ranks first.")
+
+def run(k=10, repeat=20, budgets=(1,)):
+    from sentence_transformers import SentenceTransformer
+    with open(LABELS, "r", encoding="utf-8") as f:
+        labeled = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "faculty.db")
+        load_csv(CSV_FILE, db_file)
+        model = SentenceTransformer(MODEL_NAME)
+        conn = sqlite3.connect(db_file)
+
+        texts = [item["query"] for item in labeled]
+        start = time.perf_counter()
+        query_vectors = model.encode(texts)
+        encode_ms = (time.perf_counter() - start) * 1000 / len(texts)
+        print(f"\n{len(labeled)} labelled queries, nDCG@{k}; query encoding {encode_ms:.1f} ms/query (not included)")
+
+        for passages in budgets:
+            index, df, n_vectors = build(tmp, model, passages)
+            hybrid = HybridSearcher(index, df)
+            names = df["Name"].str.lower().tolist()
+            modes = {
+                "keyword": lambda text, vector: [row["name"].lower() for row in keyword_search(conn, text, k, match_all=False)],
+                "vector": lambda text, vector: [names[i] for i in index.search(vector, top_k=k)[0][0]],
+                "hybrid": lambda text, vector: [names[i] for i in hybrid.rank(conn, text, vector, top_k=k)[0]]
+            }
+
+            print(f"\n   passage budget {passages}: {n_vectors} vectors for {len(df)} profiles")
+            print(f"   {'mode':<8} {'nDCG':>6} {'p50':>9} {'p99':>9}")
+            for mode, search in modes.items():
+                gains, times = [], []
+                for item, vector in zip(labeled, query_vectors):
+                    gains.append(ndcg(search(item["query"], vector), item["relevant"], k))
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        search(item["query"], vector)
+                        times.append(time.perf_counter() - start)
+                print(f"   {mode:<8} {np.mean(gains):>6.3f} {np.percentile(times, 50) * 1000:>7.2f}ms "
+                      f"{np.percentile(times, 99) * 1000:>7.2f}ms")
+        conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--passages", type=int, nargs="+", default=[1, 4], help="passage budgets to compare")
+    parser.add_argument("--check", action="store_true", help="only run the deep-match regression check")
+    args = parser.parse_args()
+    if args.check:
+        check_deep_match()
+    else:
+        run(args.k, args.repeat, args.passages)
@@ -0,0 +1,153 @@
+"""
+Listing-page parse benchmark: BeautifulSoup vs lxml backend.
+
+    python -m benchmarks.bench_parse [--repeat 20] [--regen] [--capture]
+
+Fixtures in benchmarks/fixtures/ are rendered from daiict_faculty_final.csv
+with markup modelled on the live listing pages (PAGE_TEMPLATE and
+CARD_TEMPLATE below), so the benchmark runs offline and stays stable
+across site changes. Being well-formed, they only show that the parsers
+agree on clean markup. html.parser and lxml repair broken nesting
+differently, so parity on the real site is only shown by real pages:
+--capture saves the live listings to benchmarks/fixtures/live/, which
+are checked too whenever they are present.
+"""
+import asyncio
+import argparse
+import glob
+import html
+import os
+import statistics
+import time
+
+import pandas as pd
+
+from fetch_engine import AsyncFetcher, RequestsTransport
+from scrape_faculty import HEADERS, PARSERS, URLS
+
+# CONFIGURATION
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CAPTURE_DIR = os.path.join(FIXTURE_DIR, "live")   # Pages saved as served, markup quirks included
+CSV_FILE = "daiict_faculty_final.csv"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} | DA-IICT</title>
+<script>window.dataLayer = window.dataLayer || [];</script></head>
+<body class="path-{slug}">
+<header><nav><ul class="menu"><li><a href="/">Home</a></li><li><a href="/faculty">Faculty</a></li><li><h3>Menu</h3></li></ul></nav>
+<form class="search"><input type="text" name="search"></form></header>
+<main><h1>{title}</h1>
+<div class="facultyInformation"><ul>
+{cards}
+</ul></div></main>
+<footer><ul><li><h3>Quick Links</h3></li><li><a href="/contact">Contact Us</a></li></ul></footer>
+</body></html>
+"""
+
+CARD_TEMPLATE = """<li>
+  <div class="facultyPhoto"><img src="{img}" alt="{name}"></div>
+  <div class="personalDetails">
+    <h3><a href="{href}" hreflang="en">{name}</a></h3>
+    <div class="facultyEducation">{education}</div>
+    <div class="contactDetails">
+      <span class="facultyNumber">{phone}</span>
+      <span class="facultyemail">{email}</span>
+    </div>
+  </div>
+  <div class="areaSpecialization"><p>{interest}</p></div>
+</li>"""
+
+def _field(value, fallback=""):
+    return html.escape(fallback if pd.isna(value) or value == "N/A" else str(value))
+
+def render_listing(df, title):
+    """Renders faculty rows back into listing-page markup."""
+    cards = []
+    for _, row in df.iterrows():
+        email = "" if pd.isna(row['Email']) else str(row['Email']).replace("@", "[at]").replace(".", "[dot]")
+        cards.append(CARD_TEMPLATE.format(
+            name=_field(row['Name']),
+            href=_field(row['Profile_Link']).replace("https://www.daiict.ac.in", ""),
+            img=_field(row['Image_URL']).replace("https://www.daiict.ac.in", ""),
+            education=_field(row['Education']),
+            phone=_field(row['Phone']),
+            email=html.escape(email),
+            interest=_field(row['Area_of_Interest'])
+        ))
+    slug = title.lower().replace(" ", "-")
+    return PAGE_TEMPLATE.format(title=html.escape(title), slug=slug, cards="\n".join(cards))
+
+def write_fixtures(csv_file=CSV_FILE, fixture_dir=FIXTURE_DIR):
+    df = pd.read_csv(csv_file)
+    os.makedirs(fixture_dir, exist_ok=True)
+    for url, category in URLS:
+        subset = df[df['Designation'] == category]
+        path = os.path.join(fixture_dir, url.rsplit("/", 1)[-1] + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_listing(subset, category))
+        print(f"   -> Wrote {path} ({len(subset)} cards)")
+
+def capture_fixtures(capture_dir=CAPTURE_DIR):
+    """Downloads the live listing pages and saves them unmodified."""
+    transport = RequestsTransport(headers=HEADERS)
+    try:
+        pages = asyncio.run(AsyncFetcher(transport).fetch_all([url for url, _ in URLS]))
+    finally:
+        transport.close()
+    os.makedirs(capture_dir, exist_ok=True)
+    for result, _ in pages:
+        if result.error or result.status != 200:
+            print(f"   -> {result.url} failed (Status {result.status}{', ' + result.error if result.error else ''})")
+            continue
+        path = os.path.join(capture_dir, result.url.rsplit("/", 1)[-1] + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(result.text)
+        print(f"   -> Saved {path}")
+
+def load_fixtures(fixture_dir=FIXTURE_DIR):
+    categories = {url.rsplit("/", 1)[-1]: category for url, category in URLS}
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        slug = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8") as f:
+            pages.append((slug, categories.get(slug, slug), f.read()))
+    return pages
+
+def time_parser(parser, page, category, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = parser(page, category)
+        samples.append(time.perf_counter() - start)
+    return rows, statistics.median(samples)
+
+def run(repeat=20):
+    """Returns {page: {backend: (rows, median seconds)}} and prints a summary."""
+    # Captured pages are listed as live/<page>
+    pages = load_fixtures() + [(f"live/{slug}", category, page) for slug, category, page in load_fixtures(CAPTURE_DIR)]
+    if not pages:
+        print(f"No fixtures in '{FIXTURE_DIR}'. Run with --regen first.")
+        return {}
+
+    results = {}
+    print(f"{'Page':<32} | {'Cards':>5} | " + " | ".join(f"{name + ' (ms)':>10}" for name in PARSERS) + " | Parity")
+    print("-" * 80)
+    for slug, category, page in pages:
+        results[slug] = {name: time_parser(parser, page, category, repeat) for name, parser in PARSERS.items()}
+        outputs = [rows for rows, _ in results[slug].values()]
+        parity = "OK" if all(rows == outputs[0] for rows in outputs) else "MISMATCH"
+        timings = " | ".join(f"{t * 1000:>10.2f}" for _, t in results[slug].values())
+        print(f"{slug:<32} | {len(outputs[0]):>5} | {timings} | {parity}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--regen", action="store_true", help="re-render fixtures from the CSV")
+    parser.add_argument("--capture", action="store_true", help=f"save the live listing pages to {CAPTURE_DIR}")
+    args = parser.parse_args()
+    if args.regen:
+        write_fixtures()
+    if args.capture:
+        capture_fixtures()
+    run(args.repeat)
@@ -0,0 +1,61 @@
+"""
+Stored precision of the vectors: size, exact-search latency and recall@k.
+
+    python -m benchmarks.bench_quantize [--rows 200000] [--queries 200]
+
+Compares float32 with the float16 and int8 stores generate_embeddings.py
+writes (--dtype). int8 uses the per-dimension scales from
+vector_search.quantize_int8; the scales are folded into the query, so the
+codes are scored as stored. Vectors and queries come from the synthetic
+corpus (benchmarks/synthetic.py).
+"""
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import recall_at_k
+from benchmarks.synthetic import faculty_vectors, query_vectors
+from vector_search import VectorIndex, quantize_int8
+
+def run(rows=200_000, dim=384, top_k=10, n_queries=200):
+    vectors, queries = faculty_vectors(rows, dim), query_vectors(n_queries, dim)
+
+    codes, scales = quantize_int8(vectors)
+    stored = {"float32": vectors, "float16": vectors.astype(np.float16), "int8": codes}
+    indexes = {
+        "float32": VectorIndex(vectors, normalized=True),
+        # float16 is widened to float32 when loaded: it saves disk, not memory
+        "float16": VectorIndex(stored["float16"], normalized=True),
+        "int8": VectorIndex(codes, normalized=True, scales=scales)
+    }
+
+    print(f"{rows:,} x {dim} vectors, {n_queries} queries\n")
+    print(f"{'dtype':>8} | {'disk MB':>7} | {'RAM MB':>7} | recall@{top_k:<3} | {'p50 (ms)':>8} | {'p99 (ms)':>8}")
+    print("-" * 64)
+    exact, results = None, []
+    for dtype, index in indexes.items():
+        found, samples = [], []
+        for q in queries:
+            t = time.perf_counter()
+            idx, _ = index.search(q, top_k, threshold=-1.0)[0]
+            samples.append((time.perf_counter() - t) * 1000)
+            found.append(idx)
+        exact = exact or found
+        recall = recall_at_k(exact, found, top_k)
+        disk_mb, ram_mb = stored[dtype].nbytes / 1e6, index.vectors.nbytes / 1e6
+        p50, p99 = statistics.median(samples), float(np.percentile(samples, 99))
+        print(f"{dtype:>8} | {disk_mb:>7.1f} | {ram_mb:>7.1f} | {recall:>10.3f} | {p50:>8.3f} | {p99:>8.3f}")
+        results.append({"dtype": dtype, "disk_mb": disk_mb, "ram_mb": ram_mb, "recall": recall,
+                        "p50_ms": p50, "p99_ms": p99})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    run(args.rows, args.dim, args.top_k, args.queries)
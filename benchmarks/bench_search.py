@@ -0,0 +1,64 @@
+"""
+Query latency for vector_search.VectorIndex vs the old cosine_similarity path.
+
+    python -m benchmarks.bench_search [--sizes 100 10000 1000000] [--dim 384]
+
+The baseline (sklearn cosine_similarity + full argsort, as app.py used to
+do) is skipped above --baseline-max rows to keep memory in check.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.synthetic import faculty_vectors, query_vectors
+from vector_search import VectorIndex
+
+try:
+    from sklearn.metrics.pairwise import cosine_similarity
+except ImportError:  # Optional: only needed for the baseline column
+    cosine_similarity = None
+
+def baseline_search(query, vectors, top_k=5):
+    similarities = cosine_similarity(query, vectors).flatten()
+    top = similarities.argsort()[-top_k:][::-1]
+    return [i for i in top if similarities[i] > 0.2]
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def run(sizes, dim=384, top_k=5, repeat=20, batch=32, baseline_max=100_000):
+    print(f"{'Rows':>10} | {'baseline (ms)':>13} | {'index (ms)':>10} | {'batch/query (ms)':>16} | speedup")
+    print("-" * 70)
+    results = []
+    for n in sizes:
+        vectors = faculty_vectors(n, dim)
+        index = VectorIndex(vectors, normalized=True)
+        queries = query_vectors(batch, dim)
+        q = queries[:1]
+
+        reps = max(3, repeat if n <= 100_000 else repeat // 4)
+        t_index = median_ms(lambda: index.search(q, top_k), reps)
+        t_batch = median_ms(lambda: index.search(queries, top_k), max(3, reps // 2)) / batch
+        t_base = None
+        if cosine_similarity is not None and n <= baseline_max:
+            t_base = median_ms(lambda: baseline_search(q, vectors, top_k), reps)
+
+        base = f"{t_base:>13.3f}" if t_base is not None else f"{'skipped':>13}"
+        speedup = f"{t_base / t_index:.1f}x" if t_base is not None else "-"
+        print(f"{n:>10,} | {base} | {t_index:>10.3f} | {t_batch:>16.3f} | {speedup}")
+        results.append({"rows": n, "baseline_ms": t_base, "index_ms": t_index, "batch_per_query_ms": t_batch})
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--baseline-max", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.top_k, baseline_max=args.baseline_max)
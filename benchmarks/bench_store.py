@@ -0,0 +1,49 @@
+"""
+Bulk upsert benchmark for store_data.store_data.
+
+    python -m benchmarks.bench_store [--rows 100000]
+
+Loads N rows of the synthetic corpus (benchmarks/synthetic.py, cleaned
+by transform_data) into a fresh database, reloads them unchanged, then
+reloads with ~10% of rows edited and ~1% new.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import faculty_frame
+from store_data import init_db, store_data, transform_data
+
+def synthetic_frame(rows, seed=0, start=0):
+    """Corpus rows as transform_data leaves them (the "N/A" e-mails exercise the name-keyed path)."""
+    return transform_data(faculty_frame(rows, seed, start).drop(columns="_areas"))
+
+def timed(label, df, db_file):
+    start = time.perf_counter()
+    counts = store_data(df, db_file=db_file)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<22} {elapsed:>7.2f}s  {len(df) / elapsed:>10,.0f} rows/s  {counts}")
+    return elapsed
+
+def run(rows=100_000):
+    df = synthetic_frame(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        init_db(db_file)
+        timed("initial load", df, db_file)
+        timed("reload (no changes)", df, db_file)
+
+        churn = df.copy()
+        edited = churn.sample(frac=0.10, random_state=1).index
+        churn.loc[edited, "Phone"] = "079-00000000"
+        # Rows past the end of the corpus: new e-mails and profile links
+        extra = synthetic_frame(rows // 100, start=rows)
+        timed("reload (10% churn)", pd.concat([churn, extra], ignore_index=True), db_file)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    run(parser.parse_args().rows)
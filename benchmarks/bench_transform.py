@@ -0,0 +1,98 @@
+"""
+transform_data benchmark and parity check against the per-cell cleaners.
+
+    python -m benchmarks.bench_transform [--rows 200000]
+
+The reference path applies clean_phone / clean_text_field / the N/A
+lambdas cell by cell, exactly as transform_data used to. Both paths must
+produce identical frames or the script exits non-zero.
+"""
+import argparse
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import faculty_frame
+from store_data import CSV_FILE, clean_phone, clean_text_field, transform_data
+
+COLUMNS = ["Phone", "Email", "Education", "Area_of_Interest", "Image_URL"]
+
+# Awkward values seen (or plausible) in scrape dumps
+EDGE_CASES = {
+    "Phone": ["N/A", "", " 079-6826 1598 ", "+91 79 6826", "079-(0)68261", None, "079-"],
+    "Email": ["N/A", "x[at]y", "", None, "n/a@x.org", "someone@dau.ac.in"],
+    "Education": ["N/A", " nan ", "", "  ", "PhD â€“ IIT", "Master’s", "MSc â€™ X", None],
+    "Area_of_Interest": ["N/A", "nan", "  ML, â€“ Vision  ", None, "Graphs"],
+    "Image_URL": ["N/A", "https://x/N/A.png", None, "https://x/a.jpg"],
+}
+
+def transform_reference(df):
+    """The original per-cell implementation of transform_data."""
+    df['Phone'] = df['Phone'].apply(clean_phone)
+    df['Email'] = df['Email'].apply(lambda x: None if "N/A" in str(x) else x)
+    df['Education'] = df['Education'].apply(clean_text_field)
+    df['Area_of_Interest'] = df['Area_of_Interest'].apply(clean_text_field)
+    df['Image_URL'] = df['Image_URL'].apply(lambda x: None if "N/A" in str(x) else x)
+    return df
+
+def _same(a, b):
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+def compare(expected, actual):
+    """Returns a list of (column, row, expected, actual) mismatches."""
+    mismatches = []
+    for column in COLUMNS:
+        for i, (a, b) in enumerate(zip(expected[column], actual[column])):
+            if not _same(a, b) or type(a) is not type(b) and not (pd.isna(a) and pd.isna(b)):
+                mismatches.append((column, i, a, b))
+    return mismatches
+
+def synthetic_frame(rows, seed=0):
+    """Synthetic corpus rows, with edge cases sprinkled in."""
+    df = faculty_frame(rows, seed).drop(columns="_areas")
+    rng = np.random.default_rng([seed, 2])
+    for column, values in EDGE_CASES.items():
+        df[column] = df[column].astype(object)
+        picks = rng.random(rows) < 0.05
+        df.loc[picks, column] = rng.choice(np.array(values, dtype=object), picks.sum())
+    return df
+
+def as_read(df):
+    """Round-trips a frame through CSV so dtypes and NA parsing match read_csv."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+def run(rows=200_000):
+    synthetic = synthetic_frame(rows)
+    frames = [
+        ("csv", pd.read_csv(CSV_FILE)),
+        (f"synthetic x{rows}", synthetic),
+        (f"synthetic x{rows} (csv)", as_read(synthetic))
+    ]
+    ok = True
+    for label, df in frames:
+        start = time.perf_counter()
+        expected = transform_reference(df.copy())
+        t_ref = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = transform_data(df.copy(), timestamp="fixed")
+        t_vec = time.perf_counter() - start
+
+        mismatches = compare(expected, actual)
+        ok = ok and not mismatches
+        print(f"   {label:<28} rows={len(df):>8}  per-cell={t_ref:.3f}s  vectorized={t_vec:.3f}s  "
+              f"speedup={t_ref / t_vec:.1f}x  parity={'OK' if not mismatches else 'MISMATCH'}")
+        for mismatch in mismatches[:10]:
+            print(f"      {mismatch}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    sys.exit(0 if run(parser.parse_args().rows) else 1)
@@ -0,0 +1,130 @@
+"""
+Offline regression checks for the data pipeline.
+
+    python -m benchmarks.checks [crawl_refresh partial_scrape ...]
+
+Each check builds what it needs in a temporary directory (canned listing
+and profile pages through fetch_engine.StaticTransport, no network, no
+model) and
+raises AssertionError when the behaviour it guards is broken. The script
+exits non-zero if any check fails.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.bench_parse import FIXTURE_DIR
+from fetch_engine import StaticTransport
+from pipeline import artifact_path, build_stages, run_pipeline
+from scrape_faculty import URLS, IncompleteScrapeError, scrape_listings
+from store_data import CSV_FILE, connect, load_frame
+
+def _crawl_fixture(inputs, settings):
+    """Pipeline crawl stage over the canned pages in settings["pages"] (url -> body)."""
+    from profile_crawler import crawl_frame
+    with open(settings["pages"], "r", encoding="utf-8") as f:
+        bodies = json.load(f)
+    # Each page carries an ETag of its body, so an unchanged page answers 304
+    pages = {url: (200, body, {"ETag": hashlib.sha1(body.encode("utf-8")).hexdigest()})
+             for url, body in bodies.items()}
+    df = crawl_frame(inputs["scrape"], StaticTransport(pages), cache_dir=settings["cache_dir"])
+    return df, len(df)
+
+def check_crawl_refresh(rows=5):
+    """
+    The listings stay the same and one profile page changes between two
+    pipeline runs: the new bio must reach the crawl artifact. The crawl
+    stage used to be keyed on the listings alone, so it was skipped.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        listings = os.path.join(tmp, "listings.csv")
+        pages_file = os.path.join(tmp, "pages.json")
+        artifact_dir = os.path.join(tmp, "artifacts")
+        df = pd.read_csv(CSV_FILE).head(rows)
+        df.to_csv(listings, index=False)
+        pages = {url: f"<div class='aboutFaculty'><p>Bio of {name}.</p></div>"
+                 for url, name in zip(df["Profile_Link"], df["Name"])}
+
+        # scrape and crawl only: store and embed need a database and a model
+        settings = {"pages": pages_file, "cache_dir": os.path.join(tmp, "profile_cache")}
+        stages = [stage._replace(run=_crawl_fixture, settings=settings) if stage.name == "crawl" else stage
+                  for stage in build_stages(listings) if stage.name in ("scrape", "crawl")]
+
+        def crawled():
+            with open(pages_file, "w", encoding="utf-8") as f:
+                json.dump(pages, f)
+            report = {r["stage"]: r for r in run_pipeline(stages, parallel=False, artifact_dir=artifact_dir)}
+            frame = pd.read_parquet(artifact_path("crawl", report["crawl"]["output"], artifact_dir))
+            return report["crawl"]["output"], dict(zip(frame["Profile_Link"], frame["Bio"]))
+
+        first, _ = crawled()
+        edited = df["Profile_Link"].iloc[rows // 2]
+        pages[edited] = "<div class='aboutFaculty'><p>Now working on quantum sensing.</p></div>"
+        second, bios = crawled()
+        assert bios[edited] == "Now working on quantum sensing.", f"edited bio lost: '{bios[edited]}'"
+        assert second != first, "crawl artifact unchanged after a profile edit"
+        # Nothing changed since: the same artifact, so embed would be skipped
+        third, _ = crawled()
+        assert third == second, "crawl artifact changed without a page changing"
+    print("Crawl refresh check OK: an edited profile reaches the crawl artifact with unchanged listings.")
+
+def check_partial_scrape(failing="https://www.daiict.ac.in/adjunct-faculty"):
+    """
+    One listing page keeps answering 503. The scrape must refuse to return
+    a partial frame, and if a partial frame is loaded anyway, the rows of
+    the missing category must not be pruned. The load used to delete them
+    (a third of the directory) and log them as deletes for the embeddings.
+    """
+    pages = {}
+    for url, _ in URLS:
+        with open(os.path.join(FIXTURE_DIR, url.rsplit("/", 1)[-1] + ".html"), encoding="utf-8") as f:
+            pages[url] = f.read()
+    pages[failing] = (503, "", {})
+
+    try:
+        scrape_listings(StaticTransport(pages))
+        raise AssertionError("a scrape with a failed page returned rows")
+    except IncompleteScrapeError as e:
+        assert e.failed == [failing], f"wrong failed pages: {e.failed}"
+    partial = scrape_listings(StaticTransport(pages), allow_partial=True)
+    missing = dict(URLS)[failing]
+    assert missing not in set(partial["Designation"]), "the failed category has rows"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "faculty.db")
+        full = pd.read_csv(CSV_FILE)
+        load_frame(full.copy(), db_file)
+        totals = load_frame(partial, db_file)
+        conn = connect(db_file)
+        left = conn.execute("SELECT COUNT(*) FROM faculty WHERE designation = ?", (missing,)).fetchone()[0]
+        deletes = conn.execute("SELECT COUNT(*) FROM faculty_changes WHERE op = 'delete'").fetchone()[0]
+        conn.close()
+        assert totals["deleted"] == 0 and deletes == 0, f"partial load pruned {totals['deleted']} rows"
+        assert left == (full["Designation"] == missing).sum(), f"{missing}: {left} rows left"
+        # A faculty member who really left is still pruned
+        totals = load_frame(full.iloc[1:].copy(), db_file)
+        assert totals["deleted"] == 1, f"a single departure pruned {totals['deleted']} rows"
+    print(f"Partial scrape check OK: a failed '{missing}' page neither returns nor prunes rows.")
+
+CHECKS = {"crawl_refresh": check_crawl_refresh, "partial_scrape": check_partial_scrape}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("checks", nargs="*", help=f"any of {', '.join(CHECKS)} (default: all)")
+    names = parser.parse_args().checks or list(CHECKS)
+    unknown = [name for name in names if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown checks: {', '.join(unknown)}")
+    failed = []
+    for name in names:
+        try:
+            CHECKS[name]()
+        except AssertionError as e:
+            print(f"{name} FAILED: {e}")
+            failed.append(name)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,457 @@
+"""
+Benchmark suite: every stage from scrape parsing to the API, on a
+synthetic corpus (benchmarks/synthetic.py) at a chosen scale, with the
+results saved as JSON so runs can be compared over time.
+
+    python -m benchmarks.suite [--scales 1k 100k 1m] [--stages parse transform store embed search api]
+    python -m benchmarks.suite --compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Stages (each scale gets a fresh corpus, database and store in a temp dir):
+
+- parse: listing parsers on the saved HTML fixtures (scale-independent)
+- transform: transform_data over the CSV, in store_data's read chunks
+- store: load_csv into an empty database, an unchanged reload, a reload
+  with 10% of rows edited and 1% new, then back to the original
+- embed: encoder throughput on a sample of the profiles, with the full
+  build time extrapolated from it (encoding 1M profiles on a laptop CPU
+  takes hours), then the IVF build and the float32 / int8 store writes
+- search: exact, int8 and IVF latency (p50/p99), batched QPS, recall@10
+  against exact, and latency with a designation filter
+- api: uvicorn serving main:app from the synthetic database and store,
+  hit by concurrent keep-alive clients. The response and query caches
+  stay on, as in production, so repeated queries are cache hits.
+
+Each run writes benchmarks/results/<time>-<commit>.json holding
+{"meta": machine and versions, "results": {scale: {stage: metrics}}}.
+--compare prints every metric two runs share with the ratio new / old,
+flags changes of more than 10% for the worse, and exits with 1 if any.
+The 1m scale needs about 4 GB of memory (search keeps three indexes).
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from ann_index import IVFIndex
+from benchmarks.bench_ann import recall_at_k
+from benchmarks.bench_parse import load_fixtures, time_parser
+from benchmarks.synthetic import AREAS, SCALES, faculty_frame, parse_scale, query_vectors, write_corpus
+from embedding_store import db_fingerprint, save_store
+from encoder_backend import ONNX_DIR, encoder_label, load_encoder
+from generate_embeddings import MODEL_NAME, build_ann, encode_texts, iter_rows
+from scrape_faculty import PARSERS
+from search_filters import FacetIndex
+from store_data import CHUNK_SIZE, load_csv, read_chunks, transform_data
+from vector_search import VectorIndex, quantize_int8
+
+# CONFIGURATION
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+STAGES = ["parse", "transform", "store", "embed", "search", "api"]
+DIM = 384               # all-MiniLM-L6-v2 (MODEL_NAME); the API stage needs the encoder's dimension
+TOP_K = 10
+N_QUERIES = 200
+BATCH = 32
+FILTER = "Adjunct Faculty International"   # Designation of ~10% of the rows
+EMBED_SAMPLE = 1000     # Profiles encoded to measure encoder throughput
+API_CLIENTS = 8         # Concurrent connections
+API_REQUESTS = 400      # Requests per endpoint
+API_STARTUP = 120       # Seconds uvicorn gets to load the index and model
+REGRESSION = 0.10       # --compare flags changes beyond this share
+# Metric name endings -> which direction is better (others are only listed)
+HIGHER_IS_BETTER = ("_per_s", "qps", "recall")
+LOWER_IS_BETTER = ("_ms", "_s", "_mb")
+
+Corpus = namedtuple("Corpus", ["rows", "dir", "csv", "npy", "db", "seed", "dim"])
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99))}
+
+def dir_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 2 ** 20
+
+def ensure_db(corpus):
+    """The stages after store need the database; build it if store did not run."""
+    if not os.path.exists(corpus.db):
+        load_csv(corpus.csv, corpus.db)
+
+# 1. STAGES
+def bench_parse(repeat=20):
+    pages = load_fixtures()
+    if not pages:
+        return {"skipped": "no fixtures (python -m benchmarks.bench_parse --regen)"}
+    result = {"pages": len(pages)}
+    for name, parser in PARSERS.items():
+        timed = [time_parser(parser, page, category, repeat) for _, category, page in pages]
+        seconds = sum(t for _, t in timed)
+        result["cards"] = sum(len(rows) for rows, _ in timed)
+        result[f"{name}_ms"] = seconds * 1000
+        result[f"{name}_cards_per_s"] = result["cards"] / seconds
+    return result
+
+def bench_transform(corpus):
+    seconds = 0.0
+    for chunk in read_chunks(corpus.csv, CHUNK_SIZE):
+        start = time.perf_counter()
+        transform_data(chunk, timestamp="2024-01-01 00:00:00")
+        seconds += time.perf_counter() - start
+    return {"transform_s": seconds, "rows_per_s": corpus.rows / seconds}
+
+def write_churn(corpus, path):
+    """The corpus with 10% of phone numbers edited and 1% new rows (the same ones every run)."""
+    rng = np.random.default_rng([corpus.seed, 4])
+    for i, chunk in enumerate(read_chunks(corpus.csv, CHUNK_SIZE)):
+        chunk.loc[rng.random(len(chunk)) < 0.10, "Phone"] = "079-00000000"
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    extra = faculty_frame(max(1, corpus.rows // 100), corpus.seed, start=corpus.rows)
+    extra.drop(columns="_areas").to_csv(path, mode="a", header=False, index=False)
+
+def bench_store(corpus):
+    churn_csv = os.path.join(corpus.dir, "churn.csv")
+    write_churn(corpus, churn_csv)
+    result, counts = {}, {}
+    # The last load restores the corpus, so the later stages see it unchanged
+    for label, csv_file in (("initial", corpus.csv), ("unchanged", corpus.csv), ("churn", churn_csv),
+                            ("restore", corpus.csv)):
+        start = time.perf_counter()
+        counts[label] = load_csv(csv_file, corpus.db)
+        seconds = time.perf_counter() - start
+        result[f"{label}_s"] = seconds
+        result[f"{label}_rows_per_s"] = corpus.rows / seconds
+    result["counts"] = counts
+    return result
+
+def corpus_vectors(corpus):
+    """
+    (faculty ids, their vectors, db fingerprint). Row i of the matrix is CSV
+    row i, the faculty whose profile link ends in "-i".
+    """
+    conn = sqlite3.connect(corpus.db)
+    try:
+        df = pd.read_sql_query("SELECT id, profile_link FROM faculty", conn)
+        fingerprint = db_fingerprint(conn)
+    finally:
+        conn.close()
+    rows = df["profile_link"].str.rsplit("-", n=1).str[1].astype(np.int64).to_numpy()
+    order = np.argsort(rows)
+    matrix = np.load(corpus.npy, mmap_mode="r")
+    return df["id"].to_numpy()[order], np.asarray(matrix[rows[order]]), fingerprint
+
+def save_stores(corpus, dtypes=("float32",)):
+    """
+    Writes the corpus vectors as embedding stores in the corpus dir, the way
+    generate_embeddings.py does (IVF above ANN_MIN_ROWS). "embedding_store"
+    (float32) is the one the API serves. Returns the timings.
+    """
+    ids, vectors, fingerprint = corpus_vectors(corpus)
+    start = time.perf_counter()
+    ids, vectors, arrays, extra = build_ann(ids, vectors)
+    result = {"ann_build_s": time.perf_counter() - start, "ann_lists": (extra["ann"] or {}).get("n_lists", 0)}
+    for dtype in dtypes:
+        store_dir = os.path.join(corpus.dir, "embedding_store" if dtype == "float32" else f"embedding_store_{dtype}")
+        shutil.rmtree(store_dir, ignore_errors=True)
+        start = time.perf_counter()
+        stored, store_arrays = vectors, dict(arrays)
+        if dtype == "int8":
+            stored, store_arrays["scales"] = quantize_int8(vectors)
+        save_store(ids, stored, MODEL_NAME, fingerprint, dtype=dtype, normalized=True, arrays=store_arrays,
+                   extra=extra, store_dir=store_dir)
+        result[f"save_{dtype}_s"] = time.perf_counter() - start
+        result[f"store_{dtype}_mb"] = dir_mb(store_dir)
+    return result
+
+def bench_embed(corpus, encoder):
+    ensure_db(corpus)
+    result = {}
+    if isinstance(encoder, str):
+        result["encoder_skipped"] = encoder
+    else:
+        conn = sqlite3.connect(corpus.db)
+        try:
+            texts = next(iter_rows(conn, EMBED_SAMPLE))["search_text"].tolist()
+        finally:
+            conn.close()
+        encode_texts(encoder, texts[:32])   # Warm-up
+        start = time.perf_counter()
+        encode_texts(encoder, texts)
+        seconds = time.perf_counter() - start
+        result.update(encoder=encoder_label(encoder), encode_texts_per_s=len(texts) / seconds,
+                      encode_full_s=corpus.rows * seconds / len(texts))
+    result.update(save_stores(corpus, ("float32", "int8")))
+    return result
+
+def time_queries(index, queries, rows=None, perm=None):
+    """Per-query latency and the top-k of each query (as corpus rows when the index is permuted)."""
+    samples, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        indices, _ = index.search(query, TOP_K, threshold=-1.0, rows=rows)[0]
+        samples.append(time.perf_counter() - start)
+        found.append(indices if perm is None else perm[indices])
+    return samples, found
+
+def bench_search(corpus):
+    matrix = np.load(corpus.npy, mmap_mode="r")
+    queries = query_vectors(N_QUERIES, corpus.dim, corpus.seed)
+    facets = FacetIndex(pd.read_csv(corpus.csv, usecols=["Designation", "Email", "Education"]))
+    allowed = facets.rows(designation=FILTER)
+
+    exact = VectorIndex(matrix, normalized=True)
+    codes, scales = quantize_int8(np.asarray(matrix))
+    start = time.perf_counter()
+    perm, ivf = IVFIndex.build(matrix).packed()
+    result = {"ivf_build_s": time.perf_counter() - start, "filter_share": len(allowed) / corpus.rows}
+    # Packed IVF rows are a permutation of the corpus: map the filter's rows into it
+    indexes = {"exact": (exact, None, allowed), "int8": (VectorIndex(codes, scales=scales), None, allowed),
+               "ivf": (ivf, perm, np.sort(np.argsort(perm)[allowed]))}
+
+    _, truth = time_queries(exact, queries)
+    for name, (index, index_perm, rows) in indexes.items():
+        samples, found = time_queries(index, queries, perm=index_perm)
+        filtered, _ = time_queries(index, queries, rows=rows)
+        start = time.perf_counter()
+        for i in range(0, len(queries), BATCH):
+            index.search(queries[i:i + BATCH], TOP_K, threshold=-1.0)
+        result[name] = dict(percentiles(samples), batch_qps=len(queries) / (time.perf_counter() - start),
+                            recall=recall_at_k(truth, found, TOP_K),
+                            filtered_p50_ms=percentiles(filtered)["p50_ms"])
+    return result
+
+# 2. API
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_api(corpus, port):
+    """Runs uvicorn main:app with the corpus dir as working directory; returns once it serves."""
+    onnx_dir = os.path.join(ROOT, ONNX_DIR)
+    if os.path.isdir(onnx_dir):
+        try:
+            os.symlink(onnx_dir, os.path.join(corpus.dir, ONNX_DIR))
+        except OSError:
+            pass   # e.g. no symlink privilege on Windows: the API falls back to torch
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    log_file = os.path.join(corpus.dir, "uvicorn.log")
+    with open(log_file, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+             "--log-level", "warning"],
+            cwd=corpus.dir, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+    deadline = time.time() + API_STARTUP
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with {process.returncode}, see {log_file}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"uvicorn did not start within {API_STARTUP}s")
+
+def load_test(port, paths, clients=API_CLIENTS):
+    """GETs `paths` over `clients` keep-alive connections at once. Returns QPS, latency and errors."""
+    jobs, lock = iter(paths), threading.Lock()
+    latencies, errors = [], [0]
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while True:
+            with lock:
+                path = next(jobs, None)
+            if path is None:
+                break
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += not ok
+        conn.close()
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict(percentiles(latencies), qps=len(latencies) / (time.perf_counter() - start), errors=errors[0])
+
+def bench_api(corpus, encoder):
+    ensure_db(corpus)
+    result = {}
+    semantic = not isinstance(encoder, str) and encoder.get_sentence_embedding_dimension() == corpus.dim
+    if not semantic:
+        result["semantic_skipped"] = encoder if isinstance(encoder, str) else \
+            f"encoder dimension {encoder.get_sentence_embedding_dimension()} != --dim {corpus.dim}"
+    elif not os.path.exists(os.path.join(corpus.dir, "embedding_store")):
+        save_stores(corpus)
+
+    rng = np.random.default_rng([corpus.seed, 5])
+    areas = [quote(area) for area in np.array(AREAS)[rng.integers(len(AREAS), size=API_REQUESTS)]]
+    endpoints = {
+        "faculty": [f"/faculty?limit=100&after_id={i}" for i in rng.integers(0, corpus.rows, API_REQUESTS)],
+        "search": [f"/faculty/search?q={q}&limit=20" for q in areas]
+    }
+    if semantic:
+        endpoints["semantic"] = [f"/faculty/semantic?q={q}&k={TOP_K}" for q in areas]
+        endpoints["semantic_filtered"] = [f"{path}&designation={quote(FILTER)}" for path in endpoints["semantic"]]
+
+    port = free_port()
+    process = start_api(corpus, port)
+    try:
+        for name, paths in endpoints.items():
+            result[name] = load_test(port, paths)
+    finally:
+        process.terminate()
+        process.wait()
+    return result
+
+# 3. RUNS
+def run_meta(seed, dim):
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {"commit": git("rev-parse", "--short", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "cpu_count": os.cpu_count(), "numpy": np.__version__,
+            "pandas": pd.__version__, "seed": seed, "dim": dim}
+
+def run(scales=("1k",), stages=STAGES, seed=0, dim=DIM, out_dir=RESULTS_DIR):
+    """Runs the stages at every scale, writes the JSON report and returns it."""
+    encoder = None
+    if {"embed", "api"} & set(stages):
+        try:
+            encoder = load_encoder(MODEL_NAME)
+        except Exception as e:   # No model files and no network: encoder numbers are skipped
+            encoder = f"{type(e).__name__}: {e}"
+
+    results = {}
+    if "parse" in stages:
+        print("\n== parse")
+        results["fixtures"] = {"parse": bench_parse()}
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            rows = parse_scale(scale)
+            csv_file, npy_file = write_corpus(rows, tmp, dim, seed)
+            corpus = Corpus(rows, tmp, csv_file, npy_file, os.path.join(tmp, "faculty.db"), seed, dim)
+            report = results[scale] = {"corpus": {"rows": rows, "generate_s": time.perf_counter() - start}}
+            for stage in STAGES[1:]:
+                if stage not in stages:
+                    continue
+                print(f"\n== {scale}: {stage}")
+                if stage == "transform":
+                    report[stage] = bench_transform(corpus)
+                elif stage == "store":
+                    report[stage] = bench_store(corpus)
+                elif stage == "embed":
+                    report[stage] = bench_embed(corpus, encoder)
+                elif stage == "search":
+                    report[stage] = bench_search(corpus)
+                else:
+                    report[stage] = bench_api(corpus, encoder)
+
+    run_report = {"meta": run_meta(seed, dim), "results": results}
+    os.makedirs(out_dir, exist_ok=True)
+    meta = run_report["meta"]
+    path = os.path.join(out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{meta['commit'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run_report, f, indent=2)
+    print()
+    for name, value in flatten(results):
+        print(f"{name:<48} {value:>14.4g}")
+    print(f"\nWrote {path}")
+    return run_report
+
+# 4. COMPARISON
+def flatten(results, prefix=""):
+    """(dotted name, value) for every number in the results."""
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+def direction(name):
+    """1 when higher is better, -1 when lower is better, 0 for plain counts."""
+    metric = name.rsplit(".", 1)[-1]
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+def compare(old_file, new_file):
+    """Prints the metrics both runs have; returns the number of regressions."""
+    with open(old_file, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_file, "r", encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"old: {old['meta']['commit']} {old['meta']['timestamp']}  new: {new['meta']['commit']} "
+          f"{new['meta']['timestamp']}")
+    for key in ("seed", "dim", "cpu_count"):
+        if old["meta"].get(key) != new["meta"].get(key):
+            print(f"Note: {key} differs ({old['meta'].get(key)} vs {new['meta'].get(key)}), the corpora are not alike")
+    before = dict(flatten(old["results"]))
+    print(f"\n{'metric':<48} | {'old':>12} | {'new':>12} | {'new/old':>8}")
+    print("-" * 92)
+    regressions = 0
+    for name, value in flatten(new["results"]):
+        if name not in before:
+            continue
+        ratio = value / before[name] if before[name] else float("inf") if value else 1.0
+        sign = direction(name)
+        worse = (sign > 0 and ratio < 1 - REGRESSION) or (sign < 0 and ratio > 1 + REGRESSION)
+        better = (sign > 0 and ratio > 1 + REGRESSION) or (sign < 0 and ratio < 1 - REGRESSION)
+        regressions += worse
+        flag = "  WORSE" if worse else "  better" if better else ""
+        print(f"{name:<48} | {before[name]:>12.4g} | {value:>12.4g} | {ratio:>8.2f}{flag}")
+    print(f"\n{regressions} regression(s) beyond {REGRESSION:.0%}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", nargs="+", default=["1k"], help="row counts or " + ", ".join(SCALES))
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dim", type=int, default=DIM, help="vector dimension (must match the encoder for the API)")
+    parser.add_argument("--out", default=RESULTS_DIR, help="directory for the JSON report")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two reports instead of running")
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(1 if compare(*args.compare) else 0)
+    run(args.scales, args.stages, args.seed, args.dim, args.out)
@@ -0,0 +1,229 @@
+"""
+Synthetic faculty corpus: scrape-dump CSVs and embedding matrices at any
+scale, deterministic for a given seed.
+
+    python -m benchmarks.synthetic --rows 100k [--dim 384] [--out synthetic]
+
+Rows look like daiict_faculty_final.csv before cleaning: designations in
+the real proportions, two to five research areas from one field, "PhD
+(Subject), Institute, City" education, some second e-mail addresses and
+the same kinds of "N/A" and mis-encoded values the scraper produces, so
+transform_data and the facet filters have real work to do. Embedding
+rows are built from the row's research areas (one centre per area, areas
+of a field close together), so the matrix has the cluster structure of
+real profile embeddings and topic queries have true neighbours.
+
+Shared by every benchmark that needs faculty rows or vectors, and by
+benchmarks/suite.py.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from vector_search import l2_normalize
+
+# CONFIGURATION
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK = 100_000   # Rows generated at a time (caps peak memory at 1M rows)
+
+# Shares as on the live site
+DESIGNATIONS = {"Faculty": 0.61, "Adjunct Faculty": 0.23, "Adjunct Faculty International": 0.10,
+                "Professor of Practice": 0.04, "Distinguished Professor": 0.02}
+FIELDS = {
+    "Computer Science": [
+        "Machine Learning", "Deep Learning", "Computer Vision", "Natural Language Processing",
+        "Information Retrieval", "Databases", "Distributed Systems", "Cloud Computing", "Computer Networks",
+        "Cyber Security", "Cryptography", "Algorithms", "Graph Theory", "Software Engineering",
+        "Human Computer Interaction", "Data Mining", "Internet of Things", "Blockchain"
+    ],
+    "Electrical Engineering": [
+        "VLSI Design", "Embedded Systems", "Signal Processing", "Image Processing", "Wireless Communication",
+        "5G Networks", "Antenna Design", "Control Systems", "RF Circuits", "Optical Communication",
+        "Speech Processing"
+    ],
+    "Mathematics": [
+        "Combinatorics", "Number Theory", "Probability", "Statistics", "Optimization", "Numerical Analysis",
+        "Operations Research", "Mathematical Biology"
+    ],
+    "Physics": ["Quantum Computing", "Plasma Physics", "Condensed Matter", "Photonics", "Astrophysics"],
+    "Humanities and Design": [
+        "Development Economics", "Linguistics", "Literature", "Anthropology", "Visual Communication",
+        "Interaction Design", "Film Studies", "Philosophy", "Psychology"
+    ]
+}
+AREAS = [area for areas in FIELDS.values() for area in areas]
+INSTITUTES = [
+    "IIT Bombay", "IIT Delhi", "IIT Kharagpur", "IIT Madras", "IIT Kanpur", "IIT Gandhinagar", "IIT Roorkee",
+    "IISc Bangalore", "DA-IICT Gandhinagar", "Indian Statistical Institute, Kolkata", "Jadavpur University, Kolkata",
+    "University of Calcutta", "IIIT Hyderabad", "NIT Trichy", "TIFR Mumbai", "Homi Bhabha National Institute, Mumbai",
+    "University of Chicago, USA", "Columbia University, New York, USA", "Carnegie Mellon University, USA",
+    "University of Southampton, UK", "University of Rennes, France", "Aalto University, Finland",
+    "National Institute of Design, Ahmedabad", "IIM Ahmedabad", "Jawaharlal Nehru University, New Delhi"
+]
+DEGREES = {"PhD": 0.86, "M.Tech.": 0.05, "MSc": 0.03, "MA": 0.03, "PhD - Pursuing": 0.03}
+FIRST_NAMES = [
+    "Aarti", "Abhishek", "Amit", "Anil", "Anjali", "Arnab", "Bhaskar", "Deepak", "Gaurav", "Hemant", "Jaya",
+    "Kavita", "Krishna", "Lavneet", "Madhukant", "Manish", "Meera", "Mukesh", "Nabin", "Neha", "Pankaj", "Prasenjit",
+    "Priya", "Rahul", "Rajib", "Ranjan", "Rutu", "Sanjay", "Saurabh", "Shruti", "Sourish", "Srimanta", "Sunita",
+    "Tapas", "Uma", "Vinay", "Yash", "Zeenat"
+]
+LAST_NAMES = [
+    "Agrawal", "Banerjee", "Bhatt", "Chaturvedi", "Das", "Desai", "Dubey", "Ghosh", "Gupta", "Iyer", "Jain", "Joshi",
+    "Kundu", "Majumder", "Mehta", "Mishra", "Nair", "Pandya", "Patel", "Rao", "Roy", "Saha", "Sharma", "Shah",
+    "Singh", "Sinha", "Tiwari", "Trivedi", "Verma", "Yadav"
+]
+# Share of cells that come back in the scraper's awkward forms
+NOISE = {"email_na": 0.01, "second_email": 0.05, "phone_na": 0.08, "education_na": 0.03, "mis_encoded": 0.01,
+         "image_na": 0.02}
+
+def parse_scale(value):
+    """"100k" / "1m" / "2500" -> row count."""
+    value = str(value).lower()
+    return SCALES[value] if value in SCALES else int(value)
+
+def _pick(rng, options, size):
+    """Weighted choice from {value: share} or uniform from a list; returns an object array."""
+    if isinstance(options, dict):
+        weights = np.array(list(options.values()), dtype=float)
+        return np.array(list(options), dtype=object)[rng.choice(len(options), size, p=weights / weights.sum())]
+    return np.array(options, dtype=object)[rng.integers(len(options), size=size)]
+
+AREA_FIELD = np.repeat(np.arange(len(FIELDS)), [len(areas) for areas in FIELDS.values()])
+
+def _areas(rng, size):
+    """Research-area indices per row: a field, then 2-5 distinct areas from it."""
+    field = rng.integers(len(FIELDS), size=size)
+    # Random order within the field first, then the other areas in random order
+    order = np.argsort(-(rng.random((size, len(AREAS))) + (AREA_FIELD == field[:, None])), axis=1)
+    counts = rng.integers(2, 6, size=size)
+    picks = order[:, :5].copy()
+    # One profile in five swaps its last area for another field's (interdisciplinary)
+    other = np.take_along_axis(order, np.bincount(AREA_FIELD)[field][:, None], axis=1)[:, 0]
+    swap = rng.random(size) < 0.2
+    picks[swap, counts[swap] - 1] = other[swap]
+    return field, [row[:n].tolist() for row, n in zip(picks, counts)]
+
+def _area_rng(seed, start):
+    """Research areas draw from a stream of their own, so faculty_vectors() needs no frame."""
+    return np.random.default_rng([seed, start, 1])
+
+def faculty_frame(rows, seed=0, start=0, designations=DESIGNATIONS):
+    """
+    `rows` raw scrape rows (the CSV columns of scrape_faculty.py), plus an
+    `_areas` column of research-area indices for embedding_matrix().
+    `start` offsets the row numbers, so chunks of one corpus stay unique.
+    `designations` ({value: share}) overrides the live site's mix.
+    """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, start + rows)
+    first, last = _pick(rng, FIRST_NAMES, rows), _pick(rng, LAST_NAMES, rows)
+    field, areas = _areas(_area_rng(seed, start), rows)
+    subjects = np.array(list(FIELDS), dtype=object)[field]
+
+    email = np.array([f"{f.lower()}_{l.lower()}{i}@dau.ac.in" for f, l, i in zip(first, last, index)], dtype=object)
+    second = rng.random(rows) < NOISE["second_email"]
+    email[second] = [f"{e}, {e.split('@')[0].replace('_', '.')}@gmail.com" for e in email[second]]
+    email[rng.random(rows) < NOISE["email_na"]] = "N/A"
+
+    phone = np.array([f"079-6826{n:04d}" for n in rng.integers(0, 10_000, rows)], dtype=object)
+    phone[rng.random(rows) < NOISE["phone_na"]] = "N/A"
+
+    education = np.array([f"{d} ({s}), {u}" for d, s, u in zip(_pick(rng, DEGREES, rows), subjects,
+                                                                _pick(rng, INSTITUTES, rows))], dtype=object)
+    glitch = rng.random(rows) < NOISE["mis_encoded"]
+    education[glitch] = [e.replace(" (", " â€“ (", 1) for e in education[glitch]]
+    education[rng.random(rows) < NOISE["education_na"]] = "N/A"
+
+    slugs = [f"{f.lower()}-{l.lower()}-{i}" for f, l, i in zip(first, last, index)]
+    image = np.array([f"https://www.daiict.ac.in/sites/default/files/faculty_image/{s}.jpg" for s in slugs], dtype=object)
+    image[rng.random(rows) < NOISE["image_na"]] = "N/A"
+
+    return pd.DataFrame({
+        "Name": [f"{f} {l}" for f, l in zip(first, last)],
+        "Designation": _pick(rng, designations, rows),
+        "Email": email,
+        "Phone": phone,
+        "Education": education,
+        "Area_of_Interest": [", ".join(AREAS[a] for a in row) for row in areas],
+        "Profile_Link": [f"https://www.daiict.ac.in/faculty/{s}" for s in slugs],
+        "Image_URL": image,
+        "_areas": areas
+    })
+
+def faculty_chunks(rows, seed=0, chunk=CHUNK, designations=DESIGNATIONS):
+    """A corpus of `rows` rows as faculty_frame chunks (each seeded by its first row number)."""
+    for start in range(0, rows, chunk):
+        yield faculty_frame(min(chunk, rows - start), seed, start, designations)
+
+def area_centres(dim=384, seed=0):
+    """One unit vector per research area; areas of a field share a component."""
+    rng = np.random.default_rng([seed, 1])
+    centres = []
+    for areas in FIELDS.values():
+        field = rng.standard_normal(dim)
+        centres += [field + 1.2 * rng.standard_normal(dim) for _ in areas]
+    return l2_normalize(np.array(centres))
+
+def embedding_matrix(area_rows, dim=384, seed=0, spread=0.6, out=None, offset=0):
+    """
+    Unit-length float32 rows: mean of the row's area centres plus noise.
+    Writes into `out` (e.g. an np.lib.format.open_memmap) when given.
+    `offset` is the corpus row number of area_rows[0] (seeds the noise).
+    """
+    centres = area_centres(dim, seed).astype(np.float32)
+    out = np.empty((len(area_rows), dim), dtype=np.float32) if out is None else out
+    for start in range(0, len(area_rows), CHUNK):
+        block = area_rows[start:start + CHUNK]
+        rng = np.random.default_rng([seed, 2, offset + start])
+        width = max(len(row) for row in block)
+        picks = np.array([row + [-1] * (width - len(row)) for row in block])
+        mean = np.zeros((len(block), dim), dtype=np.float32)
+        for j in range(width):
+            mean += centres[picks[:, j]] * (picks[:, j] >= 0)[:, None]
+        noise = rng.standard_normal(mean.shape, dtype=np.float32) * spread / np.sqrt(dim)
+        out[start:start + len(block)] = l2_normalize(mean + noise)
+    return out
+
+def faculty_vectors(rows, dim=384, seed=0, out=None, chunk=CHUNK):
+    """
+    Embedding matrix of the faculty_chunks(rows, seed) corpus (row i = row
+    i of the CSV), computed without building the frames.
+    """
+    out = np.empty((rows, dim), dtype=np.float32) if out is None else out
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        _, areas = _areas(_area_rng(seed, start), n)
+        embedding_matrix(areas, dim, seed, out=out[start:start + n], offset=start)
+    return out
+
+def query_vectors(n, dim=384, seed=0, spread=0.6):
+    """Topic queries: one or two area centres plus noise, like "ML and vision"."""
+    centres = area_centres(dim, seed)
+    rng = np.random.default_rng([seed, 3])
+    picks = [rng.choice(len(centres), rng.integers(1, 3), replace=False) for _ in range(n)]
+    mean = np.array([centres[p].mean(axis=0) for p in picks], dtype=np.float32)
+    return l2_normalize(mean + rng.standard_normal(mean.shape, dtype=np.float32) * spread / np.sqrt(dim))
+
+def write_corpus(rows, out_dir, dim=384, seed=0):
+    """Writes faculty_<rows>.csv and embeddings_<rows>.npy (row i = CSV row i); returns both paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    csv_path = os.path.join(out_dir, f"faculty_{rows}.csv")
+    npy_path = os.path.join(out_dir, f"embeddings_{rows}.npy")
+    matrix = np.lib.format.open_memmap(npy_path, mode="w+", dtype=np.float32, shape=(rows, dim))
+    faculty_vectors(rows, dim, seed, out=matrix)
+    matrix.flush()
+    for i, df in enumerate(faculty_chunks(rows, seed)):
+        df.drop(columns="_areas").to_csv(csv_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return csv_path, npy_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", default="1k", help="row count or one of " + ", ".join(SCALES))
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="synthetic")
+    args = parser.parse_args()
+    paths = write_corpus(parse_scale(args.rows), args.out, args.dim, args.seed)
+    print("Wrote " + " and ".join(paths))
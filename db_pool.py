@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote
+
+# CONFIGURATION
+POOL_SIZE = 8
+MMAP_SIZE = 256 * 1024 * 1024   # Bytes of the database file read through mmap
+CACHED_STATEMENTS = 256         # Prepared statements kept per connection
+
+def fetch_dicts(cursor):
+    """All remaining rows of `cursor` as dicts (column names looked up once)."""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+class ConnectionPool:
+    """
+    Fixed-size pool of read-only SQLite connections for the API.
+
+    Connections are opened lazily (up to `size`) and reused, so a request
+    skips the open, keeps the per-connection prepared-statement cache warm
+    and reads through mmap. `run()` executes a function on a dedicated
+    executor for async handlers, so blocking SQLite calls never run on the
+    event loop. Writers (store_data.py) put the database in WAL mode, which
+    lets these readers run while a load is in progress.
+    """
+
+    def __init__(self, db_file, size=POOL_SIZE, mmap_size=MMAP_SIZE):
+        self.db_file = db_file
+        self.size = size
+        self.mmap_size = mmap_size
+        self._idle = queue.LifoQueue()   # LIFO: the warmest connection goes out first
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite")
+
+    def _open(self):
+        uri = f"file:{quote(os.path.abspath(self.db_file))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA query_only = 1")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrows a connection; blocks when all `size` are in use."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def dedicated(self):
+        """
+        A read-only connection of its own, closed afterwards, for long readers
+        (streamed exports) that would otherwise keep a pooled one busy for
+        as long as the client takes to download.
+        """
+        conn = self._open()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _call(self, fn, args):
+        with self.connection() as conn:
+            return fn(conn, *args)
+
+    async def run(self, fn, *args):
+        """Runs fn(conn, *args) on the pool's executor and awaits the result."""
+        loop = asyncio.get_running_loop()
+        # With the caller's context, like asyncio.to_thread (e.g. an active request profile)
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, self._call, fn, args)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
@@ -0,0 +1,150 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# CONFIGURATION
+STORE_DIR = "embedding_store"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+KEEP_VERSIONS = 2   # Older files are removed once two newer builds exist
+DTYPES = ("float32", "float16", "int8")   # int8 stores per-dimension scales as arrays["scales"]
+
+# Layout of STORE_DIR:
+#   manifest.json        sidecar: version, model, dim, dtype, ids file, fingerprint,
+#                        and whether rows are already L2-normalised
+#   vectors.v<N>.npy     (count, dim) matrix, opened with mmap_mode='r'
+#   ids.v<N>.npy         int64 faculty ids, row i of the matrix belongs to ids[i]
+#   <name>.v<N>.npy      optional extra arrays listed under manifest["arrays"]
+#                        (e.g. the IVF index from ann_index.py)
+# Every build writes new versioned files and then swaps the manifest, so a
+# process that already mapped version N keeps reading it undisturbed.
+
+class EmbeddingStoreError(Exception):
+    """The store is missing or unreadable."""
+
+class EmbeddingMismatchError(EmbeddingStoreError):
+    """The vectors were built from different faculty data (or model) than expected."""
+
+def fingerprint(pairs):
+    """SHA-1 over (faculty id, content_hash) pairs, order-independent."""
+    digest = hashlib.sha1()
+    for faculty_id, row_hash in sorted((int(i), h or "") for i, h in pairs):
+        digest.update(f"{faculty_id}:{row_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def db_fingerprint(conn):
+    """Fingerprint of the faculty table as it is right now."""
+    return fingerprint(conn.execute("SELECT id, content_hash FROM faculty").fetchall())
+
+def read_manifest(store_dir=STORE_DIR):
+    """Returns the manifest dict, or None when no store has been built yet."""
+    path = os.path.join(store_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_store(ids, vectors, model, fingerprint, change_id=0, dtype="float32",
+               normalized=False, arrays=None, extra=None, store_dir=STORE_DIR):
+    """
+    Writes a new store version and publishes it. `arrays` ({name: ndarray})
+    are saved as versioned .npy files next to the vectors; `extra` is merged
+    into the manifest. Returns the manifest.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {DTYPES}, got '{dtype}'")
+    if dtype == "int8" and (np.asarray(vectors).dtype != np.int8 or "scales" not in (arrays or {})):
+        raise ValueError("int8 stores need int8 codes and arrays['scales'] (vector_search.quantize_int8)")
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = np.asarray(vectors, dtype=dtype)
+    if vectors.ndim != 2 or len(vectors) != len(ids):
+        raise ValueError(f"expected ({len(ids)}, dim) vectors, got {vectors.shape}")
+
+    os.makedirs(store_dir, exist_ok=True)
+    previous = read_manifest(store_dir)
+    version = (previous["version"] + 1) if previous else 1
+
+    vectors_file = f"vectors.v{version}.npy"
+    ids_file = f"ids.v{version}.npy"
+    np.save(os.path.join(store_dir, vectors_file), vectors)
+    np.save(os.path.join(store_dir, ids_file), ids)
+    array_files = {}
+    for name, array in (arrays or {}).items():
+        array_files[name] = f"{name}.v{version}.npy"
+        np.save(os.path.join(store_dir, array_files[name]), np.asarray(array))
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "model": model,
+        "dim": int(vectors.shape[1]),
+        "dtype": dtype,
+        "count": int(len(ids)),
+        "vectors_file": vectors_file,
+        "ids_file": ids_file,
+        "fingerprint": fingerprint,
+        "change_id": int(change_id),
+        "normalized": bool(normalized),
+        "arrays": array_files
+    }
+    manifest.update(extra or {})
+    tmp = os.path.join(store_dir, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(store_dir, MANIFEST))
+
+    _prune_versions(store_dir, version)
+    return manifest
+
+def _prune_versions(store_dir, current):
+    for path in glob.glob(os.path.join(store_dir, "*.v*.npy")):
+        try:
+            version = int(path.rsplit(".v", 1)[1].split(".")[0])
+        except ValueError:
+            continue
+        if version <= current - KEEP_VERSIONS:
+            try:
+                os.remove(path)
+            except OSError:
+                # Still mapped by another process (Windows); next build retries
+                pass
+
+def open_store(store_dir=STORE_DIR, expected_fingerprint=None, expected_model=None):
+    """
+    Maps the current store version read-only. Pages are loaded lazily by
+    the OS and shared between every process that maps the same file.
+    Returns (manifest, ids, vectors). Raises EmbeddingMismatchError when the
+    store does not belong to `expected_fingerprint` / `expected_model`.
+    """
+    manifest = read_manifest(store_dir)
+    if manifest is None:
+        raise EmbeddingStoreError(f"No embedding store in '{store_dir}'. Run 'generate_embeddings.py' first.")
+    if manifest.get("format") != FORMAT_VERSION:
+        raise EmbeddingStoreError(f"Unsupported store format {manifest.get('format')}.")
+
+    if expected_model is not None and manifest["model"] != expected_model:
+        raise EmbeddingMismatchError(
+            f"Store was built with '{manifest['model']}', expected '{expected_model}'."
+        )
+    if expected_fingerprint is not None and manifest["fingerprint"] != expected_fingerprint:
+        raise EmbeddingMismatchError(
+            "Faculty data changed since the vectors were built. Run 'generate_embeddings.py'."
+        )
+
+    vectors = np.load(os.path.join(store_dir, manifest["vectors_file"]), mmap_mode="r")
+    ids = np.load(os.path.join(store_dir, manifest["ids_file"]), mmap_mode="r")
+    if vectors.shape != (manifest["count"], manifest["dim"]) or len(ids) != manifest["count"]:
+        raise EmbeddingStoreError(
+            f"Store files do not match the manifest: vectors {vectors.shape}, ids {len(ids)}."
+        )
+    return manifest, ids, vectors
+
+def open_arrays(manifest, store_dir=STORE_DIR):
+    """Maps the extra arrays of a store version read-only: {name: ndarray}."""
+    return {
+        name: np.load(os.path.join(store_dir, filename), mmap_mode="r")
+        for name, filename in manifest.get("arrays", {}).items()
+    }
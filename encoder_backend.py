@@ -0,0 +1,275 @@
+"""
+Sentence encoders for the app, the API and generate_embeddings.py.
+
+    python encoder_backend.py export [--quantize]   # one-off, needs torch
+
+"torch" is the sentence-transformers model. "onnx" runs the same network
+exported to ONNX (optionally with int8 weights) on onnxruntime, with the
+tokenizers library and NumPy mean pooling: no torch import at startup and
+lower per-query latency on CPU. An export is only written after its
+output has been checked against the torch model.
+
+The embedding manifest records the backend label that built the vectors
+("encoder"); the app and the API encode queries with the same one.
+"""
+import argparse
+import inspect
+import json
+import os
+import tempfile
+
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:  # optional: the torch backend is used instead
+    onnxruntime = None
+
+from vector_search import l2_normalize
+
+# CONFIGURATION
+ENCODER_BACKEND = "auto"   # "torch", "onnx", or "auto" (onnx when a matching export exists)
+ONNX_DIR = "onnx_model"
+CONFIG_FILE = "encoder.json"
+MIN_COSINE = {False: 0.9999, True: 0.98}   # Export check against torch: float weights / int8 weights
+CHECK_TEXTS = [
+    "machine learning",
+    "Professor, PhD IIT Bombay, wireless communication and signal processing",
+    "VLSI",
+    "who works on natural language processing and information retrieval for Indian languages?",
+    "Assistant Professor Computer Vision Deep Learning Medical Imaging",
+    "graph theory, combinatorics, algorithms"
+]
+
+def read_onnx_config(onnx_dir=ONNX_DIR):
+    """The export's encoder.json, or None when there is no (verified) export."""
+    path = os.path.join(onnx_dir, CONFIG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _onnx_label(config):
+    return "onnx-int8" if config["quantized"] else "onnx"
+
+def _auto_config(model_name, onnx_dir):
+    """The export "auto" picks for `model_name`, or None (then it uses torch)."""
+    if onnxruntime is None:
+        return None
+    config = read_onnx_config(onnx_dir)
+    return config if config is not None and config["model"] == model_name else None
+
+class OnnxEncoder:
+    """
+    Drop-in for SentenceTransformer.encode on an exported model: tokenise
+    (padding to the longest text in the batch, truncating at the model's
+    max_seq_length), run the transformer, mean-pool over real tokens and
+    normalise if the original pipeline did.
+    """
+
+    def __init__(self, onnx_dir=ONNX_DIR, threads=None, config=None):
+        if onnxruntime is None:
+            raise ImportError("onnxruntime is not installed (pip install onnxruntime)")
+        from tokenizers import Tokenizer
+
+        self.config = config or read_onnx_config(onnx_dir)
+        if self.config is None:
+            raise FileNotFoundError(f"No ONNX export in '{onnx_dir}/'. Run: python encoder_backend.py export")
+        self.tokenizer = Tokenizer.from_file(os.path.join(onnx_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_id"], pad_token=self.config["pad_token"])
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(onnx_dir, self.config["file"]), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self.label = _onnx_label(self.config)
+
+    def get_sentence_embedding_dimension(self):
+        return self.config["dimension"]
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, normalize_embeddings=False, **kwargs):
+        """(n, dim) float32 embeddings, or one vector for a single string."""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        # Longest first, like sentence-transformers, so batches pad to similar lengths
+        order = np.argsort([-len(text) for text in sentences], kind="stable")
+        ordered = [sentences[i] for i in order]
+        out = np.empty((len(sentences), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(ordered), batch_size):
+            encodings = self.tokenizer.encode_batch(ordered[start:start + batch_size])
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            weights = mask[:, :, None].astype(np.float32)
+            out[order[start:start + len(encodings)]] = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        if self.config["normalize"] or normalize_embeddings:
+            out = l2_normalize(out)
+        return out[0] if single else out
+
+def encoder_label(encoder):
+    """Backend name of a loaded encoder: "torch", "onnx" or "onnx-int8"."""
+    return getattr(encoder, "label", "torch")
+
+def cache_name(model_name, encoder):
+    """Query-cache key: vectors from different backends are not mixed."""
+    label = encoder_label(encoder)
+    return model_name if label == "torch" else f"{model_name}+{label}"
+
+def load_encoder(model_name, backend=ENCODER_BACKEND, onnx_dir=ONNX_DIR):
+    """
+    Returns an object with SentenceTransformer's encode(). "auto" uses the
+    ONNX export when onnxruntime is installed and the export was made from
+    `model_name`, and the torch model otherwise.
+    """
+    if backend not in ("auto", "torch", "onnx"):
+        raise ValueError(f"Unknown encoder backend: {backend}")
+    if backend == "onnx":
+        encoder = OnnxEncoder(onnx_dir)
+        if encoder.config["model"] != model_name:
+            raise ValueError(f"'{onnx_dir}/' holds {encoder.config['model']}, not {model_name}. Re-run the export.")
+        return encoder
+    if backend == "auto":
+        config = _auto_config(model_name, onnx_dir)
+        if config is not None:
+            return OnnxEncoder(onnx_dir, config=config)
+    # Imported here: the torch import is most of the cold start
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+def backend_label(model_name, backend=ENCODER_BACKEND, onnx_dir=ONNX_DIR):
+    """The encoder_label() load_encoder(model_name, backend) would give, without loading anything."""
+    if backend == "torch":
+        return "torch"
+    config = read_onnx_config(onnx_dir) if backend == "onnx" else _auto_config(model_name, onnx_dir)
+    if config is None:
+        return "onnx" if backend == "onnx" else "torch"
+    return _onnx_label(config)
+
+def load_store_encoder(manifest, onnx_dir=ONNX_DIR):
+    """
+    Query encoder for an embedding store: the backend that built its
+    vectors (manifest["encoder"]; stores without it were built by torch).
+    If that one cannot be loaded, or the export changed since (e.g. it is
+    int8 now), whatever load_encoder picks is used and a warning printed:
+    query and stored vectors then come from different networks.
+    """
+    built_with = manifest.get("encoder", "torch")
+    try:
+        encoder = load_encoder(manifest["model"], "torch" if built_with == "torch" else "onnx", onnx_dir)
+    except (ImportError, FileNotFoundError, ValueError) as e:
+        print(f"Cannot load the '{built_with}' encoder the store was built with ({e}).")
+        encoder = load_encoder(manifest["model"], onnx_dir=onnx_dir)
+    if encoder_label(encoder) != built_with:
+        print(f"Warning: queries are encoded with '{encoder_label(encoder)}' but the stored vectors were built "
+              f"with '{built_with}'. Re-run generate_embeddings.py to rebuild them.")
+    return encoder
+
+def compare(reference, candidate):
+    """(min cosine, max abs difference) between two sets of embeddings."""
+    reference, candidate = np.asarray(reference, dtype=np.float32), np.asarray(candidate, dtype=np.float32)
+    cosine = np.sum(l2_normalize(reference) * l2_normalize(candidate), axis=1)
+    return float(cosine.min()), float(np.abs(reference - candidate).max())
+
+def _mean_pooling(pooling):
+    """True for a Pooling module that only averages token embeddings."""
+    config = pooling.get_config_dict()
+    if "pooling_mode" in config:   # newer sentence-transformers
+        return config["pooling_mode"] == "mean"
+    modes = {key for key, on in config.items() if key.startswith("pooling_mode_") and on}
+    return modes == {"pooling_mode_mean_tokens"}
+
+def export_onnx(model_name, onnx_dir=ONNX_DIR, quantize=False, opset=14):
+    """
+    Exports the transformer of a mean-pooling sentence-transformers model to
+    ONNX, optionally with dynamically quantised int8 weights, then checks
+    it against torch on CHECK_TEXTS. encoder.json is written last, so a
+    failed or out-of-tolerance export is never picked up by load_encoder.
+    """
+    if onnxruntime is None:
+        raise ImportError("onnxruntime is not installed (pip install onnxruntime)")
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = model[0], model[1]
+    if not isinstance(pooling, models.Pooling) or not _mean_pooling(pooling):
+        raise ValueError(f"{model_name} does not use mean pooling; only mean pooling is exported")
+    tokenizer = transformer.tokenizer
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    config_path = os.path.join(onnx_dir, CONFIG_FILE)
+    if os.path.exists(config_path):
+        os.remove(config_path)
+    tokenizer.save_pretrained(onnx_dir)
+
+    sample = dict(tokenizer(["an example query"], return_tensors="pt"))
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    axes = {name: {0: "batch", 1: "tokens"} for name in input_names + ["last_hidden_state"]}
+    float_file = os.path.join(onnx_dir, "model.onnx")
+
+    class LastHiddenState(torch.nn.Module):
+        # Fixed positional signature: the exporter maps inputs by position
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    # The TorchScript exporter (newer torch defaults to the dynamo one)
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer.auto_model).eval(), tuple(sample[name] for name in input_names), float_file,
+            input_names=input_names, output_names=["last_hidden_state"], dynamic_axes=axes,
+            opset_version=opset, **legacy
+        )
+    file = "model.onnx"
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        file = "model_int8.onnx"
+        quantize_dynamic(float_file, os.path.join(onnx_dir, file), weight_type=QuantType.QInt8)
+
+    reference = model.encode(CHECK_TEXTS)
+    config = {
+        "model": model_name,
+        "file": file,
+        "quantized": quantize,
+        "dimension": int(reference.shape[1]),
+        "max_seq_length": model.max_seq_length,
+        "normalize": any(isinstance(module, models.Normalize) for module in model),
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token
+    }
+    # Checked through the same code path the app uses
+    min_cosine, max_diff = compare(reference, OnnxEncoder(onnx_dir, config=config).encode(CHECK_TEXTS))
+    if min_cosine < MIN_COSINE[quantize]:
+        raise ValueError(f"ONNX output differs from torch: min cosine {min_cosine:.5f} < {MIN_COSINE[quantize]}")
+
+    config.update(min_cosine=min_cosine, max_abs_diff=max_diff)
+    fd, scratch = tempfile.mkstemp(dir=onnx_dir, suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    os.replace(scratch, config_path)
+    return config
+
+if __name__ == "__main__":
+    from generate_embeddings import MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Export the sentence encoder to ONNX.")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--dir", default=ONNX_DIR)
+    parser.add_argument("--quantize", action="store_true", help="int8 weights (onnxruntime dynamic quantisation)")
+    args = parser.parse_args()
+    config = export_onnx(args.model, args.dir, quantize=args.quantize)
+    print(f"Exported {config['model']} to '{args.dir}/{config['file']}': "
+          f"min cosine vs torch {config['min_cosine']:.5f}, max abs diff {config['max_abs_diff']:.2e}")
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# CONFIGURATION
+PER_HOST_LIMIT = 4      # Max in-flight requests against a single host
+MAX_RETRIES = 3         # Extra attempts after the first one fails
+BACKOFF_BASE = 0.5      # Seconds; doubles after every failed attempt
+TIMEOUT = 15
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int
+    text: str = ""
+    headers: dict = field(default_factory=dict)
+    elapsed: float = 0.0    # Wall time including retries and queueing
+    attempts: int = 1
+    error: str = None
+
+# 1. TRANSPORTS
+# A transport only knows how to perform one GET. Everything else
+# (concurrency, retries, timing) lives in AsyncFetcher, so tests can swap the
+# network for canned pages without touching the engine.
+class RequestsTransport:
+    """Keep-alive transport backed by one pooled requests.Session."""
+
+    def __init__(self, headers=None, pool_size=PER_HOST_LIMIT, timeout=TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def _get(self, url, headers):
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return response.status_code, response.text, dict(response.headers)
+
+    async def get(self, url, headers=None):
+        # requests is blocking, so each call runs on a worker thread while the
+        # Session keeps the underlying sockets alive between calls
+        return await asyncio.to_thread(self._get, url, headers)
+
+    def close(self):
+        self.session.close()
+
+class StaticTransport:
+    """Serves canned HTML from a dict of url -> body (or (status, body, headers))."""
+
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.delay = delay
+        self.calls = []
+
+    async def get(self, url, headers=None):
+        self.calls.append((url, dict(headers or {})))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        page = self.pages.get(url)
+        if page is None:
+            return 404, "", {}
+        status, body, page_headers = page if isinstance(page, tuple) else (200, page, {})
+        # Honour conditional requests so cache revalidation can be exercised offline
+        etag = page_headers.get("ETag")
+        if status == 200 and etag and (headers or {}).get("If-None-Match") == etag:
+            return 304, "", page_headers
+        return status, body, page_headers
+
+    def close(self):
+        pass
+
+# 2. ENGINE
+class AsyncFetcher:
+    """Fetches many URLs concurrently with a per-host limit and retry/backoff."""
+
+    def __init__(self, transport, per_host_limit=PER_HOST_LIMIT,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+        self.transport = transport
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._host_slots = {}
+
+    def _slot(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def fetch(self, url, headers=None):
+        """GETs one URL; never raises, failures come back in FetchResult.error."""
+        start = time.perf_counter()
+        status, text, resp_headers, error = 0, "", {}, None
+
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                async with self._slot(url):
+                    status, text, resp_headers = await self.transport.get(url, headers)
+                error = None
+                if status not in RETRY_STATUSES:
+                    break
+                error = f"HTTP {status}"
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+
+            if attempt <= self.max_retries:
+                # Sleep outside the host slot so other URLs can use it
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+
+        return FetchResult(
+            url=url, status=status, text=text, headers=resp_headers,
+            elapsed=time.perf_counter() - start, attempts=attempt, error=error
+        )
+
+    async def fetch_all(self, urls, on_result=None, headers=None):
+        """
+        Fetches every URL concurrently and returns [(result, on_result output)]
+        in input order. `on_result(result)` may be a coroutine; it runs as soon
+        as each page lands, so post-processing overlaps the remaining downloads.
+        """
+        async def run(url):
+            result = await self.fetch(url, headers)
+            if on_result is not None:
+                outcome = on_result(result)
+                if asyncio.iscoroutine(outcome):
+                    outcome = await outcome
+                return result, outcome
+            return result, None
+
+        return await asyncio.gather(*(run(url) for url in urls))
+
+def print_timings(results):
+    """Prints a per-URL timing table for a finished run."""
+    print(f"\n{'URL':<60} | {'Status':>6} | {'Tries':>5} | {'Time (s)':>8}")
+    print("-" * 90)
+    for r in results:
+        print(f"{r.url[:60]:<60} | {r.status or 'ERR':>6} | {r.attempts:>5} | {r.elapsed:>8.3f}")
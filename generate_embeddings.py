@@ -1,53 +1,324 @@
+import argparse
+import time
 import pandas as pd
-from sentence_transformers import SentenceTransformer
-import pickle
+import numpy as np
+import sqlite3
 import os
 
+from ann_index import ANN_MIN_ROWS, IVFIndex
+from encoder_backend import ENCODER_BACKEND, backend_label, encoder_label, load_encoder
+from embedding_store import DTYPES, STORE_DIR, db_fingerprint, open_arrays, open_store, read_manifest, save_store
+from passages import MAX_PASSAGES, bios_digest, bios_from_frame, load_bios, to_passages
+from vector_search import VectorIndex, dequantize_int8, l2_normalize, quantize_int8
+
 # CONFIGURATION
-CSV_FILE = "daiict_faculty_final.csv"
-OUTPUT_FILE = "faculty_embeddings.pkl"
+DB_FILE = "faculty.db"
+MODEL_NAME = 'all-MiniLM-L6-v2'
+BATCH_SIZE = 64          # Texts per forward pass
+READ_CHUNK = 20_000      # Rows read from the database (and encoded) at a time
+QUALITY_SAMPLE = 200     # Stored rows used as queries to check reduced-precision vectors
+
+# Columns that make up the text the model reads, in order
+TEXT_COLUMNS = ["name", "designation", "bio_interest", "education"]
+
+def _search_text(df, max_passages=1, bios=None):
+    if max_passages > 1:
+        # One row per passage (passages.py); ids repeat
+        return to_passages(df, bios, max_passages)
+    # We combine name, designation, and bio into one big string for the AI to read
+    text = df[TEXT_COLUMNS[0]].fillna("").astype(str)
+    for column in TEXT_COLUMNS[1:]:
+        text = text + " " + df[column].fillna("").astype(str)
+    df['search_text'] = text
+    return df[["id", "search_text"]]
+
+def load_rows(conn, ids=None, max_passages=1, bios=None):
+    """
+    Returns faculty ids and their search text (optionally only for `ids`).
+    With max_passages > 1, each profile becomes up to that many passages.
+    """
+    query = f"SELECT id, {', '.join(TEXT_COLUMNS)}, profile_link FROM faculty"
+    params = ()
+    if ids is not None:
+        ids = [int(i) for i in ids]
+        if not ids:
+            return pd.DataFrame(columns=["id", "search_text"])
+        query += f" WHERE id IN ({', '.join('?' * len(ids))})"
+        params = ids
+    return _search_text(pd.read_sql_query(query + " ORDER BY id", conn, params=params), max_passages, bios)
+
+def iter_rows(conn, chunk_size=READ_CHUNK, max_passages=1, bios=None):
+    """Yields (id, search_text) frames for up to `chunk_size` faculty in id order (keyset on id)."""
+    last_id = -1
+    while True:
+        df = pd.read_sql_query(
+            f"SELECT id, {', '.join(TEXT_COLUMNS)}, profile_link FROM faculty WHERE id > ? ORDER BY id LIMIT ?",
+            conn, params=(last_id, chunk_size)
+        )
+        if df.empty:
+            return
+        last_id = int(df['id'].iloc[-1])
+        yield _search_text(df, max_passages, bios)
+
+def encode_texts(model, texts, batch_size=BATCH_SIZE, pool=None):
+    """
+    Encodes texts longest first, so every batch pads to similar lengths and
+    the chunks handed to pool workers cost about the same, then restores the
+    input order. `pool` comes from model.start_multi_process_pool().
+    """
+    order = np.argsort([-len(text) for text in texts], kind="stable")
+    ordered = [texts[i] for i in order]
+    if pool is not None:
+        encoded = model.encode_multi_process(ordered, pool, batch_size=batch_size)
+    else:
+        encoded = model.encode(ordered, batch_size=batch_size, show_progress_bar=False)
+    vectors = np.empty((len(texts), np.shape(encoded)[1]), dtype=np.float32)
+    vectors[order] = encoded
+    return vectors
+
+def quality_check(vectors, stored, scales=None, k=10, sample=QUALITY_SAMPLE, seed=0):
+    """
+    Recall@k of reduced-precision `stored` vectors against the float32
+    originals, using a sample of rows as queries. 1.0 = identical top-k.
+    """
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(sample, len(vectors)), replace=False)]
+    exact = VectorIndex(vectors, normalized=True)
+    reduced = VectorIndex(stored, normalized=True, scales=scales)
+    recalls = []
+    for start in range(0, len(queries), 16):   # Bounds the (queries x rows) score matrix
+        batch = queries[start:start + 16]
+        for (a, _), (b, _) in zip(exact.search(batch, k, threshold=-1.0), reduced.search(batch, k, threshold=-1.0)):
+            recalls.append(len(np.intersect1d(a, b)) / max(len(a), 1))
+    return float(np.mean(recalls))
+
+def pending_changes(conn, since):
+    """
+    Collapses the changelog after `since` into the final state per faculty id.
+    Returns (ids to (re-)encode, ids to drop, last change_id seen).
+    """
+    changes = conn.execute(
+        "SELECT change_id, faculty_id, op FROM faculty_changes WHERE change_id > ? ORDER BY change_id",
+        (since,)
+    ).fetchall()
+    if not changes:
+        return set(), set(), since
+
+    last_op = {}
+    for _, faculty_id, op in changes:
+        last_op[faculty_id] = op
+    upserts = {fid for fid, op in last_op.items() if op != "delete"}
+    deletes = {fid for fid, op in last_op.items() if op == "delete"}
+    return upserts, deletes, changes[-1][0]
+
+def patch_vectors(ids, vectors, new_ids, new_vectors, deleted):
+    """
+    Replaces every stored row of a changed faculty member with their new
+    rows (a profile may now have more or fewer passages), appends new
+    faculty and drops deleted ones.
+    """
+    new_ids = np.asarray(new_ids, dtype=np.int64)
+    keep = ~np.isin(ids, np.concatenate([new_ids, np.asarray(list(deleted), dtype=np.int64)]))
+    ids, vectors = ids[keep], vectors[keep]
+    if len(new_ids):
+        ids = np.concatenate([ids, new_ids])
+        vectors = np.vstack([vectors, np.asarray(new_vectors, dtype=vectors.dtype)])
+    return ids, vectors
+
+def build_ann(ids, vectors, mode="auto", n_lists=None, previous=None):
+    """
+    Builds the IVF index for large corpora. Incremental runs keep the
+    previous centroids and only re-bucket rows, unless the corpus size moved
+    by more than 2x. Rows are returned re-ordered bucket by bucket so each
+    bucket is one contiguous block of the stored matrix.
+    Returns (ids, vectors, arrays, manifest extra) for save_store.
+    """
+    if mode == "none" or (mode == "auto" and len(vectors) < ANN_MIN_ROWS):
+        return ids, vectors, {}, {"ann": None}
 
-def generate_embeddings():
+    centroids = None
+    if previous and (previous.get("ann") or {}).get("type") == "ivf" and n_lists is None:
+        if previous["count"] / 2 <= len(vectors) <= previous["count"] * 2:
+            centroids = np.array(open_arrays(previous)["ivf_centroids"])
+
+    print(f"Building IVF index ({'re-bucketing' if centroids is not None else 'training'})...")
+    perm, index = IVFIndex.build(vectors, n_lists=n_lists, centroids=centroids).packed()
+    return ids[perm], index.vectors, index.to_arrays(), {"ann": {"type": "ivf", "n_lists": index.n_lists}}
+
+def generate_embeddings(full=False, dtype="float32", ann="auto", ann_lists=None,
+                        batch_size=BATCH_SIZE, workers=1, chunk_size=READ_CHUNK, backend=ENCODER_BACKEND,
+                        passages=MAX_PASSAGES, profiles=None):
+    """
+    Builds or patches the embedding store. `profiles` is a crawled
+    (Profile_Link, Bio, Publications) frame; by default the crawl CSV is
+    read. Returns the store manifest, or None on error.
+    """
     print("Starting AI Embedding Generator...")
 
-    # 1. Check if CSV exists
-    if not os.path.exists(CSV_FILE):
-        print(f"Error: '{CSV_FILE}' not found. Please run 'scrape_faculty.py' first.")
+    # 1. Check if the database exists
+    if not os.path.exists(DB_FILE):
+        print(f"Error: '{DB_FILE}' not found. Please run 'store_data.py' first.")
         return
 
-    # 2. Load Data
-    print("Loading faculty data...")
-    df = pd.read_csv(CSV_FILE)
-    print(f"   -> Loaded {len(df)} records.")
+    conn = sqlite3.connect(DB_FILE)
+    manifest = None if full else read_manifest()
+    if manifest is not None and (manifest["model"] != MODEL_NAME or manifest["dtype"] != dtype):
+        print(f"   -> Stored vectors are {manifest['model']}/{manifest['dtype']}, rebuilding as {MODEL_NAME}/{dtype}.")
+        manifest = None
+    # Vectors from different backends (torch, onnx, int8 onnx) are never mixed in one store
+    encoder = backend_label(MODEL_NAME, backend)
+    if manifest is not None and manifest.get("encoder", "torch") != encoder:
+        print(f"   -> Stored vectors were encoded with {manifest.get('encoder', 'torch')}, rebuilding with {encoder}.")
+        manifest = None
+    # Crawled bios only feed passages, and are not covered by the changelog
+    bios = {}
+    if passages > 1:
+        bios = bios_from_frame(profiles) if profiles is not None else load_bios()
+    digest = bios_digest(bios)
+    if manifest is not None and (manifest.get("passages", 1) != passages or manifest.get("bios") != digest):
+        print(f"   -> Passage budget or crawled bios changed, rebuilding with {passages} passage(s) per profile.")
+        manifest = None
 
-    # 3. Create 'Search Text'
-    # We combine name, designation, and bio into one big string for the AI to read
-    print("Preparing text for analysis...")
-    df['search_text'] = df.apply(
-        lambda x: f"{x['Name']} {x['Designation']} {x['Area_of_Interest']} {x['Education']}", 
-        axis=1
-    )
+    # Read the changelog, the rows and the fingerprint from one snapshot
+    conn.execute("BEGIN")
+    try:
+        fingerprint = db_fingerprint(conn)
+    except sqlite3.OperationalError:
+        print("Error: the faculty table predates change tracking. Please run 'store_data.py' first.")
+        conn.close()
+        return
+
+    # 2. Work out which rows need encoding
+    has_changelog = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faculty_changes'"
+    ).fetchone() is not None
+    last_change = conn.execute("SELECT COALESCE(MAX(change_id), 0) FROM faculty_changes").fetchone()[0] if has_changelog else 0
 
-    # 4. Load AI Model
+    if manifest is None:
+        total = conn.execute("SELECT COUNT(*) FROM faculty").fetchone()[0]
+        print(f"Full build: {total} records (up to {passages} passage(s) each), read {chunk_size} at a time...")
+        df = None
+        deleted = set()
+    else:
+        upserts, deleted, last_change = pending_changes(conn, manifest["change_id"]) if has_changelog else (set(), set(), 0)
+        print(f"Applying changelog: {len(upserts)} changed, {len(deleted)} deleted "
+              f"(of {manifest['count']} stored vectors)...")
+        df = load_rows(conn, upserts, passages, bios)
+        if df.empty and not deleted and manifest["fingerprint"] != fingerprint:
+            # Data changed outside the changelog: patching cannot be trusted
+            print("   -> Store does not match the database, doing a full build instead.")
+            manifest = None
+            total = conn.execute("SELECT COUNT(*) FROM faculty").fetchone()[0]
+            df = None
+        else:
+            print(f"   -> {len(df)} passages to encode.")
+
+    if manifest is not None and df.empty and not deleted:
+        conn.close()
+        print("Embeddings are already up to date.")
+        return manifest
+
+    # 3. Load AI Model
     # 'all-MiniLM-L6-v2' is a small, fast model perfect for laptops
-    print("Loading AI Model (sentence-transformers)...")
+    model, pool = None, None
+    if df is None or not df.empty:
+        print("Loading AI Model...")
+        try:
+            model = load_encoder(MODEL_NAME, backend)
+        except Exception as e:
+            conn.close()
+            print(f"Error loading model: {e}")
+            print("(Try running: pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu)")
+            return
+        if workers > 1 and hasattr(model, "start_multi_process_pool"):
+            pool = model.start_multi_process_pool(["cpu"] * workers)
+        elif workers > 1:
+            # onnxruntime already runs each batch on every core
+            print("   -> --workers is ignored by the ONNX backend.")
+            workers = 1
+
+    # 4. Generate Embeddings (rows are still read from the snapshot opened above)
+    print(f"Converting text to vectors ({encoder_label(model)}, batch size {batch_size}, {workers} worker(s))...")
+    start = time.perf_counter()
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        print("(Try running: pip install torch torchvision --index-url https://download.pytorch.org/whl/cpu)")
-        return
+        if df is None:
+            # Sized for the full passage budget; pages past `done` are never touched
+            ids = np.empty(total * passages, dtype=np.int64)
+            vectors = None
+            done = 0
+            for chunk in iter_rows(conn, chunk_size, passages, bios):
+                encoded = l2_normalize(encode_texts(model, chunk['search_text'].tolist(), batch_size, pool))
+                if vectors is None:
+                    vectors = np.empty((len(ids), encoded.shape[1]), dtype=np.float32)
+                ids[done:done + len(chunk)] = chunk['id'].to_numpy()
+                vectors[done:done + len(chunk)] = encoded
+                done += len(chunk)
+                print(f"   -> {done} passages encoded ({done / (time.perf_counter() - start):,.0f} texts/s)")
+            ids, vectors = ids[:done], (vectors[:done] if vectors is not None else np.zeros((0, 0), dtype=np.float32))
+            encoded_count = done
+        else:
+            new_vectors = np.zeros((0, 0), dtype=np.float32)
+            if not df.empty:
+                new_vectors = encode_texts(model, df['search_text'].tolist(), batch_size, pool)
+            encoded_count = len(df)
+    finally:
+        conn.close()
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+    elapsed = time.perf_counter() - start
+    if encoded_count:
+        print(f"   -> Encoded {encoded_count} texts in {elapsed:.1f}s ({encoded_count / elapsed:,.0f} texts/s)")
+
+    # 5. Patch the stored vectors (incremental runs)
+    if df is not None:
+        _, old_ids, old_vectors = open_store()
+        # Copy out of the read-only mapping before patching
+        old_vectors = np.array(old_vectors, dtype=np.float32)
+        if manifest["dtype"] == "int8":
+            old_vectors = dequantize_int8(old_vectors, open_arrays(manifest)["scales"])
+        ids, vectors = patch_vectors(np.array(old_ids), old_vectors, df['id'], new_vectors, deleted)
+        # Unit-length rows let search score with a plain matmul straight off the mmap
+        # (full builds normalise each chunk as it is encoded)
+        vectors = l2_normalize(vectors)
+
+    # 6. Approximate nearest-neighbour index (large corpora only by default)
+    ids, vectors, arrays, extra = build_ann(ids, vectors, ann, ann_lists, previous=manifest)
+    extra.update(passages=passages, bios=digest, encoder=encoder)
 
-    # 5. Generate Embeddings
-    print("Converting text to vectors (This might take a minute)...")
-    embeddings = model.encode(df['search_text'].tolist(), show_progress_bar=True)
+    # 7. Reduced precision: int8 codes + per-dimension scales, or float16
+    stored = vectors
+    if dtype == "int8":
+        stored, arrays["scales"] = quantize_int8(vectors)
+    elif dtype == "float16":
+        stored = vectors.astype(np.float16)
+    if dtype != "float32" and len(vectors):
+        recall = quality_check(vectors, stored, arrays.get("scales"))
+        print(f"   -> {dtype} recall@10 vs float32: {recall:.3f}")
 
-    # 6. Save to File
-    print(f"Saving embeddings to '{OUTPUT_FILE}'...")
-    with open(OUTPUT_FILE, 'wb') as f:
-        pickle.dump(embeddings, f)
+    # 8. Save to File
+    print(f"Saving embeddings to '{STORE_DIR}/' ({dtype})...")
+    manifest = save_store(ids, stored, MODEL_NAME, fingerprint, last_change, dtype,
+                          normalized=True, arrays=arrays, extra=extra)
 
-    print("Success! You can now run the API server.")
+    print(f"Success! {manifest['count']} vectors for {len(np.unique(ids))} faculty stored "
+          f"(version {manifest['version']}). You can now run the API server.")
+    return manifest
 
 if __name__ == "__main__":
-    generate_embeddings()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Encode faculty profiles into search vectors.")
+    parser.add_argument("--full", action="store_true", help="re-encode every row instead of applying the changelog")
+    parser.add_argument("--dtype", choices=DTYPES, default="float32", help="on-disk precision of the vectors")
+    parser.add_argument("--ann", choices=["auto", "ivf", "none"], default="auto",
+                        help=f"build an IVF index (auto: only for {ANN_MIN_ROWS:,}+ rows)")
+    parser.add_argument("--ann-lists", type=int, default=None, help="number of IVF lists (default: ~sqrt(rows))")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="texts per forward pass")
+    parser.add_argument("--workers", type=int, default=1, help="encoder processes (sentence-transformers multi-process pool)")
+    parser.add_argument("--chunk-size", type=int, default=READ_CHUNK, help="rows read from the database at a time")
+    parser.add_argument("--backend", choices=["auto", "torch", "onnx"], default=ENCODER_BACKEND,
+                        help="encoder (see encoder_backend.py; auto = onnx when exported)")
+    parser.add_argument("--passages", type=int, default=MAX_PASSAGES,
+                        help="passage budget per profile (1 = one vector per profile)")
+    args = parser.parse_args()
+    generate_embeddings(full=args.full, dtype=args.dtype, ann=args.ann, ann_lists=args.ann_lists,
+                        batch_size=args.batch_size, workers=args.workers, chunk_size=args.chunk_size,
+                        backend=args.backend, passages=max(1, args.passages))
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from keyword_search import keyword_ids
+from metrics import SEARCH_SECONDS
+from vector_search import hydrate
+
+# CONFIGURATION
+RRF_K = 60             # Standard reciprocal rank fusion constant
+DEPTH = 50             # Candidates taken from each retriever before fusing
+WEIGHTS = (1.0, 1.0)   # (lexical, vector)
+MAX_DEPTH = 2000       # Keyword candidates fetched at most, for selective filters
+
+def rrf_fuse(rankings, k=RRF_K, weights=None):
+    """
+    Reciprocal rank fusion: each ranking adds weight / (k + rank) to the
+    keys it contains. Returns [(key, score)] best first; ties keep the order
+    in which keys were first seen.
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+class HybridSearcher:
+    """
+    Runs the FTS5 keyword index and the vector index side by side and fuses
+    their rankings with RRF. Exact terms ("VLSI", "5G") come from the
+    lexical side, paraphrases from the vector side. Each retriever returns
+    at most `depth` candidates, so fusion cost does not grow with the table.
+
+    `df` is the frame the vector index was built over (row i = vector i)
+    and must carry the faculty `id` column.
+    """
+
+    def __init__(self, index, df, depth=DEPTH, rrf_k=RRF_K, weights=WEIGHTS):
+        self.index = index
+        self.df = df
+        self.depth = depth
+        self.rrf_k = rrf_k
+        self.weights = weights
+        self.positions = pd.Index(df["id"].to_numpy())   # faculty id -> row of df
+        # Best possible fused score (rank 1 in both lists), for a 0-1 scale
+        self.max_score = sum(weights) / (rrf_k + 1)
+
+    def rankings(self, conn, text, query_vector, rows=None):
+        """
+        Row positions from each retriever, best first: (lexical, vector).
+        `rows` (sorted positions, see search_filters.py) pre-filters the
+        vector side; the keyword side fetches proportionally deeper and
+        keeps only allowed rows.
+        """
+        depth = self.depth
+        if rows is not None:
+            depth = int(min(MAX_DEPTH, self.depth * len(self.df) / max(1, len(rows))))
+        # Any-term match: natural-language queries rarely share every word with a profile
+        ids = keyword_ids(conn, text, depth, match_all=False)
+        lexical = self.positions.get_indexer(ids)
+        # Ids missing from the vector index (added since it was built) are skipped
+        lexical = lexical[lexical >= 0]
+        if rows is not None:
+            lexical = lexical[np.isin(lexical, rows)][:self.depth]
+        vector, _ = self.index.search(query_vector, top_k=self.depth, rows=rows)[0]
+        return lexical.tolist(), np.asarray(vector).tolist()
+
+    def rank(self, conn, text, query_vector, top_k=5, rows=None):
+        """Fused (row positions, scores on a 0-1 scale) for one query, best first."""
+        fused = rrf_fuse(self.rankings(conn, text, query_vector, rows), self.rrf_k, self.weights)[:top_k]
+        indices = np.array([position for position, _ in fused], dtype=np.int64)
+        scores = np.array([score / self.max_score for _, score in fused], dtype=np.float32)
+        return indices, scores
+
+    def search(self, conn, texts, query_vectors, top_k=5, rows=None):
+        """One list of result cards per query, scored as a % of the best possible fusion."""
+        results = []
+        for text, query_vector in zip(texts, np.atleast_2d(query_vectors)):
+            with SEARCH_SECONDS.time(mode="hybrid", stage="rank"):
+                indices, scores = self.rank(conn, text, query_vector, top_k, rows)
+            with SEARCH_SECONDS.time(mode="hybrid", stage="hydrate"):
+                results.append(hydrate(self.df, indices, scores))
+        return results
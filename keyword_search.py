@@ -0,0 +1,112 @@
+import re
+
+from db_pool import fetch_dicts
+from store_data import FTS_COLUMNS, FTS_TABLE, PUBLIC_COLUMNS
+
+# CONFIGURATION
+# bm25 column weights, in FTS_COLUMNS order: a hit in the name counts most
+BM25_WEIGHTS = {"name": 10.0, "designation": 2.0, "education": 1.0, "bio_interest": 3.0}
+SNIPPET_TOKENS = 12
+MAX_TERMS = 16
+MIN_PREFIX = 3        # Shorter terms match whole words only ("p"* would expand to most of the index)
+MAX_RANKED = 2000     # Queries matching more rows than this are ranked over a bounded candidate set
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+def to_match_query(text, match_all=True):
+    """
+    Turns free text into a safe FTS5 MATCH expression: every word becomes a
+    quoted prefix term ("mach"*; words under MIN_PREFIX characters stay
+    whole), joined with AND (or OR when `match_all` is False, so bm25 ranks
+    rows by how many terms they share). Returns None when the text has no
+    searchable words. User input never reaches FTS5 syntax.
+    """
+    terms = TOKEN_PATTERN.findall(str(text).lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return (" " if match_all else " OR ").join(
+        f'"{term}"*' if len(term) >= MIN_PREFIX else f'"{term}"' for term in terms
+    )
+
+BM25_SQL = f"bm25({FTS_TABLE}, {', '.join(str(BM25_WEIGHTS[c]) for c in FTS_COLUMNS)})"
+
+SEARCH_SQL = f"""
+    SELECT {', '.join('f.' + c for c in PUBLIC_COLUMNS)},
+           snippet({FTS_TABLE}, -1, '[', ']', '...', {SNIPPET_TOKENS}) AS snippet,
+           {BM25_SQL} AS rank
+    FROM {FTS_TABLE}
+    JOIN faculty f ON f.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+
+# Ranking only: no join, no snippet
+IDS_SQL = f"""
+    SELECT rowid FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH ?
+    ORDER BY {BM25_SQL}
+    LIMIT ?
+"""
+
+# Stops counting at MAX_RANKED + 1: cheap next to bm25 and a snippet per match
+COUNT_SQL = f"SELECT count(*) FROM (SELECT 1 FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ? LIMIT ?)"
+
+def _candidates(match, snippet):
+    """Scores only the first ?3 matches of `match` (in rowid order)."""
+    columns = f"snippet({FTS_TABLE}, -1, '[', ']', '...', {SNIPPET_TOKENS}) AS snippet, " if snippet else ""
+    return f"""
+        SELECT * FROM (
+            SELECT rowid AS id, {columns}{BM25_SQL} AS rank
+            FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH {match} LIMIT ?3
+        )"""
+
+# Broad queries: the first MAX_RANKED matches plus the first MAX_RANKED name
+# matches (?2), so a name hit, which outweighs everything else, is kept
+# wherever its rowid falls. A row found by both keeps its full-query score.
+BROAD_SEARCH_SQL = f"""
+    SELECT {', '.join('f.' + c for c in PUBLIC_COLUMNS)}, c.snippet, min(c.rank) AS rank
+    FROM ({_candidates('?1', True)} UNION ALL {_candidates('?2', True)}) c
+    JOIN faculty f ON f.id = c.id
+    GROUP BY c.id
+    ORDER BY rank
+    LIMIT ?4
+"""
+
+BROAD_IDS_SQL = f"""
+    SELECT id FROM ({_candidates('?1', False)} UNION ALL {_candidates('?2', False)})
+    GROUP BY id
+    ORDER BY min(rank)
+    LIMIT ?4
+"""
+
+def keyword_search(conn, text, limit=20, match_all=True):
+    """
+    Ranked keyword search over name, designation, education and interests.
+    Returns faculty rows (public columns) as dicts with an extra `snippet`
+    of the best-matching column and its bm25 `rank` (lower is better),
+    best first.
+
+    Up to MAX_RANKED matches, every match is ranked. A broader query is a
+    known limit: bm25 and the snippet cost ~2 us per match, so it is ranked
+    over the first MAX_RANKED matches plus the first MAX_RANKED name matches
+    (a name hit outweighs everything else) and the rest go unscored.
+    bench_fts at 1M rows: ~20 ms for a full name, 50-70 ms for a term in one
+    row of six (0.5 s when every match was ranked).
+    """
+    cursor = _ranked(conn, SEARCH_SQL, BROAD_SEARCH_SQL, text, limit, match_all)
+    return fetch_dicts(cursor) if cursor is not None else []
+
+def keyword_ids(conn, text, limit=20, match_all=True):
+    """Faculty ids in keyword_search order, without fetching the rows."""
+    cursor = _ranked(conn, IDS_SQL, BROAD_IDS_SQL, text, limit, match_all)
+    return [row[0] for row in cursor] if cursor is not None else []
+
+def _ranked(conn, sql, broad_sql, text, limit, match_all):
+    """Runs a ranked query (bounded when broad); None when the text has no searchable words."""
+    match = to_match_query(text, match_all)
+    if match is None:
+        return None
+    if conn.execute(COUNT_SQL, (match, MAX_RANKED + 1)).fetchone()[0] <= MAX_RANKED:
+        return conn.execute(sql, (match, limit))
+    return conn.execute(broad_sql, (match, f"{{name}} : ({match})", MAX_RANKED, limit))
@@ -1,16 +1,90 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager, contextmanager
 import sqlite3
+import csv
+import io
+import itertools
+import orjson
 from pydantic import BaseModel
 from typing import List, Optional
 import os
+import time
+
+from db_pool import ConnectionPool, fetch_dicts
+from embedding_store import STORE_DIR, EmbeddingStoreError
+from encoder_backend import cache_name, encoder_label, load_store_encoder
+from hybrid_search import HybridSearcher
+from keyword_search import keyword_search
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS, SEARCH_SECONDS, Profile, profiled
+from micro_batch import MicroBatcher
+from query_cache import QueryCache
+from response_cache import ResponseCache, etag_matches, make_etag, make_key
+from search_filters import FacetIndex
+from semantic_search import load_search_index
+from store_data import PUBLIC_COLUMNS, data_version
+from vector_search import hydrate
 
 # CONFIGURATION
 DB_FILE = "faculty.db"
+QUERY_CACHE_FILE = "query_cache.npz"   # Shared with the Streamlit app
+MAX_K = 50
+MAX_PAGE = 1000
+EXPORT_CHUNK = 5000   # Rows fetched (and sent) per chunk of an export
+CACHED_PATHS = {"/faculty", "/faculty/search"}   # Pure functions of the stored data
+VERSION_TTL = 1.0     # Seconds a data version read is trusted before re-checking
+# ?profile=1 returns that request's profile instead of its response. Off
+# unless PROFILING=1 is set: never expose it on a public deployment
+PROFILING = os.environ.get("PROFILING") == "1"
+
+# Public columns only: rows skip response_model filtering (see ORJSONResponse)
+FACULTY_SQL = f"SELECT {', '.join(PUBLIC_COLUMNS)} FROM faculty"
+
+# Read-only connections shared by every request (see db_pool.py)
+pool = ConnectionPool(DB_FILE)
+
+class ORJSONResponse(Response):
+    """JSON via orjson: plain dicts straight to bytes, no per-row model validation."""
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content)
+
+# Semantic search state, filled in once at startup
+semantic = {"index": None, "df": None, "hybrid": None, "facets": None, "batcher": None, "cache": None, "encoder": None,
+            "store_encoder": None, "error": None}
+
+def load_semantic():
+    """Maps the vectors and loads the model once; failures are reported by the endpoint."""
+    try:
+        manifest, index, df = load_search_index(DB_FILE, STORE_DIR)
+    except (EmbeddingStoreError, sqlite3.Error) as e:
+        semantic["error"] = str(e)
+        return
+    model = load_store_encoder(manifest)
+    # Cache hits return at once; misses from concurrent requests share one model call
+    batcher = MicroBatcher(model.encode)
+    semantic.update(
+        index=index, df=df, hybrid=HybridSearcher(index, df), facets=FacetIndex(df), batcher=batcher,
+        encoder=encoder_label(model), store_encoder=manifest.get("encoder", "torch"), error=None,
+        cache=QueryCache(batcher.encode, cache_name(manifest["model"], model), persist_path=QUERY_CACHE_FILE)
+    )
+
+@asynccontextmanager
+async def lifespan(app):
+    load_semantic()
+    yield
+    if semantic["batcher"] is not None:
+        semantic["batcher"].close()
+        semantic["cache"].save()
+    pool.close()
 
 app = FastAPI(
     title="DA-IICT Faculty API",
     description="Local API serving scraped faculty data.",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # 1. Data Model
@@ -26,39 +100,259 @@ class FacultyModel(BaseModel):
     image_url: Optional[str] = None
     last_updated: Optional[str] = None
 
-# 2. Database Helper
-def get_db_connection():
+# 2. Database Helpers
+def database_error(e):
     if not os.path.exists(DB_FILE):
         # Friendly error if you forgot to run the scraper first
-        raise HTTPException(status_code=500, detail="Database 'faculty.db' not found. Please run your scraper script first.")
-    
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row  # Access columns by name
-    return conn
+        return HTTPException(status_code=500, detail="Database 'faculty.db' not found. Please run your scraper script first.")
+    if "fts" in str(e):
+        return HTTPException(status_code=500, detail="Keyword index missing. Please re-run 'store_data.py'.")
+    return e
+
+@contextmanager
+def db_connection(dedicated=False):
+    """Pooled connection for sync handlers (dedicated=True: a connection of its own, see export_rows)."""
+    try:
+        with (pool.dedicated() if dedicated else pool.connection()) as conn:
+            yield conn
+    except sqlite3.OperationalError as e:
+        raise database_error(e)
+
+async def run_query(fn, *args):
+    """Runs fn(conn, *args) on the pool's executor, off the event loop."""
+    try:
+        return await pool.run(profiled(fn), *args)
+    except sqlite3.OperationalError as e:
+        raise database_error(e)
+
+def fetch_faculty(conn, after_id, limit):
+    # Keyset pagination: seeks straight to after_id on the primary key, so
+    # page 10,000 costs the same as page 1 (unlike OFFSET)
+    return fetch_dicts(conn.execute(f"{FACULTY_SQL} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)))
+
+def export_rows(fmt):
+    """
+    Yields the whole faculty table as NDJSON or CSV, EXPORT_CHUNK rows at a
+    time, straight from the cursor: memory stays flat and the first chunk
+    goes out before the rest is read. The export reads on a connection of
+    its own (held until it finishes or the client disconnects), so a slow
+    download never takes one of the pool's connections away from requests.
+    """
+    with db_connection(dedicated=True) as conn:
+        cursor = conn.execute(f"{FACULTY_SQL} ORDER BY id")
+        columns = [column[0] for column in cursor.description]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+        # First item (CSV header or nothing) comes out before any row is read
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK)
+            if not rows:
+                break
+            if fmt == "csv":
+                writer.writerows(rows)
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+# 3. Response cache: (path, params, data version) -> rendered response
+response_cache = ResponseCache()
+version_state = {"version": None, "checked": 0.0}
+
+async def current_version():
+    """data_version from store_data.py, re-read at most once per VERSION_TTL."""
+    now = time.monotonic()
+    if version_state["version"] is None or now - version_state["checked"] > VERSION_TTL:
+        version_state["version"] = await run_query(data_version)
+        version_state["checked"] = now
+    return version_state["version"]
+
+@app.middleware("http")
+async def cached_get(request, call_next):
+    """
+    Strong ETag + If-None-Match -> 304 and an in-process copy of each
+    response. Both are keyed on the data version, so a store run
+    invalidates everything at once (within VERSION_TTL).
+    """
+    if request.method != "GET" or request.url.path not in CACHED_PATHS:
+        return await call_next(request)
+    try:
+        version = await current_version()
+    except Exception:
+        # No database (or no version table yet): let the endpoint report it
+        return await call_next(request)
 
-# 3. API Endpoints
+    key = make_key(request.url.path, request.query_params.multi_items(), version)
+    headers = {"ETag": make_etag(key), "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+
+    entry = response_cache.get(key)
+    if entry is None:
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        stored = {k: v for k, v in response.headers.items() if k != "content-length"}
+        entry = (response.status_code, stored, body)
+        response_cache.put(key, *entry)
+    status, stored, body = entry
+    return Response(content=body, status_code=status, headers={**stored, **headers})
+
+@app.middleware("http")
+async def profile_request(request, call_next):
+    """
+    With PROFILING on, ?profile=1 runs the request under a profiler and
+    returns the report as text (the original status is in X-Profiled-Status).
+    Handler code wrapped with metrics.profiled() is what gets profiled.
+    """
+    if not PROFILING or request.query_params.get("profile") != "1":
+        return await call_next(request)
+    with Profile().active() as profile:
+        response = await call_next(request)
+        # Drain the body so a streamed response finishes under the profiler too
+        async for _ in response.body_iterator:
+            pass
+    return PlainTextResponse(profile.report(), headers={"X-Profiled-Status": str(response.status_code)})
+
+@app.middleware("http")
+async def record_latency(request, call_next):
+    """Outermost: request latency by route template (cache hits and 304s included)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        # Template, not the raw path: one series per endpoint however many ids are requested
+        path = route.path if route is not None else request.url.path if request.url.path in CACHED_PATHS else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - start, method=request.method, route=path, status=status)
+
+# Stats kept elsewhere, read when /metrics is scraped
+REGISTRY.gauge("faculty_response_cache_requests_total", "Response cache lookups, by result.",
+               lambda: {"hit": response_cache.hits, "miss": response_cache.misses,
+                        "not_modified": response_cache.not_modified}, labelname="result", monotonic=True)
+REGISTRY.gauge("faculty_query_cache_requests_total", "Query vector cache lookups, by result.",
+               lambda: None if semantic["cache"] is None else
+               {"hit": semantic["cache"].hits, "miss": semantic["cache"].misses}, labelname="result", monotonic=True)
+REGISTRY.gauge("faculty_encode_batches_total", "Micro-batches sent to the encoder.",
+               lambda: None if semantic["batcher"] is None else semantic["batcher"].total_batches, monotonic=True)
+REGISTRY.gauge("faculty_data_version", "data_version of the database last seen by the response cache.",
+               lambda: version_state["version"])
+
+# 4. API Endpoints
 
 @app.get("/")
 def home():
     return {"status": "Running locally on VS Code", "docs_url": "http://127.0.0.1:8000/docs"}
 
+# FacultyModel documents the response; rows are returned as-is (no per-row validation)
 @app.get("/faculty", response_model=List[FacultyModel])
-def get_all_faculty(limit: int = 100):
-    """Get all faculty members (limited to 100 by default)."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM faculty LIMIT ?", (limit,))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
+async def get_all_faculty(limit: int = Query(100, ge=1, le=MAX_PAGE), after_id: int = 0):
+    """
+    Get faculty members in id order, one page at a time (100 by default).
+    When more rows follow, the X-Next-After header holds the after_id for the next page.
+    """
+    rows = await run_query(fetch_faculty, after_id, limit)
+    headers = {"X-Next-After": str(rows[-1]["id"])} if len(rows) == limit else {}
+    return ORJSONResponse(rows, headers=headers)
+
+@app.get("/faculty/export")
+def export_faculty(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every faculty row as NDJSON (one object per line) or CSV."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    stream = export_rows(format)
+    # Open the connection and run the query now, so errors are a normal 500
+    # instead of a stream that breaks after the headers went out
+    first = next(stream)
+    # Sync generator: Starlette iterates it in the threadpool, off the event loop
+    return StreamingResponse(
+        itertools.chain([first], stream), media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=faculty.{format}"}
+    )
 
 @app.get("/faculty/search")
-def search_faculty(q: str):
-    """Search for a faculty member by name."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    # Case-insensitive search using SQL wildcard %
-    cursor.execute("SELECT * FROM faculty WHERE name LIKE ?", (f"%{q}%",))
-    rows = cursor.fetchall()
-    conn.close()
-    return [dict(row) for row in rows]
\ No newline at end of file
+async def search_faculty(q: str, limit: int = Query(20, ge=1, le=100)):
+    """Keyword search over name, designation, education and interests (prefix matching, bm25 ranked)."""
+    # FTS5 index maintained by store_data.py (faculty_fts)
+    return await run_query(keyword_search, q, limit)
+
+class SearchFilters:
+    """
+    Optional pre-filters shared by the semantic and hybrid endpoints.
+    Repeat a parameter to allow several values (OR); different parameters
+    combine with AND. Values come from /faculty/semantic/facets.
+    """
+
+    def __init__(
+        self,
+        designation: Optional[List[str]] = Query(None, description="e.g. 'Adjunct Faculty International'"),
+        domain: Optional[List[str]] = Query(None, description="E-mail domain, e.g. 'dau.ac.in'"),
+        institution: Optional[List[str]] = Query(None, description="Education institution; 'IIT' matches every IIT"),
+        has_email: Optional[bool] = None
+    ):
+        self.designation, self.domain, self.institution, self.has_email = designation, domain, institution, has_email
+
+    def rows(self):
+        """Allowed result rows of the search index, None for no filter."""
+        return semantic["facets"].rows(self.designation, self.domain, self.institution, self.has_email)
+
+@app.get("/faculty/semantic")
+@profiled
+def semantic_search(q: str = Query(..., min_length=1), k: int = Query(5, ge=1, le=MAX_K),
+                    filters: SearchFilters = Depends()):
+    """Search faculty by meaning (research interests, designation, education), optionally pre-filtered."""
+    if semantic["index"] is None:
+        raise HTTPException(status_code=503, detail=semantic["error"] or "Semantic search is not loaded.")
+    # Sync handler: runs in the threadpool, so concurrent requests can batch up
+    with SEARCH_SECONDS.time(mode="vector", stage="encode"):
+        query_vectors = semantic["cache"].encode([q])
+    with SEARCH_SECONDS.time(mode="vector", stage="score"):
+        indices, scores = semantic["index"].search(query_vectors, top_k=k, rows=filters.rows())[0]
+    with SEARCH_SECONDS.time(mode="vector", stage="hydrate"):
+        return hydrate(semantic["df"], indices, scores)
+
+@app.get("/faculty/hybrid")
+@profiled
+def hybrid_search(q: str = Query(..., min_length=1), k: int = Query(5, ge=1, le=MAX_K),
+                  filters: SearchFilters = Depends()):
+    """Keyword and semantic search fused with reciprocal rank fusion (score = % of the best possible)."""
+    if semantic["hybrid"] is None:
+        raise HTTPException(status_code=503, detail=semantic["error"] or "Semantic search is not loaded.")
+    with SEARCH_SECONDS.time(mode="hybrid", stage="encode"):
+        query_vectors = semantic["cache"].encode([q])
+    with db_connection() as conn:
+        return semantic["hybrid"].search(conn, [q], query_vectors, top_k=k, rows=filters.rows())[0]
+
+@app.get("/faculty/semantic/facets")
+def semantic_facets():
+    """Filter values for the semantic and hybrid endpoints, with how many faculty have each."""
+    if semantic["facets"] is None:
+        raise HTTPException(status_code=503, detail=semantic["error"] or "Semantic search is not loaded.")
+    return semantic["facets"].facets()
+
+@app.get("/faculty/semantic/stats")
+def semantic_stats():
+    """Encoder backend (and the one that built the store), micro-batch sizes and latency, plus query cache hit rate."""
+    if semantic["batcher"] is None:
+        raise HTTPException(status_code=503, detail=semantic["error"] or "Semantic search is not loaded.")
+    return {"encoder": semantic["encoder"], "store_encoder": semantic["store_encoder"], "batches": semantic["batcher"].stats(), "cache": semantic["cache"].stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Response cache hit rate and 304s served."""
+    return {"data_version": version_state["version"], **response_cache.stats()}
\ No newline at end of file
@@ -0,0 +1,268 @@
+"""
+In-process metrics: latency histograms, counters and gauges, rendered in
+the Prometheus text format by the API's /metrics endpoint and printed as
+a table at the end of the batch scripts.
+
+    with SEARCH_SECONDS.time(mode="vector", stage="encode"):
+        vectors = cache.encode(queries)
+
+No client library is needed. Metrics are process-local, like the caches;
+with several uvicorn workers each one serves its own numbers.
+"""
+import contextvars
+import cProfile
+import io
+import math
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # optional: per-request profiles fall back to cProfile
+    Profiler = None
+
+# CONFIGURATION
+# Seconds; wide enough for a 0.1 ms matmul and a 30 s page fetch with retries
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILE_TOP = 40   # Functions listed in a cProfile report
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}" if pairs else ""
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set, with Prometheus semantics
+    (le = "less than or equal"). Also keeps the max for the script reports.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts, sum, count, max]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0, 0.0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+            series[3] = max(series[3], value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall time of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """{label values: (count, sum, max)}"""
+        with self._lock:
+            return {key: (count, total, peak) for key, (_, total, count, peak) in self._series.items()}
+
+    def lines(self):
+        with self._lock:
+            series = {key: (list(buckets), total, count) for key, (buckets, total, count, _) in self._series.items()}
+        for key, (buckets, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (math.inf,), buckets + [count - sum(buckets)]):
+                cumulative += hits
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+class Counter:
+    """Monotonic count per label set."""
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+class Gauge:
+    """
+    Value read when rendered: `read()` returns a number, {label value:
+    number} or None (not available). monotonic=True exposes a running total
+    kept elsewhere (e.g. cache hits) as a counter.
+    """
+
+    def __init__(self, name, help, read, labelname=None, monotonic=False):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.labelname = labelname
+        self.kind = "counter" if monotonic else "gauge"
+
+    def lines(self):
+        value = self.read()
+        if value is None:
+            return
+        if self.labelname is None:
+            yield f"{self.name} {_number(value)}"
+            return
+        for key, item in sorted(value.items()):
+            yield f"{self.name}{_labels([self.labelname], [key])} {_number(item)}"
+
+class Registry:
+    """Named metrics of this process. Registering a name twice returns the first metric."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name, help, labelnames=(), buckets=BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, read, labelname=None, monotonic=False):
+        """Replaces an earlier gauge of the same name (e.g. after a reload)."""
+        gauge = Gauge(name, help, read, labelname, monotonic)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = []
+        for metric in metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        return "\n".join(out) + "\n"
+
+    def report(self, prefix=""):
+        """Prints count / total / mean / max of the histograms whose name starts with `prefix`."""
+        with self._lock:
+            histograms = [m for m in self._metrics.values() if m.kind == "histogram" and m.name.startswith(prefix)]
+        rows = [(h.name, ",".join(key), stats) for h in histograms for key, stats in sorted(h.snapshot().items())]
+        if not rows:
+            return
+        print(f"\n{'metric':<30} {'labels':<22} | {'count':>6} | {'total (s)':>9} | {'mean (ms)':>9} | {'max (ms)':>9}")
+        print("-" * 100)
+        for name, labels, (count, total, peak) in rows:
+            print(f"{name:<30} {labels:<22} | {count:>6} | {total:>9.3f} | {1000 * total / count:>9.2f} | {1000 * peak:>9.2f}")
+
+REGISTRY = Registry()
+
+# Catalogue: declared here so /metrics lists every series family, even before the first observation
+SCRAPE_SECONDS = REGISTRY.histogram("faculty_scrape_seconds", "Listing scrape time per page: fetch (with retries) and parse.",
+                                    ["stage"])
+STORE_SECONDS = REGISTRY.histogram("faculty_store_seconds", "Load time per chunk: transform (cleaning) and upsert.",
+                                   ["stage"])
+STORE_ROWS = REGISTRY.counter("faculty_store_rows_total", "Rows stored, by outcome.", ["op"])
+SEARCH_SECONDS = REGISTRY.histogram("faculty_search_seconds",
+                                    "Search time per stage: encode, score (vector) / rank (hybrid), hydrate.",
+                                    ["mode", "stage"])
+REQUEST_SECONDS = REGISTRY.histogram("faculty_http_request_seconds",
+                                     "API latency until the response headers, by route.", ["method", "route", "status"])
+
+# PER-REQUEST PROFILING
+_active = contextvars.ContextVar("profile", default=None)
+
+class Profile:
+    """
+    One request's profile. Code wrapped with profiled() runs under it in
+    whichever thread it lands on, so sync handlers (threadpool) and pool
+    queries (executor) are covered, not only the event loop. pyinstrument
+    when installed, cProfile otherwise.
+    """
+
+    def __init__(self):
+        self._runs = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def active(self):
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+    def _record(self, run):
+        with self._lock:
+            self._runs.append(run)
+
+    def report(self):
+        """Text report of everything recorded."""
+        with self._lock:
+            runs = list(self._runs)
+        if not runs:
+            return "Nothing was profiled (cached response, or a route without profiled()).\n"
+        if Profiler is not None:
+            return "\n".join(run.output_text(unicode=False, color=False) for run in runs)
+        out = io.StringIO()
+        stats = pstats.Stats(runs[0], stream=out)
+        for run in runs[1:]:
+            stats.add(run)
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+        return out.getvalue()
+
+def profiled(fn):
+    """Runs `fn` under the active request Profile, if any (otherwise a plain call)."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _active.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        if Profiler is not None:
+            run = Profiler(async_mode="disabled")
+            run.start()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                run.stop()
+                profile._record(run)
+        run = cProfile.Profile()
+        try:
+            return run.runcall(fn, *args, **kwargs)
+        finally:
+            profile._record(run)
+    return wrapper
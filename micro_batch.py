@@ -0,0 +1,110 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# CONFIGURATION
+MAX_BATCH = 32       # Texts per model call
+MAX_WAIT_MS = 5      # How long the first request in a batch waits for company
+HISTORY = 1000       # Batches kept for the metrics window
+
+class MicroBatcher:
+    """
+    Coalesces concurrent encode requests into one model call.
+
+    Callers hand texts to `encode()` from any thread and block until their
+    vectors are ready. A single inference thread takes the first waiting
+    request, collects whatever else arrives within `max_wait_ms` (up to
+    `max_batch` texts) and runs `encode_fn` once for all of them. Under load
+    this turns N forward passes into N / batch_size, and the model is only
+    ever called from one thread.
+    """
+
+    def __init__(self, encode_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = deque(maxlen=HISTORY)   # (size, wait seconds, encode seconds)
+        self.total_batches = 0
+        self.total_texts = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def encode(self, texts):
+        """Returns a (len(texts), dim) array; blocks until the batch is done."""
+        futures = []
+        for text in texts:
+            future = Future()
+            self._queue.put((text, future, time.perf_counter()))
+            futures.append(future)
+        return np.vstack([f.result() for f in futures]) if futures else np.empty((0, 0), dtype=np.float32)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        """Blocks for the first item, then gathers more until full or the deadline passes."""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            texts = [text for text, _, _ in batch]
+            start = time.perf_counter()
+            try:
+                vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+            except Exception as e:
+                # One bad batch fails its own callers, not the thread
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            done = time.perf_counter()
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+            with self._lock:
+                self._batches.append((len(batch), start - batch[0][2], done - start))
+                self.total_batches += 1
+                self.total_texts += len(batch)
+
+    def stats(self):
+        """Batch size and latency over the last HISTORY batches."""
+        with self._lock:
+            window = list(self._batches)
+            totals = {"batches": self.total_batches, "texts": self.total_texts}
+        if not window:
+            return {**totals, "window": 0}
+        sizes, waits, encodes = (np.array(column) for column in zip(*window))
+        return {
+            **totals,
+            "window": len(window),
+            "avg_batch_size": float(sizes.mean()),
+            "max_batch_size": int(sizes.max()),
+            "avg_wait_ms": float(waits.mean() * 1000),
+            "p50_encode_ms": float(np.percentile(encodes, 50) * 1000),
+            "p99_encode_ms": float(np.percentile(encodes, 99) * 1000)
+        }
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from vector_search import SCORE_THRESHOLD
+
+# CONFIGURATION
+MAX_PASSAGES = 4       # Passage budget per faculty (1 = one vector for the whole profile)
+PASSAGE_WORDS = 40     # Target passage length; MiniLM was trained on short inputs
+PROFILES_FILE = "daiict_faculty_profiles.csv"   # Crawled bios (profile_crawler.py), optional
+
+def _clean(text):
+    """Field text, or "" for missing / "N/A" values."""
+    text = "" if text is None or pd.isna(text) else str(text).strip()
+    return "" if text == "N/A" else text
+
+def _pack(pieces, words, joiner):
+    """Greedily joins pieces into passages of about `words` words; long pieces are windowed."""
+    passages, current, size = [], [], 0
+    for piece in pieces:
+        tokens = piece.split()
+        if len(tokens) > words:
+            passages.extend(" ".join(tokens[i:i + words]) for i in range(0, len(tokens), words))
+            continue
+        if current and size + len(tokens) > words:
+            passages.append(joiner.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(tokens)
+    if current:
+        passages.append(joiner.join(current))
+    return passages
+
+def profile_passages(name, designation, interests, education, bio="", max_passages=MAX_PASSAGES, words=PASSAGE_WORDS):
+    """
+    Splits one profile into at most `max_passages` passages, most useful
+    first: who they are (name, designation, education), then research
+    areas packed a few at a time, then the crawled bio in sentence-packed
+    windows. Every passage names the faculty member so it stands on its own.
+    """
+    name = _clean(name)
+    header = ", ".join(part for part in (name, _clean(designation), _clean(education)) if part)
+    areas = [area for area in re.split(r"\s*[,;|\n]\s*", _clean(interests)) if area]
+    sentences = [s for s in re.split(r"(?<=[.!?])\s+", _clean(bio)) if s]
+    passages = [header] if header else []
+    passages += [f"{name}: {text}" for text in _pack(areas, words, ", ") + _pack(sentences, words, " ")]
+    return passages[:max_passages] or [name]
+
+def bios_from_frame(df):
+    """{profile link: bio + publications} from crawled (Profile_Link, Bio, Publications) rows."""
+    df = df.fillna("N/A")
+    bios = {}
+    for link, bio, publications in zip(df["Profile_Link"], df["Bio"], df["Publications"]):
+        publications = [p for p in str(publications).split(" || ") if _clean(p)]
+        text = " ".join([_clean(bio)] + [p.rstrip(".") + "." for p in publications]).strip()
+        if text:
+            bios[link] = text
+    return bios
+
+def load_bios(profiles_file=PROFILES_FILE):
+    """Bios from the profile crawl CSV, {} when it has not run."""
+    if not os.path.exists(profiles_file):
+        return {}
+    return bios_from_frame(pd.read_csv(profiles_file))
+
+def bios_digest(bios):
+    """Content hash of the bios (None when there are none), to spot a changed crawl."""
+    if not bios:
+        return None
+    digest = hashlib.sha1()
+    for link in sorted(bios):
+        digest.update(f"{link}\x1f{bios[link]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def to_passages(df, bios=None, max_passages=MAX_PASSAGES, words=PASSAGE_WORDS):
+    """Faculty rows (id, name, designation, bio_interest, education, profile_link) -> (id, search_text) per passage."""
+    bios = bios or {}
+    ids, texts = [], []
+    for row in df[["id", "name", "designation", "bio_interest", "education", "profile_link"]].itertuples(index=False):
+        passages = profile_passages(row.name, row.designation, row.bio_interest, row.education,
+                                    bios.get(row.profile_link, ""), max_passages, words)
+        ids.extend([row.id] * len(passages))
+        texts.extend(passages)
+    return pd.DataFrame({"id": np.asarray(ids, dtype=np.int64), "search_text": texts})
+
+class PassageIndex:
+    """
+    Multi-vector search: wraps an index over passages and scores each
+    faculty member by their best passage (max-sim). `owners[i]` is the
+    result row that passage i belongs to. Returns (rows, scores) like
+    VectorIndex, so callers cannot tell the difference.
+    """
+
+    def __init__(self, index, owners, max_passages):
+        self.index = index
+        self.owners = np.asarray(owners, dtype=np.int64)
+        self.max_passages = max(1, int(max_passages))
+        # Passages grouped by owner: owner r has by_owner[offsets[r]:offsets[r + 1]]
+        self.by_owner = np.argsort(self.owners, kind="stable")
+        self.offsets = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.owners, minlength=len(self)), out=self.offsets[1:])
+
+    def __len__(self):
+        return int(self.owners.max()) + 1 if len(self.owners) else 0
+
+    def passage_rows(self, rows):
+        """Sorted passage positions of the owners in `rows`."""
+        starts = self.offsets[rows]
+        counts = self.offsets[np.asarray(rows) + 1] - starts
+        # starts[j] + 0..counts[j]-1 for every owner, without a Python loop
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.sort(self.by_owner[np.arange(counts.sum()) + shift])
+
+    def search(self, queries, top_k=5, threshold=SCORE_THRESHOLD, rows=None):
+        """`rows` restricts the search to those owners (their passages are scored)."""
+        passage_rows = None if rows is None else self.passage_rows(np.asarray(rows, dtype=np.int64))
+        results = []
+        # top_k * max_passages passages always contain top_k distinct owners
+        for indices, scores in self.index.search(queries, top_k * self.max_passages, threshold, rows=passage_rows):
+            owners = self.owners[indices]
+            # Passages come best first, so an owner's first hit is its max
+            _, first = np.unique(owners, return_index=True)
+            first = np.sort(first)[:top_k]
+            results.append((owners[first], scores[first]))
+        return results
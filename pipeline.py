@@ -0,0 +1,279 @@
+"""
+One command for scrape -> store -> embed.
+
+    python pipeline.py [--listings daiict_faculty_final.csv] [--no-crawl] [--force embed] [--serial]
+
+The stages form a DAG:
+
+    scrape --> crawl ---------+
+       |                      +--> embed
+       +-----> store ---------+
+
+Outputs are content-addressed. A DataFrame is written once to
+pipeline_artifacts/<stage>-<hash>.parquet. Side effects (faculty.db, the
+embedding store) are summed up by a fingerprint. A stage's key hashes its
+inputs' outputs and its settings; when the key matches the last run and
+the output is still there, the stage is skipped. scrape and crawl are
+sources and always run: the crawl revalidates every profile page with a
+conditional request, so an unchanged page costs a 304 and an edited bio
+is picked up even when the listings are the same. An unchanged website
+skips everything downstream.
+
+crawl and store both only need the listings, so they run at the same
+time. Each stage runs in a fresh process, which keeps its peak memory
+separate. Wall time, rows and peak RSS of every stage are printed and
+appended to pipeline_artifacts/runs.jsonl.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from passages import MAX_PASSAGES
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory falls back to tracemalloc (Python allocations only)
+    resource = None
+    import tracemalloc
+
+# CONFIGURATION
+ARTIFACT_DIR = "pipeline_artifacts"
+STATE_FILE = "state.json"    # Key and output of each stage's last successful run
+RUNS_FILE = "runs.jsonl"     # One line of per-stage metrics per run
+
+# inputs: upstream stage names. settings: everything else that changes the output.
+# source: always runs (its input is the outside world). is_current(token):
+# checks that a side effect recorded by the last run is still in place.
+Stage = namedtuple("Stage", ["name", "inputs", "settings", "run", "source", "is_current"])
+
+# 1. STAGES
+# Run in a child process; heavy imports stay inside so each stage's peak
+# memory is its own. Each returns (output, rows processed): a DataFrame is
+# stored as an artifact, a string is kept as a token.
+def run_scrape(inputs, settings):
+    if settings["listings"]:
+        # Offline: start from an earlier scrape dump
+        df = pd.read_csv(settings["listings"])
+    else:
+        from scrape_faculty import scrape_listings
+        # Raises IncompleteScrapeError if a listing page failed: stopping here
+        # keeps store from pruning that page's whole category
+        df = scrape_listings()
+    if df.empty:
+        raise RuntimeError("The scrape returned no faculty rows.")
+    return df, len(df)
+
+def run_crawl(inputs, settings):
+    from profile_crawler import crawl_frame
+    df = crawl_frame(inputs["scrape"])
+    return df, len(df)
+
+def run_store(inputs, settings):
+    from store_data import MAX_DELETE_SHARE, load_frame
+    load_frame(inputs["scrape"], max_delete_share=None if settings["force_prune"] else MAX_DELETE_SHARE)
+    return database_token(), len(inputs["scrape"])
+
+def run_embed(inputs, settings):
+    from generate_embeddings import generate_embeddings
+    # Without a crawl stage there are no bios (not whatever crawl CSV is lying around)
+    profiles = inputs.get("crawl", pd.DataFrame(columns=["Profile_Link", "Bio", "Publications"]))
+    manifest = generate_embeddings(dtype=settings["dtype"], backend=settings["backend"],
+                                   passages=settings["passages"], profiles=profiles)
+    if manifest is None:
+        raise RuntimeError("generate_embeddings failed (see above).")
+    return store_token(manifest), manifest["count"]
+
+def database_token():
+    """Fingerprint of the faculty rows (None without a database)."""
+    from embedding_store import db_fingerprint
+    from store_data import DB_FILE
+    if not os.path.exists(DB_FILE):
+        return None
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        return db_fingerprint(conn)
+    except sqlite3.Error:
+        return None
+    finally:
+        conn.close()
+
+def store_token(manifest):
+    return f"{manifest['fingerprint']}:v{manifest['version']}"
+
+def database_current(token):
+    return database_token() == token
+
+def store_current(token):
+    from embedding_store import read_manifest
+    manifest = read_manifest()
+    return manifest is not None and store_token(manifest) == token
+
+def build_stages(listings=None, crawl=True, passages=MAX_PASSAGES, dtype="float32", backend="auto",
+                 force_prune=False):
+    stages = [
+        Stage("scrape", [], {"listings": listings}, run_scrape, True, None),
+        Stage("store", ["scrape"], {"force_prune": force_prune}, run_store, False, database_current)
+    ]
+    if crawl:
+        # A source too: profile pages change without the listings changing
+        stages.append(Stage("crawl", ["scrape"], {}, run_crawl, True, None))
+    embed_inputs = ["store", "crawl"] if crawl else ["store"]
+    stages.append(Stage("embed", embed_inputs, {"passages": passages, "dtype": dtype, "backend": backend},
+                        run_embed, False, store_current))
+    return stages
+
+# 2. ARTIFACTS
+def frame_hash(df):
+    """Content hash of a DataFrame: column names, dtypes and values (not the index)."""
+    digest = hashlib.sha256(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:20]
+
+def artifact_path(stage, digest, artifact_dir=ARTIFACT_DIR):
+    return os.path.join(artifact_dir, f"{stage}-{digest}.parquet")
+
+def read_state(artifact_dir=ARTIFACT_DIR):
+    path = os.path.join(artifact_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_state(state, artifact_dir=ARTIFACT_DIR):
+    path = os.path.join(artifact_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def prune_artifacts(state, artifact_dir=ARTIFACT_DIR):
+    """Deletes artifacts no stage output points at any more."""
+    live = {artifact_path(name, entry["output"], artifact_dir)
+            for name, entry in state.items() if entry["kind"] == "frame"}
+    for file in os.listdir(artifact_dir):
+        path = os.path.join(artifact_dir, file)
+        if file.endswith(".parquet") and path not in live:
+            os.remove(path)
+
+def stage_key(stage, inputs):
+    """Hash of what determines a stage's output: its settings and its inputs' outputs."""
+    payload = {"stage": stage.name, "settings": stage.settings,
+               "inputs": {name: result["output"] for name, result in inputs.items()}}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+
+# 3. EXECUTION
+def peak_memory():
+    """Peak memory of this process in bytes."""
+    if resource is None:
+        return tracemalloc.get_traced_memory()[1]
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # Linux reports KiB
+
+def execute(name, run, inputs, settings, artifact_dir):
+    """Child process: loads the inputs, runs the stage, stores a DataFrame output."""
+    if resource is None:
+        tracemalloc.start()
+    start = time.perf_counter()
+    loaded = {
+        dep: pd.read_parquet(artifact_path(dep, result["output"], artifact_dir)) if result["kind"] == "frame"
+        else result["output"]
+        for dep, result in inputs.items()
+    }
+    output, rows = run(loaded, settings)
+    kind = "token"
+    if isinstance(output, pd.DataFrame):
+        kind, digest = "frame", frame_hash(output)
+        path = artifact_path(name, digest, artifact_dir)
+        if not os.path.exists(path):
+            output.to_parquet(path + ".tmp", index=False)
+            os.replace(path + ".tmp", path)
+        output = digest
+    return kind, output, rows, time.perf_counter() - start, peak_memory()
+
+def run_stage(stage, inputs, previous, force, artifact_dir, context):
+    """Skips the stage when its key and output are unchanged, otherwise runs it in a fresh process."""
+    key = stage_key(stage, inputs)
+    if previous and previous["key"] == key and not stage.source and stage.name not in force:
+        if previous["kind"] == "frame":
+            current = os.path.exists(artifact_path(stage.name, previous["output"], artifact_dir))
+        else:
+            current = stage.is_current is None or stage.is_current(previous["output"])
+        if current:
+            return dict(previous, status="skipped", seconds=0.0, peak_mb=None)
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as process:
+        kind, output, rows, seconds, peak = process.submit(
+            execute, stage.name, stage.run, inputs, stage.settings, artifact_dir
+        ).result()
+    return {"key": key, "kind": kind, "output": output, "rows": rows,
+            "status": "ran", "seconds": seconds, "peak_mb": peak / 2 ** 20}
+
+def run_pipeline(stages, force=(), parallel=True, artifact_dir=ARTIFACT_DIR):
+    """
+    Runs every stage once its inputs are ready (independent stages side by
+    side unless parallel=False). Returns the per-stage report; a failing
+    stage stops the run after the stages already running finish.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    state = read_state(artifact_dir)
+    context = multiprocessing.get_context("spawn")
+    results, report = {}, []
+    pending, running = list(stages), {}
+    started = time.perf_counter()
+
+    print(f"\n{'stage':<8} {'status':<8} {'time':>8} {'rows':>9} {'peak MB':>8}  output")
+    with ThreadPoolExecutor(max_workers=len(stages) if parallel else 1) as threads:
+        while pending or running:
+            for stage in [s for s in pending if all(dep in results for dep in s.inputs)]:
+                pending.remove(stage)
+                inputs = {dep: results[dep] for dep in stage.inputs}
+                future = threads.submit(run_stage, stage, inputs, state.get(stage.name), force, artifact_dir, context)
+                running[future] = stage
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                result = future.result()
+                results[stage.name] = result
+                state[stage.name] = {k: result[k] for k in ("key", "kind", "output", "rows")}
+                write_state(state, artifact_dir)
+                report.append(dict(result, stage=stage.name))
+                peak = f"{result['peak_mb']:.0f}" if result["peak_mb"] is not None else "-"
+                print(f"{stage.name:<8} {result['status']:<8} {result['seconds']:>7.2f}s {result['rows']:>9} "
+                      f"{peak:>8}  {str(result['output'])[:24]}")
+
+    total = time.perf_counter() - started
+    print(f"Pipeline finished in {total:.2f}s ({sum(r['status'] == 'ran' for r in report)} ran, "
+          f"{sum(r['status'] == 'skipped' for r in report)} skipped)")
+    prune_artifacts(state, artifact_dir)
+    with open(os.path.join(artifact_dir, RUNS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"finished_at": time.strftime('%Y-%m-%d %H:%M:%S'), "seconds": total,
+                            "stages": report}) + "\n")
+    return report
+
+if __name__ == "__main__":
+    from encoder_backend import ENCODER_BACKEND
+    from embedding_store import DTYPES
+
+    parser = argparse.ArgumentParser(description="Run scrape -> store -> embed, skipping unchanged stages.")
+    parser.add_argument("--listings", default=None, help="start from a scrape dump CSV instead of scraping")
+    parser.add_argument("--no-crawl", action="store_true", help="skip the profile crawl (no bios for passages)")
+    parser.add_argument("--force", nargs="+", default=[], choices=["store", "embed"],
+                        help="re-run these stages even if their inputs are unchanged")
+    parser.add_argument("--serial", action="store_true", help="run one stage at a time")
+    parser.add_argument("--force-prune", action="store_true",
+                        help="delete missing records even past store_data.MAX_DELETE_SHARE of the table")
+    parser.add_argument("--passages", type=int, default=MAX_PASSAGES)
+    parser.add_argument("--dtype", choices=DTYPES, default="float32")
+    parser.add_argument("--backend", choices=["auto", "torch", "onnx"], default=ENCODER_BACKEND)
+    args = parser.parse_args()
+    stages = build_stages(args.listings, not args.no_crawl, max(1, args.passages), args.dtype, args.backend,
+                          args.force_prune)
+    run_pipeline(stages, force=set(args.force), parallel=not args.serial)
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from fetch_engine import AsyncFetcher, RequestsTransport, PER_HOST_LIMIT
+from scrape_faculty import HEADERS, clean_text
+
+# CONFIGURATION
+CSV_FILE = "daiict_faculty_final.csv"
+OUTPUT_FILE = "daiict_faculty_profiles.csv"
+CACHE_DIR = "profile_cache"
+
+# Candidate containers for the long-form bio, most specific first
+BIO_SELECTORS = [".facultyDetails .aboutFaculty", ".aboutFaculty", ".field--name-body", ".facultyDetails", "article .content"]
+PUBLICATION_HEADINGS = ("publication", "selected publications", "research papers")
+
+# 1. DISK CACHE
+# One JSON file per profile URL. It keeps the validators the server sent
+# (ETag / Last-Modified) next to the already-parsed fields, so a 304 answer
+# needs neither a body download nor a re-parse.
+def cache_path(url, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+def load_cached(url, cache_dir=CACHE_DIR):
+    path = cache_path(url, cache_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # A torn or hand-edited entry just means we fetch unconditionally
+        return None
+
+def save_cached(url, entry, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(url, cache_dir)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def conditional_headers(entry):
+    """Builds If-None-Match / If-Modified-Since from a cached entry."""
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+# 2. PARSING
+def parse_profile(html):
+    """Extracts the bio paragraph(s) and the publication list from a profile page."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    bio = ""
+    for selector in BIO_SELECTORS:
+        tag = soup.select_one(selector)
+        if tag:
+            bio = clean_text(" ".join(p.get_text(" ") for p in tag.find_all("p")) or tag.get_text(" "))
+            if bio:
+                break
+
+    publications = []
+    for heading in soup.find_all(["h2", "h3", "h4", "strong"]):
+        if not heading.get_text().strip().lower().startswith(PUBLICATION_HEADINGS):
+            continue
+        # Publications are the list items that follow the heading
+        for sibling in heading.find_all_next(["li", "h2", "h3", "h4"]):
+            if sibling.name != "li":
+                break
+            text = clean_text(sibling.get_text(" "))
+            if text:
+                publications.append(text)
+        if publications:
+            break
+
+    return {"bio": bio or "N/A", "publications": publications}
+
+# 3. CRAWL
+async def crawl(urls, transport, per_host_limit=PER_HOST_LIMIT, cache_dir=CACHE_DIR):
+    """
+    Revalidates every profile URL against the disk cache.
+    Returns ({url: parsed fields}, stats) where stats counts fetched,
+    not_modified and failed pages.
+    """
+    fetcher = AsyncFetcher(transport, per_host_limit=per_host_limit)
+    stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+    profiles = {}
+
+    async def revalidate(url):
+        cached = load_cached(url, cache_dir)
+        result = await fetcher.fetch(url, conditional_headers(cached))
+
+        if result.status == 304 and cached:
+            stats["not_modified"] += 1
+            profiles[url] = cached["fields"]
+            return
+        if result.error or result.status != 200:
+            stats["failed"] += 1
+            # Serve the stale copy rather than dropping the profile
+            if cached:
+                profiles[url] = cached["fields"]
+            return
+
+        fields = await asyncio.to_thread(parse_profile, result.text)
+        headers = {k.lower(): v for k, v in result.headers.items()}
+        save_cached(url, {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched_at": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "fields": fields
+        }, cache_dir)
+        stats["fetched"] += 1
+        profiles[url] = fields
+
+    await asyncio.gather(*(revalidate(url) for url in urls))
+    return profiles, stats
+
+def crawl_frame(listings, transport=None, per_host_limit=PER_HOST_LIMIT, cache_dir=CACHE_DIR):
+    """Crawls the Profile_Link of every listing row; returns (Profile_Link, Bio, Publications) rows."""
+    urls = [u for u in listings['Profile_Link'].dropna().unique() if str(u).startswith("http")]
+    print(f"Crawling {len(urls)} profile pages (cache: '{cache_dir}')...")
+
+    own_transport = transport is None
+    if own_transport:
+        transport = RequestsTransport(headers=HEADERS, pool_size=per_host_limit)
+
+    start = time.perf_counter()
+    try:
+        profiles, stats = asyncio.run(crawl(urls, transport, per_host_limit, cache_dir))
+    finally:
+        if own_transport:
+            transport.close()
+    elapsed = time.perf_counter() - start
+
+    rows = [{
+        "Profile_Link": url,
+        "Bio": profiles[url]["bio"],
+        "Publications": " || ".join(profiles[url]["publications"]) or "N/A"
+    } for url in urls if url in profiles]
+    print(f"   -> Fetched: {stats['fetched']}, Not modified (304): {stats['not_modified']}, Failed: {stats['failed']}"
+          f" in {elapsed:.2f}s")
+    return pd.DataFrame(rows, columns=["Profile_Link", "Bio", "Publications"])
+
+def crawl_profiles(transport=None, per_host_limit=PER_HOST_LIMIT, cache_dir=CACHE_DIR):
+    """Follows every Profile_Link in the listing CSV and saves bios/publications."""
+    if not os.path.exists(CSV_FILE):
+        print(f"Error: '{CSV_FILE}' not found. Please run 'scrape_faculty.py' first.")
+        return
+
+    df = crawl_frame(pd.read_csv(CSV_FILE), transport, per_host_limit, cache_dir)
+    df.to_csv(OUTPUT_FILE, index=False)
+    print(f"   -> {len(df)} profiles saved to '{OUTPUT_FILE}'")
+
+if __name__ == "__main__":
+    crawl_profiles()
@@ -0,0 +1,152 @@
+import atexit
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# CONFIGURATION
+MAX_ENTRIES = 2048
+PERSIST_EVERY = 32   # Flush to disk after this many new entries
+
+def normalize_query(text):
+    """Cache key: case-folded, whitespace-collapsed query text."""
+    return re.sub(r'\s+', ' ', str(text)).strip().lower()
+
+class QueryCache:
+    """
+    Bounded LRU cache of normalised query text -> embedding vector.
+
+    `encode_fn` takes a list of strings and returns a (n, dim) array (e.g.
+    SentenceTransformer.encode). Misses in one call are encoded together.
+    Safe to share between threads, so one instance can serve the Streamlit
+    app and the API. With `persist_path` the cache survives restarts; a
+    file written for a different `model_name` is ignored. Persistence is
+    best effort: a failed write is reported and a bad file is a cold start,
+    never a failed query.
+    """
+
+    def __init__(self, encode_fn, model_name="", max_entries=MAX_ENTRIES, persist_path=None, persist_every=PERSIST_EVERY):
+        self.encode_fn = encode_fn
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.persist_every = persist_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()   # One writer at a time (save runs outside _lock)
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0   # Time spent in encode_fn (misses only)
+        self.lookup_seconds = 0.0   # Total time spent in encode()
+        self.calls = 0
+
+        if persist_path:
+            self.load()
+            atexit.register(self._try_save)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def encode(self, queries):
+        """Returns a (len(queries), dim) array, encoding only the cache misses."""
+        start = time.perf_counter()
+        keys = [normalize_query(q) for q in queries]
+        vectors = [None] * len(keys)
+        missing = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._entries.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    vectors[i] = vector
+            self.hits += len(keys) - sum(len(v) for v in missing.values())
+            self.misses += sum(len(v) for v in missing.values())
+
+        if missing:
+            # Encode outside the lock so concurrent hits are not blocked
+            encode_start = time.perf_counter()
+            fresh = np.asarray(self.encode_fn(list(missing)), dtype=np.float32)
+            encoded_in = time.perf_counter() - encode_start
+
+            with self._lock:
+                self.encode_seconds += encoded_in
+                for key, vector in zip(missing, fresh):
+                    self._entries[key] = vector
+                    self._entries.move_to_end(key)
+                    for i in missing[key]:
+                        vectors[i] = vector
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._unsaved += len(missing)
+                flush = self.persist_path and self._unsaved >= self.persist_every
+
+            if flush:
+                self._try_save()
+
+        with self._lock:
+            self.calls += 1
+            self.lookup_seconds += time.perf_counter() - start
+        return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "avg_encode_ms": 1000 * self.encode_seconds / self.misses if self.misses else 0.0,
+                "avg_lookup_ms": 1000 * self.lookup_seconds / self.calls if self.calls else 0.0
+            }
+
+    # Persistence: one .npz with the keys (oldest first) and a vector matrix
+    def save(self):
+        if not self.persist_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._entries:
+                    return
+                keys = np.array(list(self._entries), dtype=object)
+                vectors = np.vstack(list(self._entries.values()))
+                self._unsaved = 0
+            # A unique scratch file per writer: the app and the API may share the cache file
+            fd, scratch = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.persist_path)), suffix=".npz")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, keys=keys.astype(str), vectors=vectors, model=np.array(self.model_name))
+                os.replace(scratch, self.persist_path)
+            except BaseException:
+                os.unlink(scratch)
+                raise
+
+    def _try_save(self):
+        """save() for the query path and exit: a failed write is reported, never raised."""
+        try:
+            self.save()
+        except Exception as e:
+            print(f"Query cache not saved to '{self.persist_path}': {e}")
+
+    def load(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with np.load(self.persist_path) as data:
+                keys, vectors, model = data["keys"], data["vectors"], str(data["model"])
+        except Exception:
+            # A corrupt or truncated cache file is only a cold start, never an error
+            return
+        if model != self.model_name:
+            return
+        with self._lock:
+            for key, vector in zip(keys[-self.max_entries:], vectors[-self.max_entries:]):
+                self._entries[str(key)] = vector
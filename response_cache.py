@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# CONFIGURATION
+MAX_ENTRIES = 512
+MAX_BODY_BYTES = 1024 * 1024   # Bigger responses are served but not kept
+
+def make_key(path, query_items, version):
+    """Cache key for a GET: path, query parameters in a stable order, data version."""
+    return (path, tuple(sorted(query_items)), version)
+
+def make_etag(key):
+    """
+    Strong ETag for a cache key. Responses are a pure function of path,
+    parameters and data version, so the tag is known before the handler
+    runs and a matching If-None-Match can be answered without any work.
+    """
+    path, params, version = key
+    digest = hashlib.sha1(repr((path, params)).encode("utf-8")).hexdigest()[:20]
+    return f'"v{version}-{digest}"'
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match semantics: '*' or any listed tag (weak prefix ignored)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+class ResponseCache:
+    """
+    In-process LRU of rendered responses: key -> (status, headers, body).
+    Entries from older data versions are never hit again (the version is
+    part of the key) and age out of the LRU. Thread-safe.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_body_bytes=MAX_BODY_BYTES):
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, status, headers, body):
+        if len(body) > self.max_body_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (status, headers, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -1,8 +1,16 @@
-import requests
+import asyncio
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
 
+try:
+    import lxml.html
+except ImportError:  # Optional: falls back to the BeautifulSoup parser
+    lxml = None
+
+from fetch_engine import AsyncFetcher, RequestsTransport, PER_HOST_LIMIT, print_timings
+from metrics import REGISTRY, SCRAPE_SECONDS
+
 # CONFIGURATION
 URLS = [
     ("https://www.daiict.ac.in/faculty", "Faculty"),
@@ -19,6 +27,17 @@ HEADERS = {
 # Filtering out non-faculty rows just in case
 IGNORE_LIST = ["contact us", "quick links", "menu", "search"]
 
+# Listing parser: "lxml" (single pass per card) or "bs4" (CSS selectors)
+PARSER_BACKEND = "lxml" if lxml is not None else "bs4"
+SITE_ROOT = "https://www.daiict.ac.in"
+
+class IncompleteScrapeError(Exception):
+    """A listing page failed, so the rows of its whole category are missing."""
+
+    def __init__(self, failed):
+        super().__init__(f"{len(failed)} listing page(s) failed: {', '.join(failed)}")
+        self.failed = failed
+
 def clean_text(text):
     if not text: return ""
     return re.sub(r'\s+', ' ', text).strip()
@@ -32,104 +51,246 @@ def parse_email(text):
     text = text.replace("[at]", "@").replace("[dot]", ".")
     return text
 
-def scrape_daiict_csv():
+def make_row(category, name, href, education, email, phone, interest, img_src):
+    """Normalises the raw card fields into one CSV row (shared by all parsers)."""
+    profile_link = href if href is not None else "N/A"
+    if profile_link != "N/A" and not profile_link.startswith("http"):
+        profile_link = SITE_ROOT + profile_link
+
+    image_url = "N/A"
+    if img_src is not None:
+        image_url = img_src if img_src.startswith("http") else SITE_ROOT + img_src
+
+    return {
+        "Name": name,
+        "Designation": category,
+        "Email": parse_email(email) if email is not None else "N/A",
+        "Phone": clean_text(phone) if phone is not None else "N/A",
+        "Education": clean_text(education) if education is not None else "N/A",
+        "Area_of_Interest": clean_text(interest) if interest is not None else "N/A",
+        "Profile_Link": profile_link,
+        "Image_URL": image_url
+    }
+
+def parse_listing_bs4(html, category):
+    """Reference parser: BeautifulSoup tree + one CSS query per field."""
+    rows = []
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # TARGETED SELECTOR: Only looks inside the faculty list container
+    cards = soup.select('.facultyInformation ul li')
+
+    if not cards:
+        print(f"   -> No profiles found for {category}. Checking fallback selectors...")
+        # Fallback in case specific page structure differs slightly
+        cards = soup.select('.view-content .views-row')
+
+    for card in cards:
+        # 1. Extract Name
+        name_tag = card.select_one('.personalDetails h3 a')
+        if not name_tag:
+            # Try fallback for name
+            name_tag = card.select_one('h3')
+
+        if not name_tag: continue
+        name = clean_text(name_tag.get_text())
+
+        # Filter Ignore List
+        if any(ignored in name.lower() for ignored in IGNORE_LIST):
+            continue
+
+        # 2. Extract Specific Fields
+        fields = {}
+        for key, selector in (("education", '.facultyEducation'), ("email", '.facultyemail'),
+                              ("phone", '.facultyNumber'), ("interest", '.areaSpecialization')):
+            tag = card.select_one(selector)
+            fields[key] = tag.get_text() if tag else None
+
+        # 3. Extract Links
+        href = None
+        if name_tag.name == 'a' and name_tag.has_attr('href'):
+            href = name_tag['href']
+
+        img_src = None
+        img_tag = card.select_one('.facultyPhoto img')
+        if img_tag and img_tag.has_attr('src'):
+            img_src = img_tag['src']
+
+        # 4. Append Data
+        rows.append(make_row(category, name, href, img_src=img_src, **fields))
+
+    return rows
+
+def _class_xpath(cls):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+CARD_XPATH = f"//*[{_class_xpath('facultyInformation')}]//ul//li"
+FALLBACK_CARD_XPATH = f"//*[{_class_xpath('view-content')}]//*[{_class_xpath('views-row')}]"
+FIELD_CLASSES = {
+    "facultyEducation": "education",
+    "facultyemail": "email",
+    "facultyNumber": "phone",
+    "areaSpecialization": "interest"
+}
+
+def _scan_card(el, found, personal, personal_h3, photo):
+    """
+    Walks a card subtree once, in document order, recording the first match
+    for every field. The flags carry the ancestor context that the CSS
+    selectors '.personalDetails h3 a' and '.facultyPhoto img' depend on.
+    """
+    for child in el:
+        tag = child.tag
+        if not isinstance(tag, str):  # comments / processing instructions
+            continue
+        classes = (child.get("class") or "").split()
+
+        for cls in classes:
+            key = FIELD_CLASSES.get(cls)
+            if key and key not in found:
+                found[key] = child
+        if tag == "h3":
+            found.setdefault("h3", child)
+        elif tag == "a" and personal_h3:
+            found.setdefault("name_a", child)
+        elif tag == "img" and photo:
+            found.setdefault("img", child)
+
+        if len(child):
+            _scan_card(child, found,
+                       personal or "personalDetails" in classes,
+                       personal_h3 or (tag == "h3" and personal),
+                       photo or "facultyPhoto" in classes)
+
+def parse_listing_lxml(html, category):
+    """Fast parser: libxml2 tree + a single pass over each card subtree."""
+    rows = []
+    root = lxml.html.document_fromstring(html)
+
+    cards = root.xpath(CARD_XPATH)
+    if not cards:
+        print(f"   -> No profiles found for {category}. Checking fallback selectors...")
+        cards = root.xpath(FALLBACK_CARD_XPATH)
+
+    for card in cards:
+        # Seed the ancestor flags from the card's own ancestry
+        personal = personal_h3 = photo = False
+        for node in reversed([card] + list(card.iterancestors())):
+            classes = (node.get("class") or "").split()
+            personal_h3 = personal_h3 or (node.tag == "h3" and personal)
+            personal = personal or "personalDetails" in classes
+            photo = photo or "facultyPhoto" in classes
+
+        found = {}
+        _scan_card(card, found, personal, personal_h3, photo)
+
+        name_tag = found.get("name_a")
+        if name_tag is None:
+            name_tag = found.get("h3")
+        if name_tag is None: continue
+        name = clean_text(name_tag.text_content())
+
+        if any(ignored in name.lower() for ignored in IGNORE_LIST):
+            continue
+
+        fields = {key: found[key].text_content() if key in found else None
+                  for key in FIELD_CLASSES.values()}
+        href = name_tag.get("href") if name_tag.tag == "a" else None
+        img_src = found["img"].get("src") if "img" in found else None
+
+        rows.append(make_row(category, name, href, img_src=img_src, **fields))
+
+    return rows
+
+PARSERS = {"bs4": parse_listing_bs4}
+if lxml is not None:
+    PARSERS["lxml"] = parse_listing_lxml
+
+def parse_listing(html, category, backend=None):
+    """Extracts one dict per faculty card using the configured parser backend."""
+    backend = backend or PARSER_BACKEND
+    if backend not in PARSERS:
+        print(f"   -> Parser '{backend}' unavailable, using bs4")
+        backend = "bs4"
+    return PARSERS[backend](html, category)
+
+async def fetch_listings(transport, per_host_limit=PER_HOST_LIMIT):
+    """
+    Downloads every listing page concurrently over one pooled transport.
+    Each page is parsed on a worker thread the moment it arrives, so parsing
+    overlaps with the downloads still in flight.
+    Returns [(FetchResult, rows)] in URLS order; rows is None for a page
+    that failed to download or parse.
+    """
+    categories = dict(URLS)
+    fetcher = AsyncFetcher(transport, per_host_limit=per_host_limit)
+
+    async def on_page(result):
+        category = categories[result.url]
+        SCRAPE_SECONDS.observe(result.elapsed, stage="fetch")
+        if result.error or result.status != 200:
+            print(f"   -> {category} failed (Status {result.status}{', ' + result.error if result.error else ''})")
+            return None
+        try:
+            with SCRAPE_SECONDS.time(stage="parse"):
+                rows = await asyncio.to_thread(parse_listing, result.text, category)
+        except Exception as e:
+            print(f"Error scraping {result.url}: {e}")
+            return None
+        print(f"   -> {category}: {len(rows)} profiles in {result.elapsed:.2f}s")
+        return rows
+
+    return await fetcher.fetch_all([url for url, _ in URLS], on_result=on_page)
+
+def scrape_listings(transport=None, per_host_limit=PER_HOST_LIMIT, allow_partial=False):
+    """
+    Fetches and parses every listing page; returns the de-duplicated rows as
+    a DataFrame. Raises IncompleteScrapeError if any page failed (after its
+    retries), unless allow_partial: loading a partial scrape with pruning
+    would delete every faculty member of the missing category.
+    """
     all_data = []
-    print(f"{'Name':<30} | {'Email':<35} | {'Status'}")
+    own_transport = transport is None
+    if own_transport:
+        transport = RequestsTransport(headers=HEADERS, pool_size=per_host_limit)
+
+    print(f"Fetching {len(URLS)} listing pages (up to {per_host_limit} at a time)...")
+    try:
+        pages = asyncio.run(fetch_listings(transport, per_host_limit))
+    finally:
+        if own_transport:
+            transport.close()
+
+    print(f"\n{'Name':<30} | {'Email':<35} | {'Status'}")
     print("-" * 80)
+    for _, rows in pages:
+        for row in rows or []:
+            all_data.append(row)
+            print(f"{row['Name'][:25]:<30} | {row['Email'][:30]:<35} | OK")
 
-    for url, category in URLS:
-        try:
-            print(f"Fetching {category}...")
-            response = requests.get(url, headers=HEADERS, timeout=15)
-            if response.status_code != 200:
-                print(f"   -> Failed (Status {response.status_code})")
-                continue
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # TARGETED SELECTOR: Only looks inside the faculty list container
-            cards = soup.select('.facultyInformation ul li')
-
-            if not cards:
-                print(f"   -> No profiles found for {category}. Checking fallback selectors...")
-                # Fallback in case specific page structure differs slightly
-                cards = soup.select('.view-content .views-row')
-
-            for card in cards:
-                # 1. Extract Name
-                name_tag = card.select_one('.personalDetails h3 a')
-                if not name_tag:
-                    # Try fallback for name
-                    name_tag = card.select_one('h3')
-
-                if not name_tag: continue
-                name = clean_text(name_tag.get_text())
-
-                # Filter Ignore List
-                if any(ignored in name.lower() for ignored in IGNORE_LIST):
-                    continue
-
-                # 2. Extract Specific Fields
-                education = "N/A"
-                edu_tag = card.select_one('.facultyEducation')
-                if edu_tag:
-                    education = clean_text(edu_tag.get_text())
-
-                email = "N/A"
-                email_tag = card.select_one('.facultyemail')
-                if email_tag:
-                    email = parse_email(email_tag.get_text())
-
-                phone = "N/A"
-                phone_tag = card.select_one('.facultyNumber')
-                if phone_tag:
-                    phone = clean_text(phone_tag.get_text())
-
-                interest = "N/A"
-                interest_tag = card.select_one('.areaSpecialization')
-                if interest_tag:
-                    interest = clean_text(interest_tag.get_text())
-
-                # 3. Extract Links
-                profile_link = "N/A"
-                if name_tag.name == 'a' and name_tag.has_attr('href'):
-                      profile_link = name_tag['href']
-
-                if profile_link != "N/A" and not profile_link.startswith("http"):
-                    profile_link = "https://www.daiict.ac.in" + profile_link
-
-                image_url = "N/A"
-                img_tag = card.select_one('.facultyPhoto img')
-                if img_tag and img_tag.has_attr('src'):
-                    src = img_tag['src']
-                    if not src.startswith("http"):
-                        image_url = "https://www.daiict.ac.in" + src
-                    else:
-                        image_url = src
-
-                # 4. Append Data
-                all_data.append({
-                    "Name": name,
-                    "Designation": category,
-                    "Email": email,
-                    "Phone": phone,
-                    "Education": education,
-                    "Area_of_Interest": interest,
-                    "Profile_Link": profile_link,
-                    "Image_URL": image_url
-                })
-
-                print(f"{name[:25]:<30} | {email[:30]:<35} | OK")
+    print_timings([result for result, _ in pages])
+    REGISTRY.report("faculty_scrape")
 
-        except Exception as e:
-            print(f"Error scraping {url}: {e}")
+    failed = [result.url for result, rows in pages if rows is None]
+    if failed and not allow_partial:
+        raise IncompleteScrapeError(failed)
 
-    # SAVE TO CSV 
-    if all_data:
-        df = pd.DataFrame(all_data)
+    df = pd.DataFrame(all_data)
+    if not df.empty:
         # Final cleanup to ensure no duplicates
         df.drop_duplicates(subset=['Name', 'Email'], inplace=True)
+    return df
 
+def scrape_daiict_csv(transport=None, per_host_limit=PER_HOST_LIMIT):
+    try:
+        df = scrape_listings(transport, per_host_limit)
+    except IncompleteScrapeError as e:
+        # A partial dump would be pruned as departures by the next store_data.py run
+        print(f"\n{e}. Keeping the previous CSV; run again once the site answers.")
+        return
+
+    # SAVE TO CSV 
+    if not df.empty:
         filename = "daiict_faculty_final.csv"
         df.to_csv(filename, index=False)
         print("\n" + "="*50)
@@ -140,4 +301,8 @@ def scrape_daiict_csv():
         print("No data found.")
 
 if __name__ == "__main__":
-    scrape_daiict_csv()
\ No newline at end of file
+    scrape_daiict_csv()
+
+    # Stage 2: follow each Profile_Link for the full bio and publications
+    from profile_crawler import crawl_profiles
+    crawl_profiles()
\ No newline at end of file
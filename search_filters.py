@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+
+# CONFIGURATION
+# facet -> display column of the search frame it is derived from (semantic_search.DB_COLUMNS)
+FACETS = {"designation": "Designation", "domain": "Email", "institution": "Education"}
+# Facets matched on words ("IIT" -> every IIT) rather than on the whole value
+WORD_MATCH = {"institution"}
+FILTERS = tuple(FACETS) + ("has_email",)
+
+# Plain string patterns, like store_data.py: vectorized in the native regex engine
+PARENTHESES = r"\([^)]*\)"
+SPACES = r"\s+"
+ADDRESS = r"[^\s,;@]+@([^\s,;@]+)"   # Captures the domain of each address in a cell
+SEPARATORS = r"[,:]"   # "PhD (...), IIT Bombay" / "Masters in Design: NID, Gandhinagar"
+
+def _text(series):
+    return series.astype("string").str.strip()
+
+def designation_values(series):
+    return _text(series)
+
+def domain_values(series):
+    """Lower-cased domain of every address in a cell (some list two), [] for "N/A"."""
+    return _text(series).str.lower().str.findall(ADDRESS)
+
+def institution_values(series):
+    """
+    "PhD (Computer Science), IIT Bombay" -> "IIT Bombay": the part after the
+    degree, without parenthesised subjects. City and country suffixes
+    ("..., Kolkata", "..., USA") are dropped so one institution is one value.
+    """
+    parts = _text(series).str.replace(PARENTHESES, "", regex=True).str.split(SEPARATORS, regex=True)
+    institution = parts.str[1].str.replace(SPACES, " ", regex=True).str.strip()
+    return institution.where(institution.fillna("") != "")
+
+EXTRACT = {"designation": designation_values, "domain": domain_values, "institution": institution_values}
+
+def normalize(value):
+    """Match key of a facet value: lower case, single spaces."""
+    return " ".join(str(value).lower().split())
+
+class FacetIndex:
+    """
+    Pre-filter for vector search: one inverted list (sorted row positions)
+    per designation, e-mail domain and education institution of the rows a
+    search index returns. rows() combines them (OR within a facet, AND
+    across facets) into the row set the indexes score, so a filtered query
+    never wastes its top-k on rows that would be thrown away, and a
+    selective filter scores fewer vectors than an unfiltered one.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.lists = {}    # facet -> {key: sorted int64 row positions}
+        self.labels = {}   # facet -> {key: first spelling seen, for display}
+        for facet, column in FACETS.items():
+            values = EXTRACT[facet](df[column]) if column in df else pd.Series(pd.NA, index=df.index, dtype="string")
+            # One entry per (row, value): a row with two domains is in both lists
+            values = values.reset_index(drop=True).explode()
+            positions = values.index.to_numpy()
+            # normalize(), vectorized
+            keys = values.str.lower().str.replace(SPACES, " ", regex=True).str.strip()
+            codes, uniques = pd.factorize(keys)
+            order = np.argsort(codes, kind="stable")
+            offsets = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.lists[facet] = {key: np.unique(positions[order[offsets[i]:offsets[i + 1]]]).astype(np.int64)
+                                 for i, key in enumerate(uniques)}
+            self.labels[facet] = {key: values.iloc[order[offsets[i]]] for i, key in enumerate(uniques)}
+            if facet == "domain":
+                self.with_email = np.unique(positions[values.notna().to_numpy()]).astype(np.int64)
+
+    def _matches(self, facet, wanted):
+        """Union of the lists of every value in `wanted` (a string or a list of strings)."""
+        wanted = [wanted] if isinstance(wanted, str) else list(wanted)
+        lists = self.lists[facet]
+        if facet in WORD_MATCH:
+            # Every word of the filter value must be a word of the key
+            words = [set(normalize(value).split()) for value in wanted]
+            keys = [key for key in lists if any(w and w <= set(key.split()) for w in words)]
+        else:
+            keys = [key for key in map(normalize, wanted) if key in lists]
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        if len(keys) == 1:
+            return lists[keys[0]]
+        return np.unique(np.concatenate([lists[key] for key in keys]))
+
+    def rows(self, designation=None, domain=None, institution=None, has_email=None):
+        """
+        Sorted row positions that pass every given filter, or None when no
+        filter is set (search everything). Unknown values match nothing.
+        """
+        selected = []
+        for facet, wanted in (("designation", designation), ("domain", domain), ("institution", institution)):
+            if wanted:
+                selected.append(self._matches(facet, wanted))
+        if has_email is not None:
+            selected.append(self.with_email if has_email else
+                            np.setdiff1d(np.arange(self.n_rows, dtype=np.int64), self.with_email, assume_unique=True))
+        if not selected:
+            return None
+        # Smallest list first: every intersection is then at most that big
+        selected.sort(key=len)
+        rows = selected[0]
+        for other in selected[1:]:
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+    def facets(self):
+        """{facet: [{"value", "count"}]}, most common first, for filter pickers."""
+        return {
+            facet: sorted(({"value": self.labels[facet][key], "count": len(rows)} for key, rows in lists.items()),
+                          key=lambda item: (-item["count"], item["value"]))
+            for facet, lists in self.lists.items()
+        }
@@ -0,0 +1,57 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from ann_index import IVFIndex
+from embedding_store import STORE_DIR, db_fingerprint, open_arrays, open_store
+from passages import PassageIndex
+from vector_search import VectorIndex
+
+# CONFIGURATION
+DB_FILE = "faculty.db"
+
+# faculty table column -> display column used by the search results
+DB_COLUMNS = {
+    "name": "Name", "designation": "Designation", "email": "Email", "phone": "Phone",
+    "education": "Education", "bio_interest": "Area_of_Interest",
+    "profile_link": "Profile_Link", "image_url": "Image_URL"
+}
+
+def load_search_index(db_file=DB_FILE, store_dir=STORE_DIR):
+    """
+    Maps the embedding store and lines the faculty rows up with it.
+    Returns (manifest, index, df) where row i of `df` belongs to result row
+    i of the index. A passage store (several vectors per faculty) is
+    searched with max-sim and still yields one row per faculty. Raises
+    EmbeddingStoreError (or sqlite3.Error) when the store is missing or
+    was built from different faculty data. Shared by app.py and the API so
+    both serve the same vectors the same way.
+    """
+    # 1. Map the embedding store (float32 and int8 are searched in place and
+    #    shared between workers; exact search widens float16 into a private
+    #    copy) and refuse it if it was built from different faculty data
+    conn = sqlite3.connect(db_file)
+    try:
+        manifest, ids, vectors = open_store(store_dir, expected_fingerprint=db_fingerprint(conn))
+        df = pd.read_sql_query(f"SELECT id, {', '.join(DB_COLUMNS)} FROM faculty", conn)
+    finally:
+        conn.close()
+
+    # 2. Load Data Mapping: row i of the matrix belongs to faculty ids[i]
+    passages = manifest.get("passages", 1)
+    ids = np.asarray(ids)
+    if passages > 1:
+        # Passage store: one df row per faculty, owners[i] = df row of passage i
+        ids, owners = np.unique(ids, return_inverse=True)
+    df = df.set_index('id').loc[ids].rename(columns=DB_COLUMNS).reset_index()
+    df[['Email', 'Phone']] = df[['Email', 'Phone']].fillna('N/A')
+    arrays = open_arrays(manifest, store_dir)
+    if (manifest.get("ann") or {}).get("type") == "ivf":
+        # Large corpora: approximate search over the IVF buckets
+        index = IVFIndex.from_arrays(vectors, arrays)
+    else:
+        index = VectorIndex(vectors, normalized=manifest.get("normalized", False), scales=arrays.get("scales"))
+    if passages > 1:
+        index = PassageIndex(index, owners, passages)
+    return manifest, index, df
@@ -2,10 +2,16 @@ import sqlite3
 import pandas as pd
 import re
 import os
+import sys
+import hashlib
+
+from metrics import REGISTRY, STORE_ROWS, STORE_SECONDS
 
 # CONFIGURATION
 CSV_FILE = "daiict_faculty_final.csv"
 DB_FILE = "faculty.db"
+CHUNK_SIZE = 50_000  # Rows per read_csv chunk; keeps memory flat on big dumps
+MAX_DELETE_SHARE = 0.1  # A run missing more of the table than this is not pruned (likely a partial scrape)
 
 # 2. TRANSFORMATION (The Cleaner)
 def clean_phone(phone):
@@ -26,31 +32,132 @@ def clean_text_field(text):
     text = text.replace("â€“", "-").replace("â€™", "'")
     return text
 
-def transform_data(df):
+# Vectorized equivalents of the per-cell cleaners above. The scalar
+# functions stay as the reference definition; benchmarks/bench_transform.py
+# checks both produce identical frames. Dropped values come back as missing
+# (NA) rather than None; both are stored as NULL.
+# Plain string patterns: with Arrow-backed strings they run in the native
+# regex engine, a compiled re.Pattern would drop back to per-cell Python
+PHONE_STRIP = r'[^\d-]'
+TEXT_NULLS = ["N/A", "nan", ""]
+ENCODING_FIXES = [("â€“", "-"), ("â€™", "'")]
+
+def _as_text(series):
+    """str(x) for every present value, missing values stay missing."""
+    return series.astype("string")
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+
+def clean_phone_series(series):
+    """Vectorized clean_phone."""
+    text = _as_text(series)
+    keep = text.str.contains("079-", regex=False).fillna(False).astype(bool)
+    return text.str.replace(PHONE_STRIP, "", regex=True).where(keep)
+
+def clean_text_series(series):
+    """Vectorized clean_text_field."""
+    if not _is_text(series):
+        # Numeric columns hit the falsy-value branch of the scalar version
+        return series.apply(clean_text_field)
+    text = _as_text(series).str.strip()
+    keep = (text.notna() & ~text.isin(TEXT_NULLS)).fillna(False).astype(bool)
+    for bad, good in ENCODING_FIXES:
+        text = text.str.replace(bad, good, regex=False)
+    return text.where(keep)
+
+def null_if_na_series(series):
+    """Vectorized `None if "N/A" in str(x) else x`."""
+    has_na = _as_text(series).str.contains("N/A", regex=False).fillna(False).astype(bool)
+    return series.where(~has_na)
+
+def transform_data(df, timestamp=None):
     print("Starting Transformation (Cleaning)...")
     
     # 1. Handle Nulls: specific logic for each column
-    df['Phone'] = df['Phone'].apply(clean_phone)
-    df['Email'] = df['Email'].apply(lambda x: None if "N/A" in str(x) else x)
-    df['Education'] = df['Education'].apply(clean_text_field)
-    df['Area_of_Interest'] = df['Area_of_Interest'].apply(clean_text_field)
-    df['Image_URL'] = df['Image_URL'].apply(lambda x: None if "N/A" in str(x) else x)
+    df['Phone'] = clean_phone_series(df['Phone'])
+    df['Email'] = null_if_na_series(df['Email'])
+    df['Education'] = clean_text_series(df['Education'])
+    df['Area_of_Interest'] = clean_text_series(df['Area_of_Interest'])
+    df['Image_URL'] = null_if_na_series(df['Image_URL'])
     
     # 2. Add Timestamp (Good for data management scoring)
-    df['last_updated'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    df['last_updated'] = timestamp or pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
     
     print(f"   -> Cleaned {len(df)} records.")
     return df
 
+def read_chunks(csv_file=CSV_FILE, chunksize=CHUNK_SIZE):
+    """Streams the scrape dump in fixed-size DataFrame chunks."""
+    return pd.read_csv(csv_file, chunksize=chunksize)
+
 # 3. STORAGE (The Structured Home)
-def init_db():
-    """Creates the SQLite table schema."""
-    conn = sqlite3.connect(DB_FILE)
+# Natural key used to merge scraped rows into the table: the lower-cased
+# email when there is one, otherwise the lower-cased name.
+NATURAL_KEY_SQL = """
+    CASE WHEN email IS NOT NULL AND trim(email) != '' THEN lower(trim(email))
+         ELSE 'name:' || lower(trim(name)) END
+"""
+
+# Columns refreshed on every merge (everything except id and the key itself)
+DATA_COLUMNS = ["name", "designation", "email", "phone", "education",
+                "bio_interest", "profile_link", "image_url"]
+
+# Columns the API serves (main.FacultyModel). natural_key, content_hash and
+# last_seen_run are upsert bookkeeping and stay internal.
+PUBLIC_COLUMNS = ["id"] + DATA_COLUMNS + ["last_updated"]
+
+# DataFrame column -> table column
+COLUMN_MAP = {
+    "Name": "name", "Designation": "designation", "Email": "email", "Phone": "phone",
+    "Education": "education", "Area_of_Interest": "bio_interest",
+    "Profile_Link": "profile_link", "Image_URL": "image_url", "last_updated": "last_updated"
+}
+
+# Change-data-capture: every record carries a hash of its DATA_COLUMNS, and
+# each load run logs its inserts / updates / deletes to faculty_changes.
+CONTENT_HASH_SQL = f"content_hash({', '.join(DATA_COLUMNS)})"
+
+# Full-text index over the searchable columns. External-content FTS5 table:
+# it stores only the index, the text itself stays in `faculty`.
+FTS_TABLE = "faculty_fts"
+FTS_COLUMNS = ["name", "designation", "education", "bio_interest"]
+
+def content_hash(*values):
+    """Stable SHA-1 over a record's data columns (NULL-aware)."""
+    joined = "\x1f".join("\x00" if v is None else str(v) for v in values)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+def bump_version(cursor):
+    """Advances the data version; call inside every transaction that changes served faculty data."""
+    cursor.execute("UPDATE data_version SET version = version + 1, updated_at = datetime('now') WHERE id = 1")
+
+def data_version(conn):
+    """Current data version: changes whenever a load inserts, updates or deletes rows (API caches key on it)."""
+    row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+def connect(db_file=DB_FILE):
+    """Opens the database with the content_hash() SQL function registered."""
+    conn = sqlite3.connect(db_file)
+    conn.create_function("content_hash", len(DATA_COLUMNS), content_hash, deterministic=True)
+    return conn
+
+def init_db(db_file=DB_FILE):
+    """Creates the SQLite table schema (and migrates older databases)."""
+    conn = connect(db_file)
     cursor = conn.cursor()
+
+    # WAL is a property of the file: the API's read-only pool keeps serving
+    # while a load writes
+    cursor.execute("PRAGMA journal_mode = WAL")
     
     # Schema Design
     # - id: Auto-increment primary key
     # - email: Unique constraint to prevent duplicates
+    # - natural_key: Unique merge key for bulk upserts (see NATURAL_KEY_SQL)
+    # - content_hash: Hash of the data columns, used to skip unchanged rows
+    # - last_seen_run: Last load run that contained this record
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS faculty (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -62,84 +169,328 @@ def init_db():
             bio_interest TEXT,
             profile_link TEXT,
             image_url TEXT,
-            last_updated TEXT
+            last_updated TEXT,
+            natural_key TEXT,
+            content_hash TEXT,
+            last_seen_run INTEGER
+        )
+    ''')
+
+    # One row per load run, with its change counts
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS store_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT,
+            finished_at TEXT,
+            inserted INTEGER DEFAULT 0,
+            updated INTEGER DEFAULT 0,
+            unchanged INTEGER DEFAULT 0,
+            deleted INTEGER DEFAULT 0
+        )
+    ''')
+
+    # Changelog consumed by generate_embeddings.py (change_id is the cursor)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS faculty_changes (
+            change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER,
+            faculty_id INTEGER,
+            natural_key TEXT,
+            op TEXT CHECK (op IN ('insert', 'update', 'delete')),
+            content_hash TEXT,
+            changed_at TEXT
         )
     ''')
+
+    # Single-row counter read by the API to validate its response cache
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            updated_at TEXT
+        )
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO data_version (id, version, updated_at) VALUES (1, 0, datetime('now'))")
+
+    # Databases created before bulk loading / CDC lack the newer columns
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(faculty)")}
+    for column, kind in (("natural_key", "TEXT"), ("content_hash", "TEXT"), ("last_seen_run", "INTEGER")):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE faculty ADD COLUMN {column} {kind}")
+    cursor.execute(f"UPDATE faculty SET natural_key = {NATURAL_KEY_SQL} WHERE natural_key IS NULL")
+    cursor.execute(f"UPDATE faculty SET content_hash = {CONTENT_HASH_SQL} WHERE content_hash IS NULL")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_faculty_natural_key ON faculty(natural_key)")
+
+    # A freshly built keyword index changes /faculty/search results
+    if init_fts(cursor):
+        bump_version(cursor)
     
     conn.commit()
     conn.close()
-    print(f"Database schema initialized in '{DB_FILE}'.")
+    print(f"Database schema initialized in '{db_file}'.")
 
-def store_data(df):
-    conn = sqlite3.connect(DB_FILE)
+def init_fts(cursor):
+    """
+    Creates the FTS5 keyword index and the triggers that keep it in sync
+    with `faculty`. An index added to an existing database is built once.
+    Returns True when the index was created.
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).fetchone() is not None
+    columns = ", ".join(FTS_COLUMNS)
+    new_columns = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old_columns = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+    # prefix='2 3' keeps short prefix queries ("mach*") index lookups
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {columns},
+            content='faculty', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_insert AFTER INSERT ON faculty BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_delete AFTER DELETE ON faculty BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+        END
+    ''')
+    # Only fires when indexed text changes, not on every last_seen_run bump
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS faculty_fts_update AFTER UPDATE OF {columns} ON faculty BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.id, {old_columns});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_columns});
+        END
+    ''')
+    if not exists:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return not exists
+
+def start_run(db_file=DB_FILE):
+    """Registers a new load run and returns its run_id."""
+    conn = connect(db_file)
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO store_runs (started_at) VALUES (?)",
+            (pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),)
+        )
+    run_id = cursor.lastrowid
+    conn.close()
+    return run_id
+
+def finish_run(run_id, db_file=DB_FILE, prune=True, max_delete_share=MAX_DELETE_SHARE):
+    """
+    Closes a load run. With prune=True, records that no chunk of this run
+    contained are deleted and logged as 'delete' changes, unless they are
+    more than `max_delete_share` of the table (None: no limit). A scrape
+    that lost a listing page looks exactly like that, so those rows are
+    kept and reported instead. Returns the run's totals.
+    """
+    conn = connect(db_file)
+    now = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    deleted = 0
+    with conn:
+        if prune and max_delete_share is not None:
+            stale, total = conn.execute(
+                "SELECT COALESCE(SUM(last_seen_run IS NOT ?), 0), COUNT(*) FROM faculty", (run_id,)
+            ).fetchone()
+            if stale > max_delete_share * total:
+                print(f"Not pruning: {stale} of {total} records are missing from this run (limit "
+                      f"{max_delete_share:.0%}). Check the scrape, or load with --force-prune.")
+                prune = False
+        if prune:
+            conn.execute("""
+                INSERT INTO faculty_changes (run_id, faculty_id, natural_key, op, content_hash, changed_at)
+                SELECT ?, id, natural_key, 'delete', content_hash, ?
+                FROM faculty WHERE last_seen_run IS NOT ?
+            """, (run_id, now, run_id))
+            deleted = conn.execute("DELETE FROM faculty WHERE last_seen_run IS NOT ?", (run_id,)).rowcount
+            if deleted:
+                bump_version(conn)
+        conn.execute(
+            "UPDATE store_runs SET finished_at = ?, deleted = ? WHERE run_id = ?",
+            (now, deleted, run_id)
+        )
+    totals = conn.execute(
+        "SELECT inserted, updated, unchanged, deleted FROM store_runs WHERE run_id = ?", (run_id,)
+    ).fetchone()
+    conn.close()
+    return dict(zip(["inserted", "updated", "unchanged", "deleted"], totals))
+
+def _stage(cursor, df):
+    """Copies the DataFrame into a temp table with one executemany call."""
+    columns = list(COLUMN_MAP.values())
+    cursor.execute("DROP TABLE IF EXISTS temp.staging")
+    cursor.execute(f"""
+        CREATE TEMP TABLE staging (
+            {', '.join(c + ' TEXT' for c in columns)},
+            natural_key TEXT, name_key TEXT, content_hash TEXT, op TEXT
+        )
+    """)
+
+    frame = df[list(COLUMN_MAP)].astype(object)
+    frame = frame.where(frame.notna(), None)
+    cursor.executemany(
+        f"INSERT INTO staging ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        frame.itertuples(index=False, name=None)
+    )
+    cursor.execute(f"""
+        UPDATE staging SET natural_key = {NATURAL_KEY_SQL},
+                           name_key = lower(trim(name)),
+                           content_hash = {CONTENT_HASH_SQL}
+    """)
+    # Last occurrence wins when the scrape produced the same person twice
+    cursor.execute("""
+        DELETE FROM staging WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM staging GROUP BY natural_key
+        )
+    """)
+    cursor.execute("CREATE INDEX temp.idx_staging_key ON staging(natural_key)")
+    cursor.execute("CREATE INDEX temp.idx_staging_name ON staging(name_key)")
+
+def store_data(df, db_file=DB_FILE, run_id=None):
+    """
+    Bulk upsert: stage the DataFrame, then merge it into `faculty` with a
+    single INSERT ... ON CONFLICT DO UPDATE inside one transaction.
+    Inserts and updates are logged to faculty_changes under `run_id`
+    (a one-off run is opened, and closed without pruning, when omitted).
+    Returns {'inserted', 'updated', 'unchanged'} counts.
+    """
+    own_run = run_id is None
+    if own_run:
+        run_id = start_run(db_file)
+
+    conn = connect(db_file)
     cursor = conn.cursor()
     
-    records_inserted = 0
-    records_updated = 0
-    
     print("Storing data in SQLite...")
-    
-    for _, row in df.iterrows():
-        try:
-            name = row['Name']
-            email = row['Email']
-            
-            # --- LOGIC FIX: Check if record exists before inserting ---
-            
-            # 1. Try finding by Email first (if it exists)
-            match_found = False
-            if email:
-                cursor.execute("SELECT id FROM faculty WHERE email = ?", (email,))
-                result = cursor.fetchone()
-                if result:
-                    match_found = True
-            
-            # 2. If no email or no match, try finding by Name (Fallback)
-            if not match_found:
-                cursor.execute("SELECT id FROM faculty WHERE name = ?", (name,))
-                result = cursor.fetchone()
-                if result:
-                    match_found = True
-
-            # --- INSERT or UPDATE based on finding ---
-            if match_found:
-                # UPDATE existing record
-                cursor.execute('''
-                    UPDATE faculty SET
-                        designation=?, phone=?, education=?, bio_interest=?, 
-                        image_url=?, last_updated=?, email=?
-                    WHERE name = ? OR email = ?
-                ''', (
-                    row['Designation'], row['Phone'], row['Education'], 
-                    row['Area_of_Interest'], row['Image_URL'], row['last_updated'],
-                    email, # Ensure email is updated if we matched by name
-                    name, email
-                ))
-                records_updated += 1
-            else:
-                # INSERT new record
-                cursor.execute('''
-                    INSERT INTO faculty (name, designation, email, phone, education, bio_interest, profile_link, image_url, last_updated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['Name'], row['Designation'], row['Email'], row['Phone'], 
-                    row['Education'], row['Area_of_Interest'], row['Profile_Link'], 
-                    row['Image_URL'], row['last_updated']
-                ))
-                records_inserted += 1
-
-        except Exception as e:
-            print(f"   Error processing {row['Name']}: {e}")
 
-    conn.commit()
+    try:
+        cursor.execute("BEGIN")
+        _stage(cursor, df)
+
+        # Name fallback: a person stored without an email who now has one
+        # keeps their row (and id) instead of being inserted a second time
+        cursor.execute("""
+            CREATE TEMP TABLE rekey AS
+            SELECT f.id, MAX(s.natural_key) AS new_key
+            FROM faculty f JOIN staging s ON s.name_key = lower(trim(f.name))
+            WHERE f.email IS NULL AND s.email IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM faculty f2 WHERE f2.natural_key = s.natural_key)
+            GROUP BY f.id
+        """)
+        cursor.execute("DELETE FROM rekey WHERE new_key IN (SELECT new_key FROM rekey GROUP BY new_key HAVING COUNT(*) > 1)")
+        cursor.execute("""
+            UPDATE faculty SET natural_key = (SELECT new_key FROM rekey WHERE rekey.id = faculty.id)
+            WHERE id IN (SELECT id FROM rekey)
+        """)
+        cursor.execute("DROP TABLE temp.rekey")
+
+        # Classify each staged row against the stored hash
+        cursor.execute("""
+            UPDATE staging SET op = (
+                SELECT CASE WHEN f.content_hash IS staging.content_hash THEN NULL ELSE 'update' END
+                FROM faculty f WHERE f.natural_key = staging.natural_key
+            )
+        """)
+        cursor.execute("""
+            UPDATE staging SET op = 'insert'
+            WHERE op IS NULL AND NOT EXISTS (SELECT 1 FROM faculty f WHERE f.natural_key = staging.natural_key)
+        """)
+        counts = dict(cursor.execute("SELECT COALESCE(op, 'unchanged'), COUNT(*) FROM staging GROUP BY op").fetchall())
+        counts = {key: counts.get(key, 0) for key in ("insert", "update", "unchanged")}
+        counts = {"inserted": counts["insert"], "updated": counts["update"], "unchanged": counts["unchanged"]}
+
+        # Unchanged rows are never rewritten (last_updated keeps its value and
+        # no AUTOINCREMENT id is burnt on the conflict path)
+        columns = DATA_COLUMNS + ["last_updated", "natural_key", "content_hash", "last_seen_run"]
+        cursor.execute(f"""
+            INSERT INTO faculty ({', '.join(columns)})
+            SELECT {', '.join('s.' + c for c in columns[:-1])}, ? FROM staging s
+            WHERE s.op IS NOT NULL
+            ON CONFLICT(natural_key) DO UPDATE SET
+                {', '.join(f"{c} = excluded.{c}" for c in columns if c != "natural_key")}
+        """, (run_id,))
+        cursor.execute(
+            "UPDATE faculty SET last_seen_run = ? WHERE natural_key IN (SELECT natural_key FROM staging WHERE op IS NULL)",
+            (run_id,)
+        )
+
+        # Changelog for downstream consumers (embeddings)
+        cursor.execute("""
+            INSERT INTO faculty_changes (run_id, faculty_id, natural_key, op, content_hash, changed_at)
+            SELECT ?, f.id, s.natural_key, s.op, s.content_hash, s.last_updated
+            FROM staging s JOIN faculty f ON f.natural_key = s.natural_key
+            WHERE s.op IS NOT NULL
+        """, (run_id,))
+        cursor.execute("""
+            UPDATE store_runs SET inserted = inserted + ?, updated = updated + ?, unchanged = unchanged + ?
+            WHERE run_id = ?
+        """, (counts["inserted"], counts["updated"], counts["unchanged"], run_id))
+        # Unchanged chunks only move last_seen_run, which the API does not
+        # serve: cached responses and ETags stay valid
+        if counts["inserted"] or counts["updated"]:
+            bump_version(cursor)
+
+        cursor.execute("DROP TABLE temp.staging")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        conn.close()
+        raise
     
     # Validation Query
     cursor.execute("SELECT COUNT(*) FROM faculty")
     count = cursor.fetchone()[0]
     
     conn.close()
-    print(f"Done! Inserted: {records_inserted}, Updated: {records_updated}")
+    if own_run:
+        finish_run(run_id, db_file, prune=False)
+    print(f"Done! Inserted: {counts['inserted']}, Updated: {counts['updated']}, Unchanged: {counts['unchanged']}")
     print(f"Total records in DB: {count}")
+    return counts
+
+def load_chunks(chunks, db_file=DB_FILE, prune=True, max_delete_share=MAX_DELETE_SHARE):
+    """
+    Transforms and stores scraped DataFrame chunks as one load run. Records
+    missing from the chunks are deleted when prune=True (see finish_run for
+    the `max_delete_share` safety limit). Returns the run totals.
+    """
+    init_db(db_file)
+    run_id = start_run(db_file)
+    # One timestamp for the whole run, not one per chunk
+    timestamp = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    for chunk in chunks:
+        # Step 2: Transform
+        with STORE_SECONDS.time(stage="transform"):
+            clean_df = transform_data(chunk, timestamp=timestamp)
+        # Step 3: Store
+        with STORE_SECONDS.time(stage="upsert"):
+            counts = store_data(clean_df, db_file, run_id=run_id)
+        for op in ("inserted", "updated", "unchanged"):
+            STORE_ROWS.inc(counts[op], op=op)
+
+    totals = finish_run(run_id, db_file, prune=prune, max_delete_share=max_delete_share)
+    STORE_ROWS.inc(totals["deleted"], op="deleted")
+    print(f"Run {run_id}: {totals}")
+    REGISTRY.report("faculty_store")
+    return totals
+
+def load_csv(csv_file=CSV_FILE, db_file=DB_FILE, chunksize=CHUNK_SIZE, prune=True,
+             max_delete_share=MAX_DELETE_SHARE):
+    """Loads the scrape dump CSV chunk by chunk (see load_chunks)."""
+    return load_chunks(read_chunks(csv_file, chunksize), db_file, prune, max_delete_share)
+
+def load_frame(df, db_file=DB_FILE, chunksize=CHUNK_SIZE, prune=True, max_delete_share=MAX_DELETE_SHARE):
+    """Loads an in-memory scrape (e.g. a pipeline artifact) the same way as load_csv."""
+    return load_chunks((df.iloc[i:i + chunksize] for i in range(0, len(df), chunksize)), db_file, prune,
+                       max_delete_share)
 
 # --- MAIN EXECUTION ---
 if __name__ == "__main__":
@@ -147,12 +498,5 @@ if __name__ == "__main__":
     if not os.path.exists(CSV_FILE):
         print(f"Error: '{CSV_FILE}' not found. Please run 'scrape_faculty.py' first.")
     else:
-        # Load Raw Data
-        raw_df = pd.read_csv(CSV_FILE)
-        
-        # Step 2: Transform
-        clean_df = transform_data(raw_df)
-        
-        # Step 3: Store
-        init_db()
-        store_data(clean_df)
\ No newline at end of file
+        # --force-prune: the missing records really left, however many there are
+        load_csv(max_delete_share=None if "--force-prune" in sys.argv else MAX_DELETE_SHARE)
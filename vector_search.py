@@ -0,0 +1,148 @@
+import numpy as np
+
+# CONFIGURATION
+SCORE_THRESHOLD = 0.2   # Cosine similarity below this is treated as "no match"
+SCORE_CHUNK = 4096      # Rows of an int8 matrix widened to float32 at a time (cache-sized)
+FULL_SCAN_SHARE = 0.2   # Filters allowing more rows than this score everything and mask the rest
+
+def l2_normalize(vectors):
+    """Returns float32 row vectors scaled to unit length (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def quantize_int8(vectors):
+    """
+    Symmetric per-dimension int8 quantisation: returns (codes, scales) with
+    vectors ~= codes * scales. A quarter of the float32 size; for unit
+    vectors the cosine error is small (see generate_embeddings --dtype int8).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=0) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def dequantize_int8(codes, scales):
+    return np.asarray(codes, dtype=np.float32) * scales
+
+class VectorIndex:
+    """
+    Exact cosine search over a fixed matrix.
+
+    The matrix is L2-normalised once, so a query is scored with a single
+    matmul, the top-k is picked with argpartition (O(n) instead of a full
+    sort) and the threshold is applied as one vectorised mask. Pass
+    normalized=True for matrices that are already unit length: a float32
+    memory-mapped store is then used as-is, without a private copy. A
+    float16 store is not: it is widened into a private float32 copy (numpy
+    casts float16 too slowly to widen it per query). An int8 matrix is used
+    as-is, with its per-dimension `scales` folded into the query instead of
+    widening the whole matrix. search(rows=...) scores only the given rows
+    (a pre-filter, see search_filters.py).
+    """
+
+    def __init__(self, vectors, normalized=False, scales=None):
+        self.scales = None if scales is None else np.asarray(scales, dtype=np.float32)
+        if self.scales is not None or (normalized and getattr(vectors, "dtype", None) == np.float32):
+            self.vectors = vectors
+        else:
+            self.vectors = l2_normalize(vectors)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def scores(self, queries, rows=None):
+        """
+        Cosine similarity of each query against every row, or only against
+        `rows` (sorted positions): (n_queries, n_rows or len(rows)).
+        """
+        queries = l2_normalize(np.atleast_2d(queries))
+        if self.scales is None and rows is None:
+            return queries @ self.vectors.T
+        if self.scales is not None:
+            # codes * scales . q == codes . (scales * q)
+            queries = queries * self.scales
+        # One block at a time: int8 codes are widened into a buffer that stays
+        # in cache, and a filtered gather never copies the whole matrix
+        n_rows = len(self.vectors) if rows is None else len(rows)
+        scores = np.empty((len(queries), n_rows), dtype=np.float32)
+        buffer = np.empty((min(SCORE_CHUNK, n_rows), self.vectors.shape[1]), dtype=np.float32)
+        for start in range(0, n_rows, SCORE_CHUNK):
+            block = self.vectors[start:start + SCORE_CHUNK] if rows is None else self.vectors[rows[start:start + SCORE_CHUNK]]
+            if block.dtype != np.float32:
+                codes, block = block, buffer[:len(block)]
+                np.copyto(block, codes, casting="unsafe")
+            np.matmul(queries, block.T, out=scores[:, start:start + len(block)])
+        return scores
+
+    def search(self, queries, top_k=5, threshold=SCORE_THRESHOLD, rows=None):
+        """
+        Scores a batch of query vectors and returns one (indices, scores)
+        pair per query, best first, keeping only scores above `threshold`.
+        With `rows`, only those rows are scored (and returned), so a
+        selective filter is cheaper than a full search.
+        """
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+        if rows is not None and len(rows) > FULL_SCAN_SHARE * len(self.vectors):
+            # Broad filter: one matmul over every row beats gathering most of them
+            scores = self.scores(queries)
+            blocked = np.ones(scores.shape[1], dtype=bool)
+            blocked[rows] = False
+            scores[:, blocked] = -np.inf
+            rows = None
+        else:
+            scores = self.scores(queries, rows)
+        n_rows = scores.shape[1]
+        k = min(top_k, n_rows)
+        if k <= 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in scores]
+
+        if k < n_rows:
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+        else:
+            top = np.tile(np.arange(n_rows), (len(scores), 1))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        if rows is not None:
+            top = rows[top]
+        keep = top_scores > threshold
+        return [(idx[ok], sc[ok]) for idx, sc, ok in zip(top, top_scores, keep)]
+
+def hydrate(df, indices, scores):
+    """Turns one search result into display dicts with a single iloc lookup."""
+    if len(indices) == 0:
+        return []
+    rows = df.iloc[indices]
+
+    def get(column, default):
+        if column not in rows:
+            return [default] * len(rows)
+        # Missing values become None (NaN is truthy and is not valid JSON)
+        values = rows[column].astype(object)
+        return values.where(values.notna(), None).tolist()
+
+    return [
+        {
+            "id": int(faculty_id) if faculty_id is not None else None,
+            "name": name,
+            "designation": designation,
+            "email": email,
+            "phone": phone,
+            "education": education,
+            "interests": interests,
+            "image": image,
+            "link": link,
+            "score": round(float(score) * 100, 1)  # Convert to percentage
+        }
+        for faculty_id, name, designation, email, phone, education, interests, image, link, score in zip(
+            get('id', None), get('Name', ''), get('Designation', ''), get('Email', 'N/A'), get('Phone', 'N/A'),
+            get('Education', ''), get('Area_of_Interest', ''), get('Image_URL', ''),
+            get('Profile_Link', '#'), scores
+        )
+    ]